@@ -0,0 +1,393 @@
+"""End-to-End Authentication Benchmark
+
+Replays recorded or synthetic inputs through the decision pipeline
+without a camera or microphone:
+- Frame sources: video file, image folder or synthetic frames
+- Audio sources: WAV files or synthetic speech-like signals
+- Resident or synthetic face/voice galleries
+- Per-stage latency percentiles, throughput, CPU time and peak RSS as JSON
+- Optional comparison against a baseline report for CI regression checks
+
+Usage:
+    python benchmark.py --frames synthetic --audio synthetic --gallery synthetic:50
+    python benchmark.py --frames video:door.mp4 --audio wav:samples/ --output report.json
+    python benchmark.py --frames images:frames/ --audio wav:a.wav --baseline base.json
+"""
+
+import os
+import sys
+import time
+import json
+import argparse
+import resource
+import contextlib
+
+import cv2
+import numpy as np
+import soundfile as sf
+
+# Add config path
+current_dir = os.path.dirname(__file__)
+config_dir = os.path.join(current_dir, '../')
+sys.path.append(config_dir)
+from deploy.capture import FrameSequence
+from deploy.decision import initialize_models, recognize_faces, extract_voice_embedding, authenticate_user
+from deploy.decision import VOICE_SIMILARITY_THRESHOLD
+from deploy.gallery import FaceGallery, load_face_gallery
+from deploy.voice_gallery import VoiceGallery, load_voice_gallery
+
+# Benchmark defaults
+FRAMES_PER_ATTEMPT = 10
+MAX_LOADED_FRAMES = 300       # Frames kept in memory from a video or folder
+BENCHMARK_FACE_TIMEOUT = 30.0  # Generous, so slow CI machines analyse the same frames
+SYNTHETIC_FRAME_SIZE = (640, 480)
+SYNTHETIC_AUDIO_SECONDS = 3.0
+SYNTHETIC_SAMPLE_RATE = 16000
+PERCENTILES = (50, 90, 95, 99)
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+AUDIO_EXTENSIONS = (".wav", ".flac", ".ogg")
+
+class FrameReplay:
+    """Frames served to successive attempts as consecutive windows, cycling"""
+
+    def __init__(self, frames, frames_per_attempt=FRAMES_PER_ATTEMPT, description=""):
+        if not frames:
+            raise ValueError(f"No frames loaded from {description or 'source'}")
+        self.frames = frames
+        self.frames_per_attempt = frames_per_attempt
+        self.description = description
+        self._position = 0
+
+    def next_attempt(self):
+        """Frames for the next attempt
+
+        Returns:
+            FrameSequence: Frame source for recognize_faces
+        """
+        window = [self.frames[(self._position + i) % len(self.frames)] for i in range(self.frames_per_attempt)]
+        self._position = (self._position + self.frames_per_attempt) % len(self.frames)
+        return FrameSequence(window)
+
+def video_frames(path, frames_per_attempt=FRAMES_PER_ATTEMPT, max_frames=MAX_LOADED_FRAMES):
+    """Frames decoded once from a video file"""
+    capture = cv2.VideoCapture(path)
+    frames = []
+    try:
+        while len(frames) < max_frames:
+            ok, frame = capture.read()
+            if not ok:
+                break
+            frames.append(frame)
+    finally:
+        capture.release()
+    return FrameReplay(frames, frames_per_attempt, f"video:{path}")
+
+def folder_frames(folder, frames_per_attempt=FRAMES_PER_ATTEMPT, max_frames=MAX_LOADED_FRAMES):
+    """Images of a folder, in name order"""
+    names = sorted(name for name in os.listdir(folder) if name.lower().endswith(IMAGE_EXTENSIONS))
+    frames = [frame for frame in (cv2.imread(os.path.join(folder, name)) for name in names[:max_frames])
+              if frame is not None]
+    return FrameReplay(frames, frames_per_attempt, f"images:{folder}")
+
+def synthetic_frames(frames_per_attempt=FRAMES_PER_ATTEMPT, size=SYNTHETIC_FRAME_SIZE, seed=0):
+    """Textured frames without faces: exercise frame selection and detection cost"""
+    rng = np.random.default_rng(seed)
+    width, height = size
+    gradient = np.linspace(0, 160, width, dtype=np.float32)[None, :, None]
+    frames = []
+    for _ in range(max(frames_per_attempt, 16)):
+        noise = rng.normal(0.0, 25.0, (height, width, 3)).astype(np.float32)
+        frames.append(np.clip(gradient + 48.0 + noise, 0, 255).astype(np.uint8))
+    return FrameReplay(frames, frames_per_attempt, f"synthetic:{width}x{height}")
+
+class AudioReplay:
+    """Audio clips served to successive attempts, cycling"""
+
+    def __init__(self, clips, description=""):
+        if not clips:
+            raise ValueError(f"No audio loaded from {description or 'source'}")
+        self.clips = clips
+        self.description = description
+        self._position = 0
+
+    def next_attempt(self):
+        """Clip for the next attempt
+
+        Returns:
+            tuple: (samples, sample_rate)
+        """
+        clip = self.clips[self._position]
+        self._position = (self._position + 1) % len(self.clips)
+        return clip
+
+def wav_clips(paths):
+    """Audio files (or folders of them), decoded once"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(os.path.join(path, name) for name in sorted(os.listdir(path))
+                         if name.lower().endswith(AUDIO_EXTENSIONS))
+        else:
+            files.append(path)
+    clips = [sf.read(file_path, dtype="float32", always_2d=True) for file_path in files]
+    return AudioReplay(clips, f"wav:{','.join(paths)}")
+
+def synthetic_clips(seconds=SYNTHETIC_AUDIO_SECONDS, sample_rate=SYNTHETIC_SAMPLE_RATE, count=4, seed=0):
+    """Harmonic, amplitude-modulated tones with noise, roughly speech-shaped"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * sample_rate), dtype=np.float32) / sample_rate
+    clips = []
+    for _ in range(count):
+        pitch = rng.uniform(90.0, 220.0)
+        voiced = sum(np.sin(2 * np.pi * pitch * h * t) / h for h in range(1, 6))
+        envelope = 0.5 * (1.0 + np.sin(2 * np.pi * rng.uniform(2.0, 5.0) * t))
+        samples = 0.2 * envelope * voiced + rng.normal(0.0, 0.01, len(t))
+        clips.append((samples.astype(np.float32)[:, None], sample_rate))
+    return AudioReplay(clips, f"synthetic:{seconds:g}s")
+
+def parse_frame_source(spec, frames_per_attempt=FRAMES_PER_ATTEMPT):
+    """Build a frame source from ``video:PATH``, ``images:DIR`` or ``synthetic[:WxH]``"""
+    kind, _, value = spec.partition(":")
+    if kind == "video":
+        return video_frames(value, frames_per_attempt)
+    if kind == "images":
+        return folder_frames(value, frames_per_attempt)
+    if kind == "synthetic":
+        size = tuple(int(v) for v in value.split("x")) if value else SYNTHETIC_FRAME_SIZE
+        return synthetic_frames(frames_per_attempt, size)
+    raise ValueError(f"Unknown frame source '{spec}'")
+
+def parse_audio_source(spec):
+    """Build an audio source from ``wav:PATH[,PATH...]`` or ``synthetic[:SECONDS]``"""
+    kind, _, value = spec.partition(":")
+    if kind == "wav":
+        return wav_clips(value.split(","))
+    if kind == "synthetic":
+        return synthetic_clips(float(value) if value else SYNTHETIC_AUDIO_SECONDS)
+    raise ValueError(f"Unknown audio source '{spec}'")
+
+def synthetic_galleries(users, samples_per_user=5, seed=0):
+    """Random face and voice galleries of ``users`` identities"""
+    rng = np.random.default_rng(seed)
+    names = [f"user{u:04d}" for u in range(users)]
+    face_centers = rng.normal(0.0, 0.1, (users, 128))
+    face_encodings = [face_centers[u] + rng.normal(0.0, 0.03, 128)
+                      for u in range(users) for _ in range(samples_per_user)]
+    face_gallery = FaceGallery.from_encodings(face_encodings, [n for n in names for _ in range(samples_per_user)])
+
+    voice_centers = rng.normal(0.0, 1.0, (users, 192))
+    voice_gallery = VoiceGallery.from_embeddings([
+        (name, [voice_centers[u] + rng.normal(0.0, 0.3, 192) for _ in range(samples_per_user)])
+        for u, name in enumerate(names)
+    ])
+    return face_gallery, voice_gallery
+
+def summarize(samples_ms):
+    """Latency summary of one stage
+
+    Args:
+        samples_ms (list): Latencies in milliseconds
+
+    Returns:
+        dict: count, mean, percentiles and max in milliseconds
+    """
+    values = np.asarray(samples_ms, dtype=np.float64)
+    summary = {"count": int(len(values)), "mean_ms": float(values.mean())}
+    for percentile in PERCENTILES:
+        summary[f"p{percentile}_ms"] = float(np.percentile(values, percentile))
+    summary["max_ms"] = float(values.max())
+    return summary
+
+class PipelineBenchmark:
+    """Replays frame and audio sources through the decision pipeline"""
+
+    def __init__(self, frame_source=None, audio_source=None, face_gallery=None, voice_gallery=None,
+                 verification_model=None, early_exit=True):
+        """
+        Args:
+            frame_source (FrameReplay): Frames per attempt, None to skip faces
+            audio_source (AudioReplay): Clip per attempt, None to skip voice
+            face_gallery (FaceGallery): Defaults to the resident gallery
+            voice_gallery (VoiceGallery): Defaults to the resident gallery
+            verification_model: Speaker model handle, defaults to the resident one
+            early_exit (bool): Let face recognition stop on a confident match
+        """
+        self.frame_source = frame_source
+        self.audio_source = audio_source
+        self.face_gallery = face_gallery
+        self.voice_gallery = voice_gallery
+        self.verification_model = verification_model
+        self.early_exit = early_exit
+        self.samples = {}
+        self.frames = 0
+        self.attempts = 0
+
+    def _record(self, stage, milliseconds):
+        self.samples.setdefault(stage, []).append(milliseconds)
+
+    def run_attempt(self):
+        """One attempt: faces, then voice, then fusion, each timed"""
+        attempt_start = time.perf_counter()
+        face_names = set()
+        speaker = "Unknown"
+
+        if self.frame_source is not None:
+            stage_start = time.perf_counter()
+            decision = recognize_faces(BENCHMARK_FACE_TIMEOUT, self.early_exit,
+                                       frame_source=self.frame_source.next_attempt(),
+                                       face_gallery=self.face_gallery)
+            self._record("face_total", (time.perf_counter() - stage_start) * 1000.0)
+            for stage, milliseconds in decision.stage_timings.items():
+                self._record(f"face_{stage}", milliseconds)
+            self.frames += decision.frames_used
+            face_names = decision.names
+
+        if self.audio_source is not None:
+            recording, sample_rate = self.audio_source.next_attempt()
+            stage_start = time.perf_counter()
+            embedding = extract_voice_embedding(recording, sample_rate, self.verification_model)
+            self._record("voice_embedding", (time.perf_counter() - stage_start) * 1000.0)
+
+            stage_start = time.perf_counter()
+            _, speaker, _ = self.voice_gallery.identify(embedding, VOICE_SIMILARITY_THRESHOLD)
+            self._record("voice_match", (time.perf_counter() - stage_start) * 1000.0)
+
+        stage_start = time.perf_counter()
+        authenticate_user(face_names, speaker)
+        self._record("fusion", (time.perf_counter() - stage_start) * 1000.0)
+
+        self._record("attempt", (time.perf_counter() - attempt_start) * 1000.0)
+        self.attempts += 1
+
+    def run(self, attempts, warmup=1):
+        """Run the benchmark
+
+        Args:
+            attempts (int): Measured attempts
+            warmup (int): Unmeasured attempts run first (model and cache warm-up)
+
+        Returns:
+            dict: JSON-serialisable report
+        """
+        if self.audio_source is not None:
+            self.verification_model = self.verification_model or initialize_models()
+            self.voice_gallery = self.voice_gallery or load_voice_gallery()
+            if self.voice_gallery is None:
+                raise FileNotFoundError("Voice gallery not found - use a synthetic gallery")
+        if self.frame_source is not None and self.face_gallery is None:
+            self.face_gallery = load_face_gallery()
+            if self.face_gallery is None or len(self.face_gallery) == 0:
+                raise FileNotFoundError("Face gallery not found - use a synthetic gallery")
+
+        for _ in range(warmup):
+            self.run_attempt()
+        self.samples = {}
+        self.frames = 0
+        self.attempts = 0
+
+        usage_start = resource.getrusage(resource.RUSAGE_SELF)
+        wall_start = time.perf_counter()
+        for _ in range(attempts):
+            self.run_attempt()
+        wall_seconds = time.perf_counter() - wall_start
+        usage_end = resource.getrusage(resource.RUSAGE_SELF)
+
+        cpu_seconds = (usage_end.ru_utime - usage_start.ru_utime) + (usage_end.ru_stime - usage_start.ru_stime)
+        return {
+            "attempts": self.attempts,
+            "wall_seconds": wall_seconds,
+            "throughput": {
+                "attempts_per_second": self.attempts / wall_seconds if wall_seconds > 0 else 0.0,
+                "frames_per_second": self.frames / wall_seconds if wall_seconds > 0 else 0.0,
+                "frames": self.frames,
+            },
+            "resources": {
+                "cpu_seconds": cpu_seconds,
+                "cpu_utilization": cpu_seconds / wall_seconds if wall_seconds > 0 else 0.0,
+                # ru_maxrss is in kilobytes on Linux
+                "peak_rss_mb": usage_end.ru_maxrss / 1024.0,
+                "cpu_count": os.cpu_count(),
+            },
+            "stages": {stage: summarize(values) for stage, values in sorted(self.samples.items())},
+        }
+
+def compare_to_baseline(report, baseline, tolerance=0.2, percentile=95):
+    """Stages whose latency percentile regressed beyond the tolerance
+
+    Args:
+        report (dict): Current benchmark report
+        baseline (dict): Reference report
+        tolerance (float): Allowed relative slowdown (0.2 = 20%)
+        percentile (int): Percentile compared
+
+    Returns:
+        list: ``(stage, baseline_ms, current_ms)`` for each regression
+    """
+    key = f"p{percentile}_ms"
+    regressions = []
+    for stage, reference in baseline.get("stages", {}).items():
+        current = report["stages"].get(stage)
+        if current is None or reference[key] <= 0:
+            continue
+        if current[key] > reference[key] * (1.0 + tolerance):
+            regressions.append((stage, reference[key], current[key]))
+    return regressions
+
+def main():
+    """Run the benchmark and print or save the JSON report"""
+    parser = argparse.ArgumentParser(description="Benchmark the authentication pipeline")
+    parser.add_argument("--frames", default="synthetic",
+                        help="video:PATH, images:DIR, synthetic[:WxH] or none")
+    parser.add_argument("--audio", default="synthetic",
+                        help="wav:PATH[,PATH...] (files or folders), synthetic[:SECONDS] or none")
+    parser.add_argument("--gallery", default="resident",
+                        help="resident, or synthetic:N for N random identities")
+    parser.add_argument("--attempts", type=int, default=20, help="Measured attempts")
+    parser.add_argument("--warmup", type=int, default=1, help="Unmeasured warm-up attempts")
+    parser.add_argument("--frames-per-attempt", type=int, default=FRAMES_PER_ATTEMPT)
+    parser.add_argument("--no-early-exit", action="store_true", help="Analyse every frame of each attempt")
+    parser.add_argument("--output", help="Write the JSON report to this file instead of stdout")
+    parser.add_argument("--baseline", help="Fail if p95 latencies regress against this report")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative p95 slowdown")
+    args = parser.parse_args()
+
+    frame_source = None if args.frames == "none" else parse_frame_source(args.frames, args.frames_per_attempt)
+    audio_source = None if args.audio == "none" else parse_audio_source(args.audio)
+    face_gallery = voice_gallery = None
+    if args.gallery.startswith("synthetic"):
+        _, _, users = args.gallery.partition(":")
+        face_gallery, voice_gallery = synthetic_galleries(int(users or 50))
+
+    benchmark = PipelineBenchmark(frame_source, audio_source, face_gallery, voice_gallery,
+                                  early_exit=not args.no_early_exit)
+    # Keep pipeline logging off stdout so the JSON report stays parseable
+    with contextlib.redirect_stdout(sys.stderr):
+        report = benchmark.run(args.attempts, args.warmup)
+
+    report["config"] = {
+        "frames": frame_source.description if frame_source else "none",
+        "audio": audio_source.description if audio_source else "none",
+        "gallery": args.gallery,
+        "frames_per_attempt": args.frames_per_attempt,
+        "early_exit": not args.no_early_exit,
+        "warmup": args.warmup,
+    }
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+        print(f"[INFO] Report written to {args.output}", file=sys.stderr)
+    else:
+        print(text)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare_to_baseline(report, json.load(f), args.tolerance)
+        for stage, reference, current in regressions:
+            print(f"[WARNING] {stage}: p95 {current:.1f}ms vs baseline {reference:.1f}ms", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
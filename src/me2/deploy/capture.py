@@ -0,0 +1,397 @@
+"""Persistent Camera Capture Service
+
+Keeps camera streams open for the lifetime of the process:
+- Background reader thread per camera source
+- Fixed-size ring buffer of preallocated frames with timestamps
+- Zero-copy views of the latest N frames for consumers
+- Reconnect with exponential backoff and frame-drop counters
+"""
+
+import os
+import sys
+import time
+import threading
+
+import cv2
+import numpy as np
+
+# Add config path
+current_dir = os.path.dirname(__file__)
+config_dir = os.path.join(current_dir, '../')
+sys.path.append(config_dir)
+import gui_app.config as cf
+
+# Capture settings
+CAPTURE_BUFFER_SIZE = 16
+RECONNECT_INITIAL_DELAY = 0.5
+RECONNECT_MAX_DELAY = 10.0
+MAX_CONSECUTIVE_READ_FAILURES = 30
+CONSUMER_ACTIVE_WINDOW = 1.0  # Seconds since last read during which unread frames count as dropped
+
+class FrameRingBuffer:
+    """Ring buffer of preallocated frames with timestamps and sequence numbers
+
+    Frames are copied into preallocated slots by a single writer.
+    Readers get views into the slots; a view stays valid until the
+    writer wraps around to the same slot ``capacity`` frames later.
+    """
+
+    def __init__(self, capacity=CAPTURE_BUFFER_SIZE):
+        self.capacity = capacity
+        self._frames = None
+        self._timestamps = np.zeros(capacity, dtype=np.float64)
+        self._sequences = np.full(capacity, -1, dtype=np.int64)
+        self._next_sequence = 0
+        self._condition = threading.Condition()
+
+    def _allocate(self, frame):
+        """(Re)allocate slots when the frame geometry changes"""
+        self._frames = np.empty((self.capacity,) + frame.shape, dtype=frame.dtype)
+        self._sequences[:] = -1
+
+    def write(self, frame, timestamp=None):
+        """Copy a frame into the next slot and publish it
+
+        Args:
+            frame (np.ndarray): Camera frame
+            timestamp (float): Capture time, defaults to now
+
+        Returns:
+            int: Sequence number of the written frame
+        """
+        if self._frames is None or self._frames.shape[1:] != frame.shape or self._frames.dtype != frame.dtype:
+            with self._condition:
+                self._allocate(frame)
+
+        sequence = self._next_sequence
+        slot = sequence % self.capacity
+        np.copyto(self._frames[slot], frame)
+
+        with self._condition:
+            self._timestamps[slot] = time.time() if timestamp is None else timestamp
+            self._sequences[slot] = sequence
+            self._next_sequence = sequence + 1
+            self._condition.notify_all()
+        return sequence
+
+    @property
+    def latest_sequence(self):
+        """Sequence number of the newest frame, -1 if empty"""
+        return self._next_sequence - 1
+
+    def latest(self, count=1):
+        """Views of the newest frames, oldest first
+
+        Args:
+            count (int): Number of frames wanted (at most ``capacity``)
+
+        Returns:
+            list: Tuples of (frame_view, timestamp, sequence)
+        """
+        with self._condition:
+            newest = self._next_sequence - 1
+            if newest < 0 or self._frames is None:
+                return []
+            first = max(0, newest - min(count, self.capacity) + 1)
+            result = []
+            for sequence in range(first, newest + 1):
+                slot = sequence % self.capacity
+                if self._sequences[slot] == sequence:
+                    result.append((self._frames[slot], self._timestamps[slot], sequence))
+            return result
+
+    def wait_for_frame(self, after_sequence=-1, timeout=None):
+        """Block until a frame newer than ``after_sequence`` is available
+
+        Args:
+            after_sequence (int): Last sequence number the caller has seen
+            timeout (float): Maximum seconds to wait
+
+        Returns:
+            tuple: (frame_view, timestamp, sequence) or None on timeout
+        """
+        with self._condition:
+            if not self._condition.wait_for(
+                lambda: self._next_sequence > 0 and self._next_sequence - 1 > after_sequence, timeout
+            ):
+                return None
+            sequence = self._next_sequence - 1
+            slot = sequence % self.capacity
+            return self._frames[slot], self._timestamps[slot], sequence
+
+class CaptureService:
+    """Long-lived camera reader filling a shared frame ring buffer"""
+
+    def __init__(self, source, buffer_size=CAPTURE_BUFFER_SIZE):
+        """
+        Args:
+            source: Camera URL or device index accepted by cv2.VideoCapture
+            buffer_size (int): Number of frames kept in the ring buffer
+        """
+        self.source = source
+        self.buffer = FrameRingBuffer(buffer_size)
+        self._thread = None
+        self._stop_event = threading.Event()
+        self._capture = None
+        self._last_consumed = -1
+        self._last_consumed_at = 0.0
+
+        # Counters
+        self.connected = False
+        self.frames_captured = 0
+        self.frames_dropped = 0
+        self.read_failures = 0
+        self.reconnects = 0
+        self._started_at = None
+
+    def start(self):
+        """Start the background reader (idempotent)
+
+        Returns:
+            CaptureService: self, for chaining
+        """
+        if self._thread is None or not self._thread.is_alive():
+            self._stop_event.clear()
+            self._started_at = time.time()
+            self._thread = threading.Thread(
+                target=self._run, name=f"capture-{self.source}", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the background reader and release the camera"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+        self._release()
+
+    def _open(self):
+        """Open the camera, returning True on success"""
+        capture = cv2.VideoCapture(self.source)
+        if not capture.isOpened():
+            capture.release()
+            return False
+        capture.set(cv2.CAP_PROP_BUFFERSIZE, 1)  # Always deliver the newest frame
+        self._capture = capture
+        self.connected = True
+        return True
+
+    def _release(self):
+        """Release the camera handle if open"""
+        self.connected = False
+        if self._capture is not None:
+            self._capture.release()
+            self._capture = None
+
+    def _run(self):
+        """Reader loop with reconnect and exponential backoff"""
+        delay = RECONNECT_INITIAL_DELAY
+        while not self._stop_event.is_set():
+            if self._capture is None:
+                if not self._open():
+                    print(f"Camera {self.source} unavailable - retrying in {delay:.1f}s")
+                    self._stop_event.wait(delay)
+                    delay = min(delay * 2, RECONNECT_MAX_DELAY)
+                    continue
+                delay = RECONNECT_INITIAL_DELAY
+
+            failures = 0
+            while not self._stop_event.is_set():
+                ok, frame = self._capture.read()
+                if not ok or frame is None:
+                    self.read_failures += 1
+                    failures += 1
+                    if failures >= MAX_CONSECUTIVE_READ_FAILURES:
+                        break
+                    time.sleep(0.01)
+                    continue
+                failures = 0
+
+                # An active consumer never saw the previous frame
+                consumer_active = time.time() - self._last_consumed_at < CONSUMER_ACTIVE_WINDOW
+                if consumer_active and self.buffer.latest_sequence > self._last_consumed:
+                    self.frames_dropped += 1
+                self.buffer.write(frame)
+                self.frames_captured += 1
+
+            if not self._stop_event.is_set():
+                print(f"Camera {self.source} stopped delivering frames - reconnecting")
+                self._release()
+                self.reconnects += 1
+
+    def _mark_consumed(self, sequence):
+        """Record the newest frame handed to a consumer"""
+        self._last_consumed_at = time.time()
+        if sequence > self._last_consumed:
+            self._last_consumed = sequence
+
+    @property
+    def latest_sequence(self):
+        """Sequence number of the newest captured frame, -1 if none"""
+        return self.buffer.latest_sequence
+
+    def read(self):
+        """Newest frame view, VideoStream-compatible
+
+        Returns:
+            np.ndarray: Frame view or None if nothing was captured yet
+        """
+        latest = self.buffer.latest(1)
+        if not latest:
+            return None
+        frame, _, sequence = latest[0]
+        self._mark_consumed(sequence)
+        return frame
+
+    def snapshot(self, timeout=2.0):
+        """Copy of the newest frame, waiting for one if the buffer is empty
+
+        Args:
+            timeout (float): Maximum seconds to wait for a frame
+
+        Returns:
+            np.ndarray: Frame copy or None on timeout
+        """
+        latest = self.latest(1)
+        if latest:
+            return latest[0][0].copy()
+        item = self.wait_for_frame(-1, timeout)
+        return None if item is None else item[0].copy()
+
+    def latest(self, count=1):
+        """Zero-copy views of the newest ``count`` frames, oldest first
+
+        Returns:
+            list: Tuples of (frame_view, timestamp, sequence)
+        """
+        frames = self.buffer.latest(count)
+        if frames:
+            self._mark_consumed(frames[-1][2])
+        return frames
+
+    def wait_for_frame(self, after_sequence=-1, timeout=None):
+        """Block until a frame newer than ``after_sequence`` arrives
+
+        Returns:
+            tuple: (frame_view, timestamp, sequence) or None on timeout
+        """
+        item = self.buffer.wait_for_frame(after_sequence, timeout)
+        if item is not None:
+            self._mark_consumed(item[2])
+        return item
+
+    @property
+    def exhausted(self):
+        """Live cameras never run out of frames"""
+        return False
+
+    def stats(self):
+        """Capture counters for monitoring
+
+        Returns:
+            dict: Connection state, frame counters and average FPS
+        """
+        elapsed = time.time() - self._started_at if self._started_at else 0.0
+        return {
+            "source": str(self.source),
+            "connected": self.connected,
+            "frames_captured": self.frames_captured,
+            "frames_dropped": self.frames_dropped,
+            "read_failures": self.read_failures,
+            "reconnects": self.reconnects,
+            "fps": self.frames_captured / elapsed if elapsed > 0 else 0.0,
+        }
+
+class FrameSequence:
+    """Finite in-memory frame source with the CaptureService read interface
+
+    Frames are released one at a time as the consumer asks for them, so
+    every frame is analysed - e.g. frames uploaded by a remote client.
+    """
+
+    def __init__(self, frames):
+        """
+        Args:
+            frames (list): BGR frames, oldest first
+        """
+        self.frames = list(frames)
+        self._timestamps = []
+
+    @property
+    def latest_sequence(self):
+        """Sequence number of the newest released frame, -1 if none"""
+        return len(self._timestamps) - 1
+
+    @property
+    def exhausted(self):
+        """True once every frame has been released"""
+        return len(self._timestamps) >= len(self.frames)
+
+    def latest(self, count=1):
+        """The newest ``count`` released frames, oldest first
+
+        Returns:
+            list: Tuples of (frame, timestamp, sequence)
+        """
+        first = max(0, len(self._timestamps) - count)
+        return [(self.frames[sequence], self._timestamps[sequence], sequence)
+                for sequence in range(first, len(self._timestamps))]
+
+    def wait_for_frame(self, after_sequence=-1, timeout=None):
+        """Release the frame following ``after_sequence`` (never blocks)
+
+        Returns:
+            tuple: (frame, timestamp, sequence) or None once exhausted
+        """
+        sequence = after_sequence + 1
+        if sequence >= len(self.frames):
+            return None
+        while len(self._timestamps) <= sequence:
+            self._timestamps.append(time.time())
+        return self.frames[sequence], self._timestamps[sequence], sequence
+
+def decode_image(data):
+    """Decode an encoded image (JPEG, PNG, ...) held in memory
+
+    Args:
+        data (bytes): Encoded image
+
+    Returns:
+        np.ndarray: BGR frame
+
+    Raises:
+        ValueError: If the data is not a readable image
+    """
+    frame = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if frame is None:
+        raise ValueError("Unsupported or corrupt image")
+    return frame
+
+# Process-wide capture services, one per camera source
+_capture_services = {}
+_capture_services_lock = threading.Lock()
+
+def get_capture_service(source=None):
+    """Get the running capture service for a camera, starting it on first use
+
+    Args:
+        source: Camera URL or device index, defaults to ``cf.camurl``
+
+    Returns:
+        CaptureService: Shared, started capture service
+    """
+    source = cf.camurl if source is None else source
+    with _capture_services_lock:
+        service = _capture_services.get(source)
+        if service is None:
+            service = CaptureService(source)
+            _capture_services[source] = service
+        return service.start()
+
+def stop_capture_services():
+    """Stop every capture service (call on application shutdown)"""
+    with _capture_services_lock:
+        for service in _capture_services.values():
+            service.stop()
+        _capture_services.clear()
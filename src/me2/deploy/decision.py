@@ -4,202 +4,469 @@ Implements multimodal biometric authentication combining:
 - Facial recognition using FaceNet embeddings
 - Voice recognition using ECAPA-TDNN speaker verification
 - Real-time processing with configurable thresholds
+- Streaming face recognition that stops early on a confident match
+- Face detection and encoding offloaded to the inference worker processes
 """
 
 import os
 import sys
 import time
-
-import pickle
-import subprocess as cmd
+from collections import namedtuple
 
 import cv2
-import imutils
 import face_recognition
 import sounddevice as sd
 import soundfile as sf
-from imutils.video import VideoStream, FPS
-from speechbrain.inference.speaker import SpeakerRecognition
+from imutils.video import FPS
 
 # Add config path
 current_dir = os.path.dirname(__file__)
 config_dir = os.path.join(current_dir, '../')
 sys.path.append(config_dir)
 import gui_app.config as cf
+from deploy.models import get_speaker_model
+from deploy.capture import get_capture_service
+from deploy.gallery import load_face_gallery
+from deploy.matcher import get_face_matcher
+from deploy.face_detection import get_face_detector
+from deploy.inference_pool import get_inference_pool
+from deploy.face_tracking import IoUTracker, TRACK_REFRESH_FRAMES
+from deploy.face_quality import assess_faces, select_sharpest
+from deploy.voice_gallery import load_voice_gallery
+from deploy.voice_stream import recognize_voice_stream, to_model_waveform
+from deploy.metrics import span, observe, increment
 
 # Authentication thresholds
 VOICE_SIMILARITY_THRESHOLD = 0.10
 FACE_RECOGNITION_TIMEOUT = 3.0
 VOICE_RECORDING_DURATION = 6.0
 
+# Streaming face recognition early-exit criterion
+FACE_EARLY_EXIT_FRAMES = 3         # Consecutive frames agreeing on the best identity
+FACE_EARLY_EXIT_CONFIDENCE = 1.5   # Accumulated confidence for that identity
+CAMERA_WARMUP_TIMEOUT = 2.0        # Max wait for the first camera frame
+FACE_QUALITY_CANDIDATE_FRAMES = 4  # Buffered frames ranked by sharpness per analysed frame
+
+# Face matches found in one frame (one candidate list per face encoded in it)
+FrameEvidence = namedtuple(
+    "FrameEvidence", ["frame_index", "timestamp", "candidates", "timings", "encoded", "rejected", "faces"]
+)
+
+# Outcome of streaming face recognition
+FaceDecision = namedtuple(
+    "FaceDecision",
+    ["names", "best_name", "confidence", "frames_used", "elapsed", "early_exit", "stage_timings",
+     "quality"]
+)
+
 def initialize_models():
-    """Initialize speaker recognition model
+    """Get the resident speaker recognition model
+    
+    The model is loaded once per process by the model registry and
+    shared between callers, so repeated calls are cheap.
     
     Returns:
-        SpeakerRecognition: Configured ECAPA-TDNN model
+        SharedModel: Thread-safe handle around the ECAPA-TDNN model
     """
-    model_path = f"{cf.me2}/deploy/pretrained_models/spkrec-ecapa-voxceleb"
-    verification = SpeakerRecognition.from_hparams(
-        source="speechbrain/spkrec-ecapa-voxceleb", 
-        savedir=model_path
-    )
-    return verification
+    return get_speaker_model()
 
-def process_faces():
-    """Process facial recognition from video stream
+class FaceEvidenceAccumulator:
+    """Accumulates per-frame face evidence until a confident decision
     
-    Captures frames for specified duration and identifies known faces
-    using pre-trained FaceNet embeddings with cosine similarity.
-    
-    Returns:
-        set: Unique names of recognized individuals
+    Each frame contributes, per identity, a confidence in [0, 1] derived
+    from the match distance (1 at distance 0, 0 at the match tolerance).
+    Only fresh encodings count: frames where tracked faces were not
+    re-encoded neither add confidence nor break the streak. A decision
+    is reached once the same identity has been the best match for enough
+    consecutive encoded frames and its accumulated confidence is high
+    enough.
     """
-    recognized_persons = []
-    current_name = "Unknown"
     
-    # Load pre-trained face encodings
-    encodings_path = f"{cf.me2}/deploy/embeddings/encodings_faces.pickle"
-    print("Loading face encodings...")
+    def __init__(self, tolerance, required_frames=FACE_EARLY_EXIT_FRAMES,
+                 required_confidence=FACE_EARLY_EXIT_CONFIDENCE):
+        self.tolerance = tolerance
+        self.required_frames = required_frames
+        self.required_confidence = required_confidence
+        self.confidence = {}
+        self.recognized = []
+        self.frames = 0
+        self._streak_name = None
+        self._streak = 0
     
-    try:
-        with open(encodings_path, "rb") as f:
-            face_data = pickle.load(f)
-    except FileNotFoundError:
-        print(f"Face encodings not found at {encodings_path}")
-        return set()
+    def add(self, evidence):
+        """Add one frame of evidence
+        
+        Args:
+            evidence (FrameEvidence): Matches found in the frame
+            
+        Returns:
+            bool: True once the early-exit criterion is met
+        """
+        self.frames += 1
+        if evidence.faces and not evidence.encoded:
+            # Tracked faces were not re-encoded: no new evidence this frame
+            return self.is_decided()
+        frame_scores = {}
+        for candidates in evidence.candidates:
+            if not candidates:
+                continue
+            best = candidates[0]
+            score = max(0.0, 1.0 - best.distance / self.tolerance)
+            frame_scores[best.name] = max(frame_scores.get(best.name, 0.0), score)
+        
+        for name, score in frame_scores.items():
+            self.confidence[name] = self.confidence.get(name, 0.0) + score
+            if name not in self.recognized:
+                self.recognized.append(name)
+                print(f"Recognized: {name}")
+        
+        # Track how many consecutive frames agree on the same best identity
+        frame_best = max(frame_scores, key=frame_scores.get) if frame_scores else None
+        if frame_best is not None and frame_best == self._streak_name:
+            self._streak += 1
+        else:
+            self._streak_name = frame_best
+            self._streak = 1 if frame_best is not None else 0
+        
+        return self.is_decided()
     
-    # Initialize video stream
-    video_stream = VideoStream(cf.camurl).start()
-    time.sleep(2.0)  # Allow camera to warm up
+    def is_decided(self):
+        """Check the confidence/consistency early-exit criterion"""
+        return (
+            self._streak_name is not None
+            and self._streak >= self.required_frames
+            and self.confidence[self._streak_name] >= self.required_confidence
+        )
     
-    fps_counter = FPS().start()
+    @property
+    def best_name(self):
+        """Identity with the highest accumulated confidence"""
+        if not self.confidence:
+            return "Unknown"
+        return max(self.confidence, key=self.confidence.get)
+
+def iter_face_evidence(frame_source, face_matcher, timeout=FACE_RECOGNITION_TIMEOUT, detector=None,
+                       face_encoder=None):
+    """Yield per-frame face match evidence from a frame source
+    
+    Only frames newer than the last one processed are analysed, so each
+    yielded item corresponds to a new camera frame. Faces are tracked
+    across frames and only re-encoded when they move or their refresh
+    interval expires; candidates are the per-track identity votes of
+    the tracks encoded in that frame, so each encoding is counted as
+    evidence exactly once.
+    When several frames arrived since the last one processed, the
+    sharpest is analysed, and faces failing the quality gate are not
+    encoded.
+    
+    Args:
+        frame_source: Source with ``wait_for_frame(after_sequence, timeout)``,
+            such as a CaptureService or a FrameSequence
+        face_matcher (FaceMatcher): Gallery matcher
+        timeout (float): Maximum seconds to read frames for
+        detector (FaceDetector): Detection cascade, defaults to the configured one
+        face_encoder: ``(rgb_frame, boxes) -> encodings`` callable, defaults
+            to the inference pool or ``face_recognition.face_encodings``
+        
+    Yields:
+        FrameEvidence: Track candidates for each face encoded in the frame,
+        the seconds spent in each stage, ``(identity, FaceQuality)`` for
+        each face encoded, the number of faces rejected by the quality
+        gate and the number of faces tracked in the frame
+    """
+    # Detection and encoding run in the worker processes when the pool is enabled
+    inference_pool = get_inference_pool()
+    if inference_pool is not None:
+        detector = detector or inference_pool
+        face_encoder = face_encoder or inference_pool.encode
+    detector = detector or get_face_detector()
+    face_encoder = face_encoder or face_recognition.face_encodings
+    tracker = IoUTracker()
+    refresh_frames = TRACK_REFRESH_FRAMES if cf.FACE_TRACKING else 1
     start_time = time.time()
+    last_sequence = max(-1, frame_source.latest_sequence - 1)
+    frame_index = 0
     
-    # Process frames for specified duration
-    while (time.time() - start_time) < FACE_RECOGNITION_TIMEOUT:
-        frame = video_stream.read()
-        if frame is None:
+    while True:
+        remaining = timeout - (time.time() - start_time)
+        if remaining <= 0:
+            break
+        stage_start = time.time()
+        item = frame_source.wait_for_frame(last_sequence, remaining)
+        read_time = time.time() - stage_start
+        if item is None:
+            if frame_source.exhausted:
+                break
             continue
-            
-        # Preprocess frame
-        frame = imutils.resize(frame, width=500)
+        
+        # Rank the frames buffered since the last one processed, keep the sharpest
+        stage_start = time.time()
+        newest_sequence = item[2]
+        buffered = [
+            buffered_item for buffered_item in
+            frame_source.latest(min(newest_sequence - last_sequence, FACE_QUALITY_CANDIDATE_FRAMES))
+            if buffered_item[2] > last_sequence
+        ] or [item]
+        frame, _, _ = select_sharpest(buffered)
+        last_sequence = newest_sequence
+        select_time = time.time() - stage_start
+        
+        stage_start = time.time()
         rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        convert_time = time.time() - stage_start
         
-        # Detect faces and compute encodings
-        face_locations = face_recognition.face_locations(rgb_frame)
-        face_encodings = face_recognition.face_encodings(rgb_frame, face_locations)
+        # Cheap proposals on a downscaled frame, optional CNN on crops only
+        detections = detector.detect(rgb_frame)
+        timings = dict(detections.timings)
+        timings["read"] = read_time
+        timings["select"] = select_time
+        timings["convert"] = convert_time
         
-        # Match faces against known encodings
-        for encoding in face_encodings:
-            matches = face_recognition.compare_faces(face_data["encodings"], encoding)
-            name = "Unknown"
-            
-            if True in matches:
-                # Find best match using voting
-                matched_indices = [i for i, match in enumerate(matches) if match]
-                name_counts = {}
-                
-                for i in matched_indices:
-                    candidate_name = face_data["names"][i]
-                    name_counts[candidate_name] = name_counts.get(candidate_name, 0) + 1
-                
-                name = max(name_counts, key=name_counts.get)
-                
-                # Add new recognition
-                if current_name != name:
-                    current_name = name
-                    recognized_persons.append(name)
-                    print(f"Recognized: {name}")
+        # Link detections to tracks; only new or moved tracks need encoding
+        tracks = tracker.update(detections.locations)
+        due = [track for track in tracks if track.needs_encoding(frame_index, refresh_frames)]
+        
+        # Quality gate: skip blurry, dark, tiny or off-angle faces
+        stage_start = time.time()
+        qualities = assess_faces(rgb_frame, [track.box for track in due])
+        stale = [(track, quality) for track, quality in zip(due, qualities) if track.accepts(quality)]
+        timings["quality"] = time.time() - stage_start
+        
+        # Encode at full resolution from the detected boxes
+        stage_start = time.time()
+        face_encodings = face_encoder(rgb_frame, [track.box for track, _ in stale]) if stale else []
+        timings["encode"] = time.time() - stage_start
         
-        fps_counter.update()
+        # Match the re-encoded faces against the gallery in one batch
+        stage_start = time.time()
+        for (track, quality), candidates in zip(stale, face_matcher.match(face_encodings)):
+            track.add_match(candidates, frame_index, face_matcher.tolerance, quality)
+        timings["match"] = time.time() - stage_start
+        
+        for stage, seconds in timings.items():
+            observe(f"face_{stage}", seconds)
+        
+        yield FrameEvidence(
+            frame_index, time.time() - start_time, [track.candidates() for track, _ in stale], timings,
+            [(track.identity or "Unknown", quality) for track, quality in stale], len(due) - len(stale),
+            len(tracks)
+        )
+        frame_index += 1
+
+def recognize_faces(timeout=FACE_RECOGNITION_TIMEOUT, early_exit=True, cancel_event=None,
+                    frame_source=None, face_gallery=None, face_encoder=None):
+    """Run streaming facial recognition with optional early exit
+    
+    Stops as soon as the accumulated evidence is confident and
+    consistent, when the timeout expires, when the frame source runs
+    out of frames or when ``cancel_event`` is set.
+    
+    Args:
+        timeout (float): Maximum seconds to analyse frames for
+        early_exit (bool): Stop on a confident decision before the timeout
+        cancel_event (threading.Event): Set by another thread to abort
+        frame_source: Frames to analyse (e.g. a FrameSequence of uploaded
+            frames), defaults to the shared capture service of ``cf.camurl``
+        face_gallery (FaceGallery): Gallery to match against, defaults to
+            the resident one
+        face_encoder: ``(rgb_frame, boxes) -> encodings`` callable, e.g. a
+            door's handle on the shared encoding batcher
+        
+    Returns:
+        FaceDecision: Recognized names, best identity, confidence, frames used,
+        stage timings and the best face quality per identity
+    """
+    # Get face gallery (loaded once, reloaded only when retrained)
+    if face_gallery is None:
+        face_gallery = load_face_gallery()
+    if face_gallery is None or len(face_gallery) == 0:
+        print("Face gallery not found - train the face model first")
+        return FaceDecision(set(), "Unknown", 0.0, 0, 0.0, False, {}, {})
+    face_matcher = get_face_matcher(face_gallery)
+    accumulator = FaceEvidenceAccumulator(face_matcher.tolerance)
+    
+    if frame_source is None:
+        # Shared capture service keeps the camera open between attempts
+        frame_source = get_capture_service(cf.camurl)
+        if frame_source.wait_for_frame(-1, CAMERA_WARMUP_TIMEOUT) is None:
+            print("Camera did not deliver a frame during warm-up")
+    
+    fps_counter = FPS().start()
+    decided = False
+    stage_totals = {}
+    faces_seen = 0
+    faces_encoded = 0
+    faces_rejected = 0
+    best_quality = {}
+    
+    try:
+        for evidence in iter_face_evidence(frame_source, face_matcher, timeout,
+                                           face_encoder=face_encoder):
+            if cancel_event is not None and cancel_event.is_set():
+                print("Face recognition cancelled")
+                break
+            fps_counter.update()
+            for stage, seconds in evidence.timings.items():
+                stage_totals[stage] = stage_totals.get(stage, 0.0) + seconds
+            faces_seen += evidence.faces
+            faces_encoded += len(evidence.encoded)
+            faces_rejected += evidence.rejected
+            for name, quality in evidence.encoded:
+                if name not in best_quality or quality.score > best_quality[name].score:
+                    best_quality[name] = quality
+            if accumulator.add(evidence) and early_exit:
+                decided = True
+                break
+    finally:
+        fps_counter.stop()
+    observe("face_total", fps_counter.elapsed())
+    
+    print(f"Face recognition completed - Elapsed: {fps_counter.elapsed():.2f}s, "
+          f"FPS: {fps_counter.fps():.2f}, Frames: {accumulator.frames}, Early exit: {decided}")
+    
+    # Average milliseconds per frame for each stage
+    stage_timings = {
+        stage: 1000.0 * total / max(1, accumulator.frames) for stage, total in stage_totals.items()
+    }
+    if stage_timings:
+        print("Face stage timings (ms/frame): " +
+              ", ".join(f"{stage} {ms:.1f}" for stage, ms in stage_timings.items()))
+    print(f"Face tracking: {faces_encoded} encodings for {faces_seen} detections, "
+          f"{faces_rejected} rejected by the quality gate")
+    
+    best_name = accumulator.best_name
+    return FaceDecision(
+        set(accumulator.recognized),
+        best_name,
+        accumulator.confidence.get(best_name, 0.0),
+        accumulator.frames,
+        fps_counter.elapsed(),
+        decided,
+        stage_timings,
+        best_quality,
+    )
+
+def process_faces(early_exit=True):
+    """Process facial recognition from video stream
     
-    # Cleanup
-    fps_counter.stop()
-    print(f"Face recognition completed - Elapsed: {fps_counter.elapsed():.2f}s, FPS: {fps_counter.fps():.2f}")
-    cv2.destroyAllWindows()
-    video_stream.stop()
+    Analyses frames until a confident match is found or the timeout
+    expires, identifying known faces against the resident face gallery.
     
-    return set(recognized_persons)
+    Args:
+        early_exit (bool): Stop on a confident decision before the timeout
+    
+    Returns:
+        set: Unique names of recognized individuals
+    """
+    return recognize_faces(early_exit=early_exit).names
 
-def record_audio():
+def _wait_for_recording(cancel_event=None):
+    """Wait for the current sounddevice recording, stopping it on cancel
+    
+    Returns:
+        bool: True if the recording completed, False if it was cancelled
+    """
+    if cancel_event is None:
+        sd.wait()
+        return True
+    
+    stream = sd.get_stream()
+    while stream.active:
+        if cancel_event.wait(0.05):
+            sd.stop()
+            return False
+    sd.wait()
+    return True
+
+def record_audio(cancel_event=None, device=None):
     """Record audio sample for voice recognition
     
-    Records audio for specified duration at 44.1kHz sample rate.
+    Records audio for specified duration at ``cf.AUDIO_SAMPLE_RATE``
+    and keeps it in memory. With ``cf.VOICE_DEBUG_CAPTURE`` enabled
+    a copy is also written to ``deploy/cachaud`` for inspection.
+    
+    Args:
+        cancel_event (threading.Event): Set by another thread to abort
+        device: Input device, defaults to ``cf.AUDIO_INPUT_DEVICE``
     
     Returns:
-        str: Path to recorded audio file
+        tuple: (recording, sample_rate), None if cancelled
     """
-    sample_rate = 44100
+    sample_rate = cf.AUDIO_SAMPLE_RATE
     duration = VOICE_RECORDING_DURATION
     
     print(f"Recording audio for {duration} seconds...")
-    recording = sd.rec(int(duration * sample_rate), samplerate=sample_rate, channels=2)
-    sd.wait()  # Wait for recording to complete
+    with span("audio_capture"):
+        recording = sd.rec(int(duration * sample_rate), samplerate=sample_rate, channels=2,
+                           dtype="float32",
+                           device=cf.AUDIO_INPUT_DEVICE if device is None else device)
+        completed = _wait_for_recording(cancel_event)
+    if not completed:
+        print("Voice recording cancelled")
+        return None
+    
+    if cf.VOICE_DEBUG_CAPTURE:
+        _save_debug_audio(recording, sample_rate)
     
-    # Ensure cache directory exists
+    return recording, sample_rate
+
+def _save_debug_audio(recording, sample_rate):
+    """Write a recording to deploy/cachaud (debug capture only)"""
     cache_dir = f"{cf.me2}/deploy/cachaud"
     os.makedirs(cache_dir, exist_ok=True)
-    
-    audio_path = f"{cache_dir}/recorded_audio.wav"
-    sf.write(audio_path, recording, sample_rate)
-    
-    return audio_path
+    audio_path = f"{cache_dir}/recorded_audio_{time.strftime('%Y%m%d_%H%M%S')}.wav"
+    try:
+        sf.write(audio_path, recording, sample_rate)
+        print(f"Debug audio saved to {audio_path}")
+    except Exception as e:
+        print(f"Warning: Could not save debug audio: {e}")
 
-def extract_voice_embedding(audio_path, verification_model):
-    """Extract voice embedding from audio file
+def extract_voice_embedding(recording, sample_rate, verification_model):
+    """Extract voice embedding from an in-memory recording
     
     Args:
-        audio_path (str): Path to audio file
+        recording (np.ndarray): Samples of shape (frames,) or (frames, channels)
+        sample_rate (int): Sample rate of ``recording``
         verification_model: SpeakerRecognition model
         
     Returns:
         torch.Tensor: Voice embedding vector
     """
-    waveform = verification_model.load_audio(audio_path)
-    batch = waveform.unsqueeze(0)
-    embedding = verification_model.encode_batch(batch, None, normalize=False)
+    with span("voice_embedding"):
+        # Channel mixdown and resampling to the model's mono 16kHz input
+        waveform = to_model_waveform(recording, sample_rate)
+        batch = waveform.unsqueeze(0)
+        embedding = verification_model.encode_batch(batch, None, normalize=False)
     return embedding
 
-def process_voice(verification_model):
-    """Process voice recognition and speaker identification
-    
-    Records audio sample and compares against stored voice embeddings
-    using cosine similarity with configurable threshold.
+def identify_voice(recording, sample_rate, verification_model, return_similarity=False):
+    """Identify the speaker of an in-memory recording
     
     Args:
+        recording (np.ndarray): Samples of shape (frames,) or (frames, channels)
+        sample_rate (int): Sample rate of ``recording``
         verification_model: SpeakerRecognition model
+        return_similarity (bool): Also return the best cosine similarity
         
     Returns:
-        tuple: (is_authenticated, speaker_name)
+        tuple: (is_authenticated, speaker_name), plus the similarity
+        when ``return_similarity`` is set
     """
-    # Record new audio sample
-    audio_path = record_audio()
-    
+    max_similarity = 0.0
     try:
         # Extract embedding from recorded audio
-        current_embedding = extract_voice_embedding(audio_path, verification_model)
-        
-        # Load stored voice embeddings
-        embeddings_path = f"{cf.me2}/deploy/embeddings/encodings_voices.pickle"
-        with open(embeddings_path, "rb") as f:
-            stored_embeddings = pickle.load(f)
+        current_embedding = extract_voice_embedding(recording, sample_rate, verification_model)
         
-        # Find best match
-        max_similarity = 0
-        identified_speaker = "Unknown"
-        is_authenticated = False
+        # Get voice gallery (loaded once, reloaded only when retrained)
+        voice_gallery = load_voice_gallery()
+        if voice_gallery is None:
+            raise FileNotFoundError("Voice gallery not found - train the voice model first")
         
-        for user_data in stored_embeddings:
-            username = user_data[0]
-            user_embeddings = user_data[1]
-            
-            for stored_embedding in user_embeddings:
-                similarity = verification_model.similarity(stored_embedding, current_embedding)
-                
-                if similarity > VOICE_SIMILARITY_THRESHOLD and similarity > max_similarity:
-                    max_similarity = similarity
-                    identified_speaker = username
-                    is_authenticated = True
+        # Score all users with one cosine product, re-ranking the best few
+        with span("voice_match"):
+            is_authenticated, identified_speaker, max_similarity = voice_gallery.identify(
+                current_embedding, VOICE_SIMILARITY_THRESHOLD
+            )
         
         print(f"Voice recognition: {identified_speaker} (similarity: {max_similarity:.3f})")
         
@@ -208,12 +475,50 @@ def process_voice(verification_model):
         is_authenticated = False
         identified_speaker = "Unknown"
     
-    finally:
-        # Cleanup audio files
-        _cleanup_audio_files([audio_path])
-    
+    if return_similarity:
+        return is_authenticated, identified_speaker, max_similarity
     return is_authenticated, identified_speaker
 
+def process_voice(verification_model, cancel_event=None, return_similarity=False, device=None):
+    """Process voice recognition and speaker identification
+    
+    Streams microphone audio through voice-activity detection and
+    stops as soon as the speaker is stable (``cf.VOICE_STREAMING``),
+    or records a fixed-length sample; either way the embedding is
+    compared against the voice gallery using cosine similarity.
+    
+    Args:
+        verification_model: SpeakerRecognition model
+        cancel_event (threading.Event): Set by another thread to abort
+        return_similarity (bool): Also return the best cosine similarity
+        device: Microphone of the door, defaults to ``cf.AUDIO_INPUT_DEVICE``
+        
+    Returns:
+        tuple: (is_authenticated, speaker_name), plus the similarity
+        when ``return_similarity`` is set
+    """
+    if cf.VOICE_STREAMING:
+        try:
+            # Decide while the user speaks, stopping once the speaker is stable
+            with span("voice_stream"):
+                decision = recognize_voice_stream(
+                    verification_model, VOICE_SIMILARITY_THRESHOLD, cancel_event=cancel_event,
+                    device=device
+                )
+            result = (decision.is_authenticated, decision.speaker, decision.similarity)
+        except Exception as e:
+            print(f"Voice processing error: {e}")
+            result = (False, "Unknown", 0.0)
+        return result if return_similarity else result[:2]
+    
+    # Record new audio sample (kept in memory)
+    recorded = record_audio(cancel_event, device)
+    if recorded is None:
+        return (False, "Unknown", 0.0) if return_similarity else (False, "Unknown")
+    
+    recording, sample_rate = recorded
+    return identify_voice(recording, sample_rate, verification_model, return_similarity)
+
 def get_database_voices():
     """Retrieve voice samples from dataset directory
     
@@ -242,31 +547,6 @@ def get_database_voices():
     
     return voices_labeled
 
-def _cleanup_audio_files(file_paths):
-    """Clean up temporary audio files
-    
-    Args:
-        file_paths (list): List of file paths to remove
-    """
-    for file_path in file_paths:
-        try:
-            if os.path.exists(file_path):
-                os.remove(file_path)
-        except Exception as e:
-            print(f"Warning: Could not remove {file_path}: {e}")
-    
-    # Also clean up any .wav files in the main directory
-    try:
-        cleanup_cmd = cmd.Popen(
-            [f"rm -f {cf.me2}/*.wav"], 
-            stdout=cmd.PIPE, 
-            stderr=cmd.PIPE, 
-            shell=True
-        )
-        cleanup_cmd.wait()
-    except Exception as e:
-        print(f"Warning: Cleanup command failed: {e}")
-
 def authenticate_user(face_names, voice_speaker):
     """Combine face and voice authentication results
     
@@ -277,6 +557,17 @@ def authenticate_user(face_names, voice_speaker):
     Returns:
         tuple: (is_authenticated, authenticated_user)
     """
+    with span("fusion"):
+        is_authenticated, user = _fuse_decisions(face_names, voice_speaker)
+    
+    if is_authenticated:
+        increment("authentications", result="success")
+    else:
+        increment("authentications", result="mismatch" if user == "Mismatch" else "rejected")
+    return is_authenticated, user
+
+def _fuse_decisions(face_names, voice_speaker):
+    """Decision rule of authenticate_user"""
     if not face_names or voice_speaker == "Unknown":
         return False, "Unknown"
     
@@ -0,0 +1,169 @@
+"""Cross-Camera Face Encoding Batcher
+
+Shares one face encoder between the doors of a site:
+- Callers align their faces (5-point landmarks, 150 px chips) in their
+  own thread and queue the chips under their door's name
+- One encoder thread merges queued chips from several cameras into a
+  single batched ``compute_face_descriptor`` call
+- Batches are filled fairly: one request per door per pass, doors
+  closest to their latency deadline first
+- With the inference pool enabled, alignment runs in the worker
+  processes and each batch is split across them
+"""
+
+import os
+import sys
+import time
+import threading
+from collections import deque
+from concurrent.futures import Future
+
+import numpy as np
+
+# Add config path
+current_dir = os.path.dirname(__file__)
+config_dir = os.path.join(current_dir, '../')
+sys.path.append(config_dir)
+import gui_app.config as cf
+from modele.chip_store import extract_chips, encode_chips
+from deploy.metrics import observe, increment
+from deploy.inference_pool import get_inference_pool
+
+class _EncodeRequest:
+    """Chips of one frame waiting for the encoder"""
+
+    __slots__ = ("door", "chips", "deadline", "future")
+
+    def __init__(self, door, chips, deadline):
+        self.door = door
+        self.chips = chips
+        self.deadline = deadline
+        self.future = Future()
+
+class FaceEncodingBatcher:
+    """Batches face encodings from several doors into shared encoder calls"""
+
+    def __init__(self, max_batch=None, max_wait=None):
+        """
+        Args:
+            max_batch (int): Faces per encoder call, defaults to ``cf.ENCODER_BATCH_SIZE``
+            max_wait (float): Seconds to wait for other doors' faces,
+                defaults to ``cf.ENCODER_BATCH_WAIT_MS``
+        """
+        self.max_batch = max_batch or cf.ENCODER_BATCH_SIZE
+        self.max_wait = cf.ENCODER_BATCH_WAIT_MS / 1000.0 if max_wait is None else max_wait
+        self._queues = {}
+        self._pending_faces = 0
+        self._condition = threading.Condition()
+        self._thread = None
+        self._pool = get_inference_pool()
+
+        # Counters
+        self.batches = 0
+        self.faces = 0
+        self.multi_door_batches = 0
+
+    def encode(self, door, rgb_frame, boxes, deadline=None):
+        """Encode the faces of one frame through the shared encoder
+
+        Same contract as ``face_recognition.face_encodings(rgb_frame, boxes)``.
+
+        Args:
+            door (str): Door the frame comes from
+            rgb_frame (np.ndarray): RGB frame
+            boxes (list): (top, right, bottom, left) face boxes
+            deadline (float): Epoch time by which the door's attempt should
+                finish; earlier deadlines are encoded first
+
+        Returns:
+            list: 128-d encodings, one per box
+        """
+        if not boxes:
+            return []
+        chips, _ = (self._pool.extract_chips if self._pool else extract_chips)(rgb_frame, boxes)
+        request = _EncodeRequest(door, chips, float("inf") if deadline is None else deadline)
+
+        with self._condition:
+            self._queues.setdefault(door, deque()).append(request)
+            self._pending_faces += len(chips)
+            self._ensure_thread()
+            self._condition.notify_all()
+        return list(request.future.result())
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="face-encoder", daemon=True)
+            self._thread.start()
+
+    def _take_batch(self):
+        """Fair batch: one request per door per pass, earliest deadline first"""
+        batch = []
+        size = 0
+        while size < self.max_batch:
+            heads = sorted((queue[0].deadline, door) for door, queue in self._queues.items() if queue)
+            if not heads:
+                break
+            for _, door in heads:
+                request = self._queues[door].popleft()
+                batch.append(request)
+                size += len(request.chips)
+                if size >= self.max_batch:
+                    break
+        self._pending_faces -= size
+        return batch
+
+    def _run(self):
+        """Encoder thread"""
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._pending_faces > 0)
+                # Give other cameras a moment to contribute faces
+                wait_until = time.time() + self.max_wait
+                while self._pending_faces < self.max_batch:
+                    remaining = wait_until - time.time()
+                    if remaining <= 0 or not self._condition.wait(remaining):
+                        break
+                batch = self._take_batch()
+
+            start_time = time.time()
+            try:
+                chips = np.concatenate([request.chips for request in batch])
+                encodings = self._pool.encode_chips(chips) if self._pool else encode_chips(chips)
+            except Exception as e:
+                for request in batch:
+                    request.future.set_exception(e)
+                continue
+            observe("face_encode_batch", time.time() - start_time)
+
+            offset = 0
+            for request in batch:
+                request.future.set_result(encodings[offset:offset + len(request.chips)])
+                offset += len(request.chips)
+
+            self.batches += 1
+            self.faces += offset
+            if len({request.door for request in batch}) > 1:
+                self.multi_door_batches += 1
+                increment("multi_door_encoder_batches")
+
+    def stats(self):
+        """Batching counters for monitoring"""
+        return {
+            "batches": self.batches,
+            "faces": self.faces,
+            "mean_batch": self.faces / self.batches if self.batches else 0.0,
+            "multi_door_batches": self.multi_door_batches,
+            "pending_faces": self._pending_faces,
+        }
+
+# One encoder per process, shared by every door
+_batcher = None
+_batcher_lock = threading.Lock()
+
+def get_encoding_batcher():
+    """Get the process-wide face encoding batcher"""
+    global _batcher
+    with _batcher_lock:
+        if _batcher is None:
+            _batcher = FaceEncodingBatcher()
+        return _batcher
@@ -0,0 +1,230 @@
+"""Hot Enrollment for Biometric Authentication
+
+Adds or re-enrolls a single user without a full retrain:
+- Encodes only that user's face images and voice samples
+- Builds a new gallery from the current one (copy-on-write), so
+  authentications in progress keep using the old gallery
+- Replaces the gallery files atomically under a cross-process lock;
+  running decision processes pick them up on their next attempt
+"""
+
+import os
+import sys
+import time
+import fcntl
+import shutil
+import threading
+from collections import namedtuple
+from contextlib import contextmanager
+
+import cv2
+import numpy as np
+import face_recognition
+
+# Add config path
+current_dir = os.path.dirname(__file__)
+config_dir = os.path.join(current_dir, '../')
+sys.path.append(config_dir)
+import gui_app.config as cf
+from deploy.models import get_speaker_model
+from deploy.gallery import FaceGallery, load_face_gallery, publish_face_gallery, EMBEDDINGS_DIR
+from deploy.voice_gallery import VoiceGallery, load_voice_gallery, publish_voice_gallery
+
+# Enrollment settings
+ENROLLMENT_LOCK_PATH = f"{EMBEDDINGS_DIR}/.enrollment.lock"
+ENROLL_FACE_MODEL = cf.ENROLL_FACE_MODEL  # Detector used for hot enrollment ('hog' or 'cnn')
+
+# Outcome of one enrollment
+EnrollmentResult = namedtuple("EnrollmentResult", ["username", "faces", "voices", "elapsed"])
+
+class UserExistsError(ValueError):
+    """Raised when enrolling a name that is already enrolled without replacing it"""
+
+_enrollment_lock = threading.Lock()
+
+@contextmanager
+def _exclusive_enrollment():
+    """Serialize gallery updates across threads and processes"""
+    os.makedirs(EMBEDDINGS_DIR, exist_ok=True)
+    with _enrollment_lock, open(ENROLLMENT_LOCK_PATH, "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def encode_faces(image_paths, detection_model=ENROLL_FACE_MODEL):
+    """Encode the largest face of each enrollment image
+
+    Only the largest face is kept so bystanders in the background are
+    never enrolled under the user's name.
+
+    Args:
+        image_paths (list): Face image paths
+        detection_model (str): face_recognition detector, 'hog' or 'cnn'
+
+    Returns:
+        list: 128-d encodings, one per usable image
+    """
+    encodings = []
+    for image_path in image_paths:
+        image = cv2.imread(image_path)
+        if image is None:
+            print(f"Enrollment: could not load image {image_path}")
+            continue
+        rgb_image = np.ascontiguousarray(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
+        face_locations = face_recognition.face_locations(rgb_image, model=detection_model)
+        if not face_locations:
+            print(f"Enrollment: no face detected in {image_path}")
+            continue
+        largest = max(face_locations, key=lambda box: (box[2] - box[0]) * (box[1] - box[3]))
+        encodings.extend(face_recognition.face_encodings(rgb_image, [largest]))
+    return encodings
+
+def encode_voices(audio_paths, verification_model):
+    """Encode each enrollment voice sample
+
+    Args:
+        audio_paths (list): Voice sample paths
+        verification_model: Speaker model handle
+
+    Returns:
+        list: Voice embeddings (torch tensors)
+    """
+    embeddings = []
+    for audio_path in audio_paths:
+        try:
+            waveform = verification_model.load_audio(audio_path)
+            embeddings.append(verification_model.encode_batch(waveform.unsqueeze(0), None, normalize=False))
+        except Exception as e:
+            print(f"Enrollment: failed to encode {audio_path}: {e}")
+    return embeddings
+
+def is_enrolled(username):
+    """Check whether a user has face or voice templates in the live galleries"""
+    face_gallery = load_face_gallery()
+    voice_gallery = load_voice_gallery()
+    return ((face_gallery is not None and username in face_gallery.names) or
+            (voice_gallery is not None and username in voice_gallery.names))
+
+def _replace_dataset_files(username, subdir, file_paths):
+    """Move files into the user's dataset directory, replacing its older samples
+
+    Args:
+        username (str): User directory name under the dataset
+        subdir (str): Modality subdirectory (``cf.faces`` or ``cf.voices``)
+        file_paths (list): Files to move
+
+    Returns:
+        list: Paths of the files in the dataset
+    """
+    target_dir = f"{cf.dataset}/{username}{subdir}"
+    if os.path.isdir(target_dir):
+        for name in os.listdir(target_dir):
+            old_path = os.path.join(target_dir, name)
+            if os.path.isfile(old_path):
+                os.remove(old_path)
+    os.makedirs(target_dir, exist_ok=True)
+
+    stored = []
+    for file_path in file_paths:
+        target_path = os.path.join(target_dir, os.path.basename(file_path))
+        shutil.move(file_path, target_path)
+        stored.append(target_path)
+    return stored
+
+def enroll_user(username, image_paths=(), audio_paths=(), verification_model=None, replace=True,
+                store_in_dataset=False):
+    """Add or re-enroll one user in the live galleries
+
+    Existing encodings of ``username`` are replaced for each modality
+    that is supplied. With ``store_in_dataset`` the supplied files also
+    replace that user's dataset samples once the galleries are
+    published, so the next training run sees the same templates. If an approximate face index is configured it
+    becomes stale and matching falls back to exact search until the
+    next training run rebuilds it.
+
+    Args:
+        username (str): User to enroll
+        image_paths (list): Face images of the user
+        audio_paths (list): Voice samples of the user
+        verification_model: Speaker model handle, defaults to the resident one
+        replace (bool): Allow replacing the templates of an enrolled user
+        store_in_dataset (bool): Move the supplied files into ``cf.dataset``
+            after a successful enrollment
+
+    Returns:
+        EnrollmentResult: Number of face and voice embeddings enrolled
+
+    Raises:
+        ValueError: If nothing usable was supplied
+        UserExistsError: If ``username`` is enrolled and ``replace`` is False
+    """
+    start_time = time.time()
+    if not username:
+        raise ValueError("Username is required")
+
+    # Encode outside the lock - this is the slow part
+    face_encodings = encode_faces(image_paths) if image_paths else []
+    voice_embeddings = []
+    if audio_paths:
+        voice_embeddings = encode_voices(audio_paths, verification_model or get_speaker_model())
+
+    if image_paths and not face_encodings:
+        raise ValueError(f"No usable face found in the images for {username}")
+    if audio_paths and not voice_embeddings:
+        raise ValueError(f"No usable voice sample for {username}")
+    if not face_encodings and not voice_embeddings:
+        raise ValueError("No face images or voice samples supplied")
+
+    with _exclusive_enrollment():
+        if not replace and is_enrolled(username):
+            raise UserExistsError(f"User {username} is already enrolled")
+        if face_encodings:
+            face_gallery = load_face_gallery()
+            if face_gallery is None:
+                face_gallery = FaceGallery.from_encodings(face_encodings, [username] * len(face_encodings))
+            else:
+                face_gallery = face_gallery.with_user(username, face_encodings)
+            publish_face_gallery(face_gallery)
+
+        if voice_embeddings:
+            voice_gallery = load_voice_gallery()
+            if voice_gallery is None or voice_gallery.user_count == 0:
+                voice_gallery = VoiceGallery.from_embeddings([(username, voice_embeddings)])
+            else:
+                voice_gallery = voice_gallery.with_user(username, voice_embeddings)
+            publish_voice_gallery(voice_gallery)
+
+        if store_in_dataset:
+            if image_paths:
+                _replace_dataset_files(username, cf.faces, image_paths)
+            if audio_paths:
+                _replace_dataset_files(username, cf.voices, audio_paths)
+
+    elapsed = time.time() - start_time
+    print(f"Enrolled {username}: {len(face_encodings)} faces, {len(voice_embeddings)} voices in {elapsed:.2f}s")
+    return EnrollmentResult(username, len(face_encodings), len(voice_embeddings), elapsed)
+
+def enroll_from_dataset(username):
+    """Enroll a user from their ``cf.dataset`` directory
+
+    Args:
+        username (str): User directory name under the dataset
+
+    Returns:
+        EnrollmentResult: Number of face and voice embeddings enrolled
+    """
+    user_path = os.path.join(cf.dataset, username)
+    faces_dir = f"{user_path}{cf.faces}"
+    voices_dir = f"{user_path}{cf.voices}"
+
+    image_paths = []
+    if os.path.isdir(faces_dir):
+        image_paths = [os.path.join(faces_dir, f) for f in sorted(os.listdir(faces_dir))
+                       if f.lower().endswith(('.jpg', '.jpeg', '.png'))]
+    audio_paths = []
+    if os.path.isdir(voices_dir):
+        audio_paths = [os.path.join(voices_dir, f) for f in sorted(os.listdir(voices_dir))
+                       if f.lower().endswith(('.wav', '.mp3', '.flac'))]
+    return enroll_user(username, image_paths, audio_paths)
@@ -0,0 +1,155 @@
+"""Authentication Event Log
+
+Audit trail of authentication attempts:
+- Append-only JSON Lines file, one event per attempt
+- Size-based rotation (auth_events.jsonl -> .1 -> .2 ...)
+- In-memory ring buffer of recent events for the GUI and web endpoints
+- ``record`` is O(1) and never touches the disk: a background writer
+  thread serialises and writes the queued events
+"""
+
+import os
+import sys
+import json
+import time
+import queue
+import atexit
+import threading
+from collections import deque
+
+# Add config path
+current_dir = os.path.dirname(__file__)
+config_dir = os.path.join(current_dir, '../')
+sys.path.append(config_dir)
+import gui_app.config as cf
+
+EVENT_LOG_PATH = f"{cf.EVENT_LOG_DIR}/auth_events.jsonl"
+WRITER_FLUSH_INTERVAL = 1.0   # Seconds between flushes while events keep arriving
+WRITER_STOP_TIMEOUT = 2.0
+
+_STOP = object()
+
+class EventLog:
+    """Rotating JSONL event log with a ring buffer of recent events"""
+
+    def __init__(self, path=EVENT_LOG_PATH, max_bytes=None, backups=None, ring_size=None):
+        """
+        Args:
+            path (str): Active log file
+            max_bytes (int): Rotate once the file exceeds this size,
+                defaults to ``cf.EVENT_LOG_MAX_MB``
+            backups (int): Rotated files kept, defaults to ``cf.EVENT_LOG_BACKUPS``
+            ring_size (int): Events kept in memory, defaults to ``cf.EVENT_LOG_RING_SIZE``
+        """
+        self.path = path
+        self.max_bytes = max_bytes or int(cf.EVENT_LOG_MAX_MB * 1024 * 1024)
+        self.backups = cf.EVENT_LOG_BACKUPS if backups is None else backups
+        self._ring = deque(maxlen=ring_size or cf.EVENT_LOG_RING_SIZE)
+        self._queue = queue.SimpleQueue()
+        self._sequence = 0
+        self._lock = threading.Lock()
+        self._writer = None
+        self.dropped = 0
+
+    def record(self, event_type, **fields):
+        """Append an event (non-blocking)
+
+        Args:
+            event_type (str): Event kind, e.g. ``"authentication"``
+            **fields: JSON-serialisable event fields
+
+        Returns:
+            dict: The recorded event, with its sequence number and time
+        """
+        with self._lock:
+            self._sequence += 1
+            event = {"seq": self._sequence, "time": round(time.time(), 3), "type": event_type, **fields}
+            self._ring.append(event)
+        self._queue.put(event)
+        self._ensure_writer()
+        return event
+
+    def recent(self, limit=None):
+        """Most recent events, oldest first"""
+        with self._lock:
+            events = list(self._ring)
+        return events if limit is None else events[-limit:]
+
+    def since(self, sequence):
+        """Events newer than ``sequence`` still held in the ring buffer"""
+        with self._lock:
+            return [event for event in self._ring if event["seq"] > sequence]
+
+    def _ensure_writer(self):
+        if self._writer is None or not self._writer.is_alive():
+            with self._lock:
+                if self._writer is None or not self._writer.is_alive():
+                    self._writer = threading.Thread(target=self._write_loop, name="event-log", daemon=True)
+                    self._writer.start()
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        return open(self.path, "a", encoding="utf-8")
+
+    def _rotate(self, handle):
+        """Shift log.N-1 -> log.N ... log -> log.1 and reopen an empty log"""
+        handle.close()
+        if self.backups > 0:
+            for index in range(self.backups - 1, 0, -1):
+                source = f"{self.path}.{index}"
+                if os.path.exists(source):
+                    os.replace(source, f"{self.path}.{index + 1}")
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        return self._open()
+
+    def _write_loop(self):
+        """Writer thread: serialise, append, flush in batches and rotate"""
+        try:
+            handle = self._open()
+        except OSError as e:
+            print(f"[WARNING] Event log disabled: {e}")
+            return
+        last_flush = time.time()
+        try:
+            while True:
+                try:
+                    event = self._queue.get(timeout=WRITER_FLUSH_INTERVAL)
+                except queue.Empty:
+                    handle.flush()
+                    last_flush = time.time()
+                    continue
+                if event is _STOP:
+                    break
+                try:
+                    handle.write(json.dumps(event, default=str) + "\n")
+                except (OSError, TypeError, ValueError) as e:
+                    self.dropped += 1
+                    print(f"[WARNING] Event not logged: {e}")
+                    continue
+                if time.time() - last_flush >= WRITER_FLUSH_INTERVAL:
+                    handle.flush()
+                    last_flush = time.time()
+                if handle.tell() >= self.max_bytes:
+                    handle = self._rotate(handle)
+        finally:
+            handle.close()
+
+    def close(self):
+        """Write the queued events and stop the writer thread"""
+        if self._writer is not None and self._writer.is_alive():
+            self._queue.put(_STOP)
+            self._writer.join(WRITER_STOP_TIMEOUT)
+
+# Process-wide event log
+_event_log = EventLog()
+atexit.register(_event_log.close)
+
+def get_event_log():
+    """Get the process-wide authentication event log"""
+    return _event_log
+
+def record_event(event_type, **fields):
+    """Append an event to the process-wide log (non-blocking)"""
+    return _event_log.record(event_type, **fields)
@@ -0,0 +1,177 @@
+"""Face Detection Cascade
+
+Two-stage face detection with per-stage timings:
+- Proposal stage: cheap detector (HOG or OpenCV Haar) on a downscaled frame
+- Refinement stage: CNN detector only on padded, upscaled crops around
+  the proposals, or no refinement at all
+- Boxes are returned in full-frame coordinates, in face_recognition's
+  (top, right, bottom, left) order
+"""
+
+import os
+import sys
+import time
+from collections import namedtuple
+
+import cv2
+import numpy as np
+import face_recognition
+
+# Add config path
+current_dir = os.path.dirname(__file__)
+config_dir = os.path.join(current_dir, '../')
+sys.path.append(config_dir)
+import gui_app.config as cf
+
+PROPOSAL_DETECTORS = ("hog", "haar")
+REFINE_DETECTORS = ("none", "cnn")
+
+# Cascade settings
+CROP_PADDING = 0.3          # Crop margin around a proposal, as a fraction of its size
+REFINE_FACE_SIZE = 120      # Crops are upscaled so the face is at least this many pixels wide
+HAAR_MIN_NEIGHBORS = 4
+
+# Detected faces and the time spent in each stage (seconds)
+Detections = namedtuple("Detections", ["locations", "timings"])
+
+def _scale_box(box, scale, offset_x=0, offset_y=0):
+    """Scale a (top, right, bottom, left) box and shift it by an offset"""
+    top, right, bottom, left = box
+    return (int(round(top * scale)) + offset_y, int(round(right * scale)) + offset_x,
+            int(round(bottom * scale)) + offset_y, int(round(left * scale)) + offset_x)
+
+class FaceDetector:
+    """Configurable proposal + refinement face detection cascade"""
+
+    def __init__(self, proposal="hog", refine="none", proposal_width=500):
+        """
+        Args:
+            proposal (str): Proposal detector, 'hog' or 'haar'
+            refine (str): Refinement detector on crops, 'cnn' or 'none'
+            proposal_width (int): Frame width used by the proposal stage,
+                0 to run it at full resolution
+        """
+        if proposal not in PROPOSAL_DETECTORS:
+            raise ValueError(f"Unknown proposal detector '{proposal}', expected one of {PROPOSAL_DETECTORS}")
+        if refine not in REFINE_DETECTORS:
+            raise ValueError(f"Unknown refine detector '{refine}', expected one of {REFINE_DETECTORS}")
+
+        self.proposal = proposal
+        self.refine = refine
+        self.proposal_width = proposal_width
+        self._haar = None
+
+        # Cumulative per-stage statistics
+        self.frames = 0
+        self.totals = {"proposal": 0.0, "refine": 0.0}
+
+    def _haar_classifier(self):
+        if self._haar is None:
+            self._haar = cv2.CascadeClassifier(
+                os.path.join(cv2.data.haarcascades, "haarcascade_frontalface_default.xml")
+            )
+        return self._haar
+
+    def _propose(self, rgb_small):
+        """Proposal boxes in downscaled-frame coordinates"""
+        if self.proposal == "hog":
+            return face_recognition.face_locations(rgb_small, model="hog")
+
+        gray = cv2.cvtColor(rgb_small, cv2.COLOR_RGB2GRAY)
+        faces = self._haar_classifier().detectMultiScale(
+            gray, scaleFactor=1.1, minNeighbors=HAAR_MIN_NEIGHBORS, minSize=(24, 24)
+        )
+        return [(int(y), int(x + w), int(y + h), int(x)) for x, y, w, h in faces]
+
+    def _refine(self, rgb_frame, box):
+        """Run the CNN on an upscaled crop around a proposal
+
+        Returns:
+            tuple: Refined full-frame box, or None if the CNN rejects it
+        """
+        height, width = rgb_frame.shape[:2]
+        top, right, bottom, left = box
+        pad = int(max(bottom - top, right - left) * CROP_PADDING)
+        crop_top, crop_left = max(0, top - pad), max(0, left - pad)
+        crop_bottom, crop_right = min(height, bottom + pad), min(width, right + pad)
+        crop = rgb_frame[crop_top:crop_bottom, crop_left:crop_right]
+        if crop.size == 0:
+            return None
+
+        scale = max(1.0, REFINE_FACE_SIZE / max(1, right - left))
+        if scale > 1.0:
+            crop = cv2.resize(crop, None, fx=scale, fy=scale, interpolation=cv2.INTER_LINEAR)
+        found = face_recognition.face_locations(
+            np.ascontiguousarray(crop), number_of_times_to_upsample=0, model="cnn"
+        )
+        if not found:
+            return None
+        # Keep the detection closest in size to the proposal (a larger
+        # neighbouring face caught by the padding is not the proposed one)
+        proposal_area = (bottom - top) * (right - left) * scale * scale
+        best = min(found, key=lambda b: abs((b[2] - b[0]) * (b[1] - b[3]) - proposal_area))
+        return _scale_box(best, 1.0 / scale, crop_left, crop_top)
+
+    def detect(self, rgb_frame):
+        """Detect faces in an RGB frame
+
+        Args:
+            rgb_frame (np.ndarray): RGB image (full resolution)
+
+        Returns:
+            Detections: Full-frame boxes and per-stage timings
+        """
+        start_time = time.time()
+        height, width = rgb_frame.shape[:2]
+        scale = 1.0
+        rgb_small = rgb_frame
+        if self.proposal_width and width > self.proposal_width:
+            scale = width / self.proposal_width
+            rgb_small = cv2.resize(rgb_frame, (self.proposal_width, int(round(height / scale))),
+                                   interpolation=cv2.INTER_AREA)
+
+        proposals = [_scale_box(box, scale) for box in self._propose(rgb_small)]
+        proposal_time = time.time() - start_time
+
+        refine_start = time.time()
+        if self.refine == "cnn":
+            locations = [refined for refined in (self._refine(rgb_frame, box) for box in proposals)
+                         if refined is not None]
+        else:
+            locations = proposals
+        refine_time = time.time() - refine_start
+
+        self.frames += 1
+        self.totals["proposal"] += proposal_time
+        self.totals["refine"] += refine_time
+        return Detections(locations, {"proposal": proposal_time, "refine": refine_time})
+
+    def stats(self):
+        """Average milliseconds per frame for each stage"""
+        frames = max(1, self.frames)
+        return {stage: 1000.0 * total / frames for stage, total in self.totals.items()}
+
+# One detector per configuration and process (workers build their own)
+_detectors = {}
+
+def get_face_detector(proposal=None, refine=None, proposal_width=None):
+    """Get a cached detector, defaulting to the door-node configuration
+
+    Args:
+        proposal (str): Proposal detector, defaults to ``cf.FACE_DETECTOR_PROPOSAL``
+        refine (str): Refinement detector, defaults to ``cf.FACE_DETECTOR_REFINE``
+        proposal_width (int): Proposal frame width, defaults to ``cf.FACE_DETECTOR_WIDTH``
+
+    Returns:
+        FaceDetector: Shared detector
+    """
+    key = (
+        cf.FACE_DETECTOR_PROPOSAL if proposal is None else proposal,
+        cf.FACE_DETECTOR_REFINE if refine is None else refine,
+        cf.FACE_DETECTOR_WIDTH if proposal_width is None else proposal_width,
+    )
+    detector = _detectors.get(key)
+    if detector is None:
+        detector = FaceDetector(*key)
+        _detectors[key] = detector
+    return detector
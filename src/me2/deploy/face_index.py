@@ -0,0 +1,642 @@
+"""Nearest-Neighbour Indexes for the Face Gallery
+
+Pluggable search structures over the packed face gallery:
+- FlatIndex: exact brute-force scan (baseline)
+- IVFIndex: k-means partitioned inverted lists, probes a few partitions
+- HNSWIndex: navigable neighbour graph (hnswlib when installed, NumPy otherwise)
+- Recall/latency benchmarking of any index against the exact baseline
+
+Usage:
+    python face_index.py --benchmark
+"""
+
+import os
+import sys
+import time
+import json
+import hashlib
+import argparse
+import heapq
+import tempfile
+import threading
+
+import numpy as np
+
+try:
+    import hnswlib
+    HNSWLIB_AVAILABLE = True
+except ImportError:
+    HNSWLIB_AVAILABLE = False
+
+# Add config path
+current_dir = os.path.dirname(__file__)
+config_dir = os.path.join(current_dir, '../')
+sys.path.append(config_dir)
+import gui_app.config as cf
+
+# Index locations and defaults
+FACE_INDEX_PATH = f"{cf.me2}/deploy/embeddings/faces.index.npz"
+INDEX_TYPES = ("flat", "ivf", "hnsw")
+IVF_DEFAULT_NPROBE = 8
+HNSW_DEFAULT_M = 16
+HNSW_DEFAULT_EF_SEARCH = 64
+KMEANS_ITERATIONS = 20
+_DISTANCE_CHUNK = 4096
+
+def _squared_distances(queries, data, data_norms=None):
+    """Squared euclidean distances between two sets of vectors"""
+    if data_norms is None:
+        data_norms = np.einsum("ij,ij->i", data, data)
+    query_norms = np.einsum("ij,ij->i", queries, queries)
+    squared = query_norms[:, None] + data_norms[None, :] - 2.0 * (queries @ data.T)
+    return np.maximum(squared, 0.0, out=squared)
+
+def _top_k(squared, k):
+    """Indices and squared distances of the k smallest entries per row, sorted"""
+    k = min(k, squared.shape[1])
+    nearest = np.argpartition(squared, k - 1, axis=1)[:, :k]
+    nearest_dist = np.take_along_axis(squared, nearest, axis=1)
+    order = np.argsort(nearest_dist, axis=1)
+    return np.take_along_axis(nearest, order, axis=1), np.take_along_axis(nearest_dist, order, axis=1)
+
+def gallery_fingerprint(gallery):
+    """Content hash of a gallery's encodings, labels and names
+
+    Stored with a saved index so an index built from another version of
+    the gallery (e.g. a user re-enrolled with as many encodings) is
+    never used against this one.
+
+    Args:
+        gallery (FaceGallery): Face gallery
+
+    Returns:
+        str: Hex digest
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(np.ascontiguousarray(gallery.encodings, dtype=np.float32).tobytes())
+    digest.update(np.ascontiguousarray(gallery.labels, dtype=np.int32).tobytes())
+    digest.update(json.dumps(gallery.names).encode("utf-8"))
+    return digest.hexdigest()
+
+def kmeans(data, n_clusters, iterations=KMEANS_ITERATIONS, seed=0):
+    """Lloyd's k-means clustering
+
+    Args:
+        data (np.ndarray): float32 matrix of shape (N, dim)
+        n_clusters (int): Number of clusters
+        iterations (int): Lloyd iterations
+        seed (int): Random seed for centroid initialisation
+
+    Returns:
+        tuple: (centroids (K, dim), assignments (N,))
+    """
+    rng = np.random.default_rng(seed)
+    n_clusters = max(1, min(n_clusters, len(data)))
+    centroids = data[rng.choice(len(data), n_clusters, replace=False)].astype(np.float32)
+
+    for _ in range(iterations):
+        assignments = _assign(data, centroids)
+        counts = np.bincount(assignments, minlength=n_clusters)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignments, data)
+
+        empty = counts == 0
+        centroids[~empty] = sums[~empty] / counts[~empty, None]
+        if empty.any():
+            # Re-seed empty clusters on random points
+            centroids[empty] = data[rng.choice(len(data), int(empty.sum()))]
+
+    return centroids, _assign(data, centroids)
+
+def _assign(data, centroids):
+    """Nearest centroid for every row, computed in chunks"""
+    centroid_norms = np.einsum("ij,ij->i", centroids, centroids)
+    assignments = np.empty(len(data), dtype=np.int32)
+    for start in range(0, len(data), _DISTANCE_CHUNK):
+        chunk = data[start:start + _DISTANCE_CHUNK]
+        assignments[start:start + len(chunk)] = np.argmin(
+            _squared_distances(chunk, centroids, centroid_norms), axis=1
+        )
+    return assignments
+
+class FaceIndex:
+    """Base class for face gallery search structures"""
+
+    kind = None
+    exact = False
+
+    def build(self, encodings):
+        """Index a float32 (N, dim) encoding matrix"""
+        raise NotImplementedError
+
+    def search(self, queries, k):
+        """Find the k nearest gallery rows for each query
+
+        Args:
+            queries (array-like): Query encodings of shape (Q, dim)
+            k (int): Neighbours per query
+
+        Returns:
+            tuple: (distances (Q, k), indices (Q, k)), nearest first
+        """
+        raise NotImplementedError
+
+    def __len__(self):
+        return self.size
+
+    def _state(self):
+        """Arrays and parameters to persist"""
+        raise NotImplementedError
+
+    def save(self, index_path=FACE_INDEX_PATH, fingerprint=""):
+        """Persist the index atomically as an .npz archive
+
+        Args:
+            index_path (str): Archive path
+            fingerprint (str): ``gallery_fingerprint`` of the indexed gallery
+        """
+        os.makedirs(os.path.dirname(index_path) or ".", exist_ok=True)
+        temp_path = f"{index_path}.tmp.npz"
+        np.savez(temp_path, kind=np.array(self.kind), fingerprint=np.array(fingerprint), **self._state())
+        os.replace(temp_path, index_path)
+
+class FlatIndex(FaceIndex):
+    """Exact brute-force index"""
+
+    kind = "flat"
+    exact = True
+
+    def __init__(self):
+        self.encodings = None
+        self.norms = None
+        self.size = 0
+
+    def build(self, encodings):
+        self.encodings = np.ascontiguousarray(encodings, dtype=np.float32)
+        self.norms = np.einsum("ij,ij->i", self.encodings, self.encodings)
+        self.size = len(self.encodings)
+        return self
+
+    def search(self, queries, k):
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        indices, squared = _top_k(_squared_distances(queries, self.encodings, self.norms), k)
+        return np.sqrt(squared), indices
+
+    def _state(self):
+        return {}
+
+    @classmethod
+    def _from_state(cls, state, encodings):
+        return cls().build(encodings)
+
+class IVFIndex(FaceIndex):
+    """Inverted-file index over k-means partitions"""
+
+    kind = "ivf"
+
+    def __init__(self, n_lists=None, nprobe=IVF_DEFAULT_NPROBE):
+        """
+        Args:
+            n_lists (int): Number of partitions, defaults to sqrt(N)
+            nprobe (int): Partitions scanned per query
+        """
+        self.n_lists = n_lists
+        self.nprobe = nprobe
+        self.size = 0
+
+    def build(self, encodings):
+        encodings = np.ascontiguousarray(encodings, dtype=np.float32)
+        n_lists = self.n_lists or max(1, int(np.sqrt(len(encodings))))
+        centroids, assignments = kmeans(encodings, n_lists)
+        self._set_lists(encodings, centroids, assignments)
+        return self
+
+    def _set_lists(self, encodings, centroids, assignments):
+        """Store partitions as a cluster-sorted permutation plus offsets"""
+        self.encodings = encodings
+        self.norms = np.einsum("ij,ij->i", encodings, encodings)
+        self.centroids = centroids
+        self.n_lists = len(centroids)
+        self.size = len(encodings)
+        self.list_order = np.argsort(assignments, kind="stable").astype(np.int64)
+        self.list_offsets = np.r_[0, np.cumsum(np.bincount(assignments, minlength=self.n_lists))]
+        self.assignments = assignments
+
+    def probe(self, queries, nprobe):
+        """Nearest partitions for each query"""
+        squared = _squared_distances(queries, self.centroids)
+        return _top_k(squared, nprobe)[0]
+
+    def list_members(self, lists):
+        """Gallery rows belonging to the given partitions"""
+        return np.concatenate([
+            self.list_order[self.list_offsets[c]:self.list_offsets[c + 1]] for c in lists
+        ])
+
+    def search(self, queries, k):
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        probed = self.probe(queries, self.nprobe)
+
+        distances = np.full((len(queries), k), np.inf, dtype=np.float32)
+        indices = np.full((len(queries), k), -1, dtype=np.int64)
+        for q, lists in enumerate(probed):
+            members = self.list_members(lists)
+            if not len(members):
+                continue
+            squared = _squared_distances(queries[q:q + 1], self.encodings[members], self.norms[members])
+            nearest, nearest_sq = _top_k(squared, k)
+            found = nearest.shape[1]
+            indices[q, :found] = members[nearest[0]]
+            distances[q, :found] = np.sqrt(nearest_sq[0])
+        return distances, indices
+
+    def _state(self):
+        return {
+            "centroids": self.centroids,
+            "assignments": self.assignments,
+            "nprobe": np.array(self.nprobe),
+        }
+
+    @classmethod
+    def _from_state(cls, state, encodings):
+        index = cls(nprobe=int(state["nprobe"]))
+        index._set_lists(np.ascontiguousarray(encodings, dtype=np.float32),
+                         state["centroids"], state["assignments"])
+        return index
+
+class HNSWIndex(FaceIndex):
+    """Navigable neighbour-graph index
+
+    Uses hnswlib when it is installed. Otherwise falls back to a
+    single-layer NumPy graph: each row is linked to its M nearest
+    neighbours (found through IVF partitions) and queries run a
+    best-first beam search from the closest partition entry points.
+    """
+
+    kind = "hnsw"
+
+    def __init__(self, m=HNSW_DEFAULT_M, ef_search=HNSW_DEFAULT_EF_SEARCH,
+                 ef_construction=200, use_hnswlib=HNSWLIB_AVAILABLE):
+        """
+        Args:
+            m (int): Graph degree (links per node)
+            ef_search (int): Beam width at query time
+            ef_construction (int): Beam width at build time (hnswlib only)
+            use_hnswlib (bool): Prefer the hnswlib backend when available
+        """
+        self.m = m
+        self.ef_search = ef_search
+        self.ef_construction = ef_construction
+        self.use_hnswlib = use_hnswlib and HNSWLIB_AVAILABLE
+        self.size = 0
+        self._native = None
+
+    def build(self, encodings):
+        encodings = np.ascontiguousarray(encodings, dtype=np.float32)
+        self.encodings = encodings
+        self.norms = np.einsum("ij,ij->i", encodings, encodings)
+        self.size = len(encodings)
+
+        if self.use_hnswlib:
+            self._native = hnswlib.Index(space="l2", dim=encodings.shape[1])
+            self._native.init_index(max_elements=len(encodings), M=self.m,
+                                    ef_construction=self.ef_construction)
+            self._native.add_items(encodings, np.arange(len(encodings)))
+            self._native.set_ef(self.ef_search)
+            return self
+
+        self._build_graph()
+        return self
+
+    def _build_graph(self, build_probe=4, candidate_factor=3):
+        """Link every row to diverse near neighbours found in nearby partitions
+
+        Each row keeps up to M forward links chosen with the HNSW neighbour
+        selection heuristic (a candidate is skipped when it is closer to an
+        already selected neighbour than to the row), which preserves links
+        between clusters. Up to M reverse links are then added.
+        """
+        partitions = IVFIndex().build(self.encodings)
+        self.entry_centroids = partitions.centroids
+        self.neighbors = np.full((self.size, 2 * self.m), -1, dtype=np.int32)
+        degree = np.zeros(self.size, dtype=np.int32)
+
+        nearby_lists = partitions.probe(partitions.centroids, build_probe)
+        self.entry_points = np.empty(partitions.n_lists, dtype=np.int64)
+
+        for c in range(partitions.n_lists):
+            members = partitions.list_members([c])
+            if not len(members):
+                self.entry_points[c] = 0
+                continue
+            pool = partitions.list_members(nearby_lists[c])
+            squared = _squared_distances(self.encodings[members], self.encodings[pool], self.norms[pool])
+            squared[pool[None, :] == members[:, None]] = np.inf  # no self-links
+            nearest, nearest_sq = _top_k(squared, self.m * candidate_factor)
+
+            for row, candidates, candidate_sq in zip(members, pool[nearest], nearest_sq):
+                links = self._select_diverse(candidates[np.isfinite(candidate_sq)],
+                                             candidate_sq[np.isfinite(candidate_sq)])
+                self.neighbors[row, :len(links)] = links
+                degree[row] = len(links)
+
+            # Entry point: member closest to the partition centroid
+            to_centroid = _squared_distances(partitions.centroids[c:c + 1], self.encodings[members])
+            self.entry_points[c] = members[int(np.argmin(to_centroid))]
+
+        # Reverse links keep the graph navigable in both directions
+        forward = self.neighbors[:, :self.m].copy()
+        for row in range(self.size):
+            for target in forward[row]:
+                if target < 0:
+                    break
+                if degree[target] < 2 * self.m and row not in self.neighbors[target, :degree[target]]:
+                    self.neighbors[target, degree[target]] = row
+                    degree[target] += 1
+
+    def _select_diverse(self, candidates, candidate_sq):
+        """HNSW neighbour selection heuristic over distance-sorted candidates"""
+        vectors = self.encodings[candidates]
+        pairwise = _squared_distances(vectors, vectors, self.norms[candidates])
+        selected = []
+        skipped = []
+        for j in range(len(candidates)):
+            if all(pairwise[j, s] > candidate_sq[j] for s in selected):
+                selected.append(j)
+                if len(selected) == self.m:
+                    break
+            else:
+                skipped.append(j)
+        # Fill remaining slots with the nearest pruned candidates
+        selected.extend(skipped[:self.m - len(selected)])
+        return candidates[sorted(selected, key=lambda j: candidate_sq[j])]
+
+    def _beam_search(self, query, k, n_entries=4):
+        """Best-first search over the neighbour graph for one query"""
+        ef = max(self.ef_search, k)
+        query_norm = float(query @ query)
+
+        def squared_to(rows):
+            return np.maximum(query_norm + self.norms[rows] - 2.0 * (self.encodings[rows] @ query), 0.0)
+
+        entry_lists = _top_k(_squared_distances(query[None, :], self.entry_centroids),
+                             n_entries)[0][0]
+        entries = np.unique(self.entry_points[entry_lists])
+        visited = set(entries.tolist())
+        entry_dist = squared_to(entries)
+
+        candidates = list(zip(entry_dist.tolist(), entries.tolist()))
+        heapq.heapify(candidates)
+        results = [(-d, i) for d, i in candidates]
+        heapq.heapify(results)
+        while len(results) > ef:
+            heapq.heappop(results)
+
+        while candidates:
+            current_dist, current = heapq.heappop(candidates)
+            if len(results) >= ef and current_dist > -results[0][0]:
+                break
+            fresh = [n for n in self.neighbors[current].tolist() if n >= 0 and n not in visited]
+            if not fresh:
+                continue
+            visited.update(fresh)
+            for dist, node in zip(squared_to(np.array(fresh)).tolist(), fresh):
+                if len(results) < ef or dist < -results[0][0]:
+                    heapq.heappush(candidates, (dist, node))
+                    heapq.heappush(results, (-dist, node))
+                    if len(results) > ef:
+                        heapq.heappop(results)
+
+        best = sorted((-d, i) for d, i in results)[:k]
+        return [d for d, _ in best], [i for _, i in best]
+
+    def search(self, queries, k):
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        k = min(k, self.size)
+
+        if self._native is not None:
+            self._native.set_ef(max(self.ef_search, k))
+            indices, squared = self._native.knn_query(queries, k=k)
+            return np.sqrt(np.maximum(squared, 0.0)), indices.astype(np.int64)
+
+        distances = np.full((len(queries), k), np.inf, dtype=np.float32)
+        indices = np.full((len(queries), k), -1, dtype=np.int64)
+        for q, query in enumerate(queries):
+            squared, rows = self._beam_search(query, k)
+            distances[q, :len(rows)] = np.sqrt(squared)
+            indices[q, :len(rows)] = rows
+        return distances, indices
+
+    def _state(self):
+        state = {
+            "m": np.array(self.m),
+            "ef_search": np.array(self.ef_search),
+            "use_hnswlib": np.array(self._native is not None),
+        }
+        if self._native is not None:
+            state["native_graph"] = self._save_native()
+        else:
+            state.update(neighbors=self.neighbors, entry_points=self.entry_points,
+                         entry_centroids=self.entry_centroids)
+        return state
+
+    def _save_native(self):
+        """Serialise the hnswlib graph with ``save_index`` into a byte array"""
+        fd, temp_path = tempfile.mkstemp(suffix=".hnsw")
+        os.close(fd)
+        try:
+            self._native.save_index(temp_path)
+            with open(temp_path, "rb") as f:
+                return np.frombuffer(f.read(), dtype=np.uint8)
+        finally:
+            os.remove(temp_path)
+
+    def _load_native(self, graph):
+        """Restore an hnswlib graph written by ``_save_native`` with ``load_index``"""
+        fd, temp_path = tempfile.mkstemp(suffix=".hnsw")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(graph.tobytes())
+            self._native = hnswlib.Index(space="l2", dim=self.encodings.shape[1])
+            self._native.load_index(temp_path, max_elements=self.size)
+        finally:
+            os.remove(temp_path)
+        self._native.set_ef(self.ef_search)
+
+    @classmethod
+    def _from_state(cls, state, encodings):
+        index = cls(m=int(state["m"]), ef_search=int(state["ef_search"]),
+                    use_hnswlib=bool(state["use_hnswlib"]))
+        has_graph = "native_graph" in state if index.use_hnswlib else "neighbors" in state
+        if not has_graph:
+            # Saved with the other backend (or without a graph): rebuild
+            return index.build(encodings)
+        index.encodings = np.ascontiguousarray(encodings, dtype=np.float32)
+        index.norms = np.einsum("ij,ij->i", index.encodings, index.encodings)
+        index.size = len(index.encodings)
+        if index.use_hnswlib:
+            index._load_native(state["native_graph"])
+            return index
+        index.neighbors = state["neighbors"]
+        index.entry_points = state["entry_points"]
+        index.entry_centroids = state["entry_centroids"]
+        return index
+
+_INDEX_CLASSES = {
+    "flat": FlatIndex,
+    "ivf": IVFIndex,
+    "hnsw": HNSWIndex,
+}
+
+def build_face_index(encodings, kind="flat", **params):
+    """Build a face index of the requested kind
+
+    Args:
+        encodings (np.ndarray): Gallery encodings of shape (N, dim)
+        kind (str): 'flat', 'ivf' or 'hnsw'
+        **params: Index-specific parameters
+
+    Returns:
+        FaceIndex: Built index
+    """
+    if kind not in _INDEX_CLASSES:
+        raise ValueError(f"Unknown index type '{kind}', expected one of {INDEX_TYPES}")
+    return _INDEX_CLASSES[kind](**params).build(encodings)
+
+def load_face_index(gallery, index_path=FACE_INDEX_PATH):
+    """Load a saved index for the given gallery
+
+    Args:
+        gallery (FaceGallery): Gallery the index was built from
+        index_path (str): Saved index path
+
+    Returns:
+        FaceIndex: Index, or None if missing or stale for this gallery
+    """
+    if not os.path.exists(index_path):
+        return None
+    with np.load(index_path) as archive:
+        state = {key: archive[key] for key in archive.files}
+
+    kind = str(state.pop("kind"))
+    if kind not in _INDEX_CLASSES:
+        print(f"Unknown face index type '{kind}' in {index_path}")
+        return None
+    fingerprint = str(state.pop("fingerprint", ""))
+    if fingerprint != gallery_fingerprint(gallery):
+        print("Face index is stale for the current gallery - ignoring it")
+        return None
+    return _INDEX_CLASSES[kind]._from_state(state, gallery.encodings)
+
+# Index cache, reloaded only when the gallery object changes
+_index_cache = (None, None)
+_index_cache_lock = threading.Lock()
+
+def get_face_index(gallery, index_path=FACE_INDEX_PATH):
+    """Get the saved index for a gallery, loading it once per gallery version
+
+    Args:
+        gallery (FaceGallery): Current face gallery
+        index_path (str): Saved index path
+
+    Returns:
+        FaceIndex: Index, or None to use exact matching
+    """
+    global _index_cache
+    with _index_cache_lock:
+        cached_gallery, cached_index = _index_cache
+        if cached_gallery is not gallery:
+            cached_index = load_face_index(gallery, index_path)
+            _index_cache = (gallery, cached_index)
+        return cached_index
+
+def benchmark_index(index, encodings, queries, k=10, baseline=None):
+    """Measure recall@k and query latency of an index against exact search
+
+    Args:
+        index (FaceIndex): Index under test
+        encodings (np.ndarray): Gallery encodings the index was built from
+        queries (np.ndarray): Query encodings of shape (Q, dim)
+        k (int): Neighbours per query
+        baseline (np.ndarray): Exact neighbour indices, computed if omitted
+
+    Returns:
+        dict: recall, mean/p50/p95 latency in milliseconds and queries/s
+    """
+    if baseline is None:
+        baseline = FlatIndex().build(encodings).search(queries, k)[1]
+
+    latencies = []
+    found = []
+    for query in queries:
+        start_time = time.perf_counter()
+        _, indices = index.search(query[None, :], k)
+        latencies.append((time.perf_counter() - start_time) * 1000.0)
+        found.append(indices[0])
+
+    hits = sum(len(np.intersect1d(f, b)) for f, b in zip(found, baseline))
+    latencies = np.array(latencies)
+    return {
+        "index": index.kind,
+        "recall": hits / float(baseline.size),
+        "mean_ms": float(latencies.mean()),
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p95_ms": float(np.percentile(latencies, 95)),
+        "qps": float(1000.0 / latencies.mean()),
+    }
+
+def _benchmark_configurations(n_lists):
+    """Index configurations compared by the benchmark command"""
+    configurations = [("flat", {})]
+    for nprobe in (1, 4, 8, 16):
+        configurations.append(("ivf", {"n_lists": n_lists, "nprobe": nprobe}))
+    for ef_search in (16, 32, 64, 128):
+        configurations.append(("hnsw", {"ef_search": ef_search}))
+    return configurations
+
+def main():
+    """Benchmark index configurations on the enrolled or a synthetic gallery"""
+    parser = argparse.ArgumentParser(description="Benchmark face gallery indexes")
+    parser.add_argument("--benchmark", action="store_true", help="Run the benchmark")
+    parser.add_argument("--synthetic", type=int, default=0,
+                        help="Use N synthetic encodings instead of the enrolled gallery")
+    parser.add_argument("--queries", type=int, default=200, help="Number of queries")
+    parser.add_argument("-k", type=int, default=10, help="Neighbours per query")
+    args = parser.parse_args()
+
+    if not args.benchmark:
+        parser.print_help()
+        return
+
+    if args.synthetic:
+        rng = np.random.default_rng(0)
+        identities = max(1, args.synthetic // 10)
+        centers = rng.normal(0.0, 0.1, (identities, 128)).astype(np.float32)
+        labels = rng.integers(0, identities, args.synthetic)
+        encodings = centers[labels] + rng.normal(0.0, 0.03, (args.synthetic, 128)).astype(np.float32)
+    else:
+        from deploy.gallery import load_face_gallery
+        gallery = load_face_gallery()
+        if gallery is None or len(gallery) == 0:
+            print("No face gallery found - use --synthetic N")
+            return
+        encodings = np.ascontiguousarray(gallery.encodings, dtype=np.float32)
+
+    rng = np.random.default_rng(1)
+    picked = rng.choice(len(encodings), min(args.queries, len(encodings)), replace=False)
+    queries = encodings[picked] + rng.normal(0.0, 0.02, (len(picked), encodings.shape[1])).astype(np.float32)
+    baseline = FlatIndex().build(encodings).search(queries, args.k)[1]
+
+    print(f"[INFO] Gallery: {len(encodings)} encodings, {len(queries)} queries, k={args.k}")
+    n_lists = max(1, int(np.sqrt(len(encodings))))
+    for kind, params in _benchmark_configurations(n_lists):
+        start_time = time.perf_counter()
+        index = build_face_index(encodings, kind, **params)
+        build_seconds = time.perf_counter() - start_time
+        result = benchmark_index(index, encodings, queries, args.k, baseline)
+        print(f"{kind:5s} {str(params):36s} build={build_seconds:7.2f}s "
+              f"recall@{args.k}={result['recall']:.3f} p50={result['p50_ms']:.3f}ms "
+              f"p95={result['p95_ms']:.3f}ms qps={result['qps']:.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""Face Quality Assessment
+
+Cheap per-face quality scores used to decide what is worth encoding:
+- Sharpness: variance of the Laplacian on the face crop
+- Exposure: mean brightness and clipped-pixel fraction
+- Size: face width relative to a comfortable encoding size
+- Pose: yaw and roll from the 5-point landmarks
+- Frame ranking by global sharpness, to pick the best buffered frame
+"""
+
+import math
+from collections import namedtuple
+
+import cv2
+import numpy as np
+import face_recognition
+
+# Quality references
+SHARPNESS_REFERENCE = 120.0   # Laplacian variance considered fully sharp
+GOOD_FACE_WIDTH = 80          # Face width (px) considered fully sized
+CLIPPED_LOW = 10
+CLIPPED_HIGH = 245
+MAX_YAW = 0.35                # Nose offset from the eye midpoint, in eye distances
+MAX_ROLL = 30.0               # Degrees of head tilt
+FRAME_SHARPNESS_WIDTH = 320   # Frames are downscaled to this width for ranking
+
+# Individual scores are in [0, 1]; score is their weighted combination
+FaceQuality = namedtuple("FaceQuality", ["sharpness", "exposure", "size", "pose", "score"])
+
+QUALITY_WEIGHTS = {"sharpness": 0.35, "exposure": 0.2, "size": 0.2, "pose": 0.25}
+
+def _crop(gray_frame, box):
+    top, right, bottom, left = box
+    height, width = gray_frame.shape[:2]
+    return gray_frame[max(0, top):min(height, bottom), max(0, left):min(width, right)]
+
+def sharpness_score(gray):
+    """Laplacian-variance sharpness in [0, 1]"""
+    if gray.size == 0:
+        return 0.0
+    variance = cv2.Laplacian(gray, cv2.CV_64F).var()
+    return float(min(1.0, variance / SHARPNESS_REFERENCE))
+
+def exposure_score(gray):
+    """Exposure in [0, 1]: centred histogram with few clipped pixels"""
+    if gray.size == 0:
+        return 0.0
+    mean_level = float(gray.mean())
+    clipped = float(np.mean((gray < CLIPPED_LOW) | (gray > CLIPPED_HIGH)))
+    centred = 1.0 - abs(mean_level - 128.0) / 128.0
+    return max(0.0, centred * (1.0 - clipped))
+
+def pose_score(landmarks):
+    """Frontal-pose score in [0, 1] from 5-point landmarks
+
+    Args:
+        landmarks (dict): face_recognition 'small' landmarks (left_eye,
+            right_eye, nose_tip), or None if unavailable
+
+    Returns:
+        float: 1 for a frontal upright face, 0 beyond the yaw/roll limits
+    """
+    if not landmarks:
+        return 0.5
+    left_eye = np.mean(landmarks["left_eye"], axis=0)
+    right_eye = np.mean(landmarks["right_eye"], axis=0)
+    nose = np.mean(landmarks["nose_tip"], axis=0)
+
+    eye_vector = right_eye - left_eye
+    eye_distance = float(np.hypot(*eye_vector))
+    if eye_distance < 1e-6:
+        return 0.0
+    yaw = abs(float(np.dot(nose - (left_eye + right_eye) / 2.0, eye_vector))) / (eye_distance ** 2)
+    roll = abs(math.degrees(math.atan2(eye_vector[1], eye_vector[0])))
+    roll = min(roll, 180.0 - roll)
+    return max(0.0, 1.0 - yaw / MAX_YAW) * max(0.0, 1.0 - roll / MAX_ROLL)
+
+def assess_faces(rgb_frame, boxes, gray_frame=None):
+    """Quality of each detected face
+
+    Args:
+        rgb_frame (np.ndarray): RGB frame
+        boxes (list): (top, right, bottom, left) face boxes
+        gray_frame (np.ndarray): Grayscale version of the frame, if available
+
+    Returns:
+        list: FaceQuality per box
+    """
+    if not boxes:
+        return []
+    if gray_frame is None:
+        gray_frame = cv2.cvtColor(rgb_frame, cv2.COLOR_RGB2GRAY)
+    all_landmarks = face_recognition.face_landmarks(rgb_frame, boxes, model="small")
+
+    qualities = []
+    for box, landmarks in zip(boxes, all_landmarks):
+        crop = _crop(gray_frame, box)
+        scores = {
+            "sharpness": sharpness_score(crop),
+            "exposure": exposure_score(crop),
+            "size": min(1.0, (box[1] - box[3]) / GOOD_FACE_WIDTH),
+            "pose": pose_score(landmarks),
+        }
+        combined = sum(QUALITY_WEIGHTS[name] * value for name, value in scores.items())
+        qualities.append(FaceQuality(score=combined, **scores))
+    return qualities
+
+def frame_sharpness(bgr_frame):
+    """Global sharpness of a frame, computed on a downscaled copy"""
+    height, width = bgr_frame.shape[:2]
+    if width > FRAME_SHARPNESS_WIDTH:
+        scale = FRAME_SHARPNESS_WIDTH / width
+        bgr_frame = cv2.resize(bgr_frame, (FRAME_SHARPNESS_WIDTH, int(height * scale)),
+                               interpolation=cv2.INTER_AREA)
+    gray = cv2.cvtColor(bgr_frame, cv2.COLOR_BGR2GRAY)
+    return cv2.Laplacian(gray, cv2.CV_64F).var()
+
+def select_sharpest(frames):
+    """Pick the sharpest of several buffered frames
+
+    Args:
+        frames (list): Tuples of (frame, timestamp, sequence)
+
+    Returns:
+        tuple: The sharpest (frame, timestamp, sequence)
+    """
+    if len(frames) == 1:
+        return frames[0]
+    return max(frames, key=lambda item: frame_sharpness(item[0]))
@@ -0,0 +1,183 @@
+"""Face Tracking Across Frames
+
+Links face detections from consecutive frames so a person standing
+still is not re-encoded on every frame:
+- Greedy IoU association between existing tracks and new detections
+- A track is re-encoded only when its box moved significantly or its
+  refresh interval expired
+- Identity votes are accumulated per track, not per frame, weighted
+  by the quality of the encoded face
+"""
+
+import os
+import sys
+import heapq
+
+import numpy as np
+
+# Add config path
+current_dir = os.path.dirname(__file__)
+config_dir = os.path.join(current_dir, '../')
+sys.path.append(config_dir)
+from deploy.matcher import FaceCandidate
+
+# Tracking settings
+TRACK_MATCH_IOU = 0.3        # Minimum IoU to link a detection to a track
+TRACK_MOVE_IOU = 0.6         # Re-encode when IoU with the last encoded box drops below this
+TRACK_REFRESH_FRAMES = 5     # Re-encode at least every N frames
+TRACK_MAX_MISSED = 3         # Drop a track after N frames without a detection
+TRACK_MIN_QUALITY = 0.35     # Faces scoring below this are never encoded
+TRACK_TOP_K = 3              # After K encodings, only encode faces better than the worst kept
+
+def box_iou(boxes_a, boxes_b):
+    """Pairwise IoU of (top, right, bottom, left) boxes
+
+    Args:
+        boxes_a (array-like): Boxes of shape (A, 4)
+        boxes_b (array-like): Boxes of shape (B, 4)
+
+    Returns:
+        np.ndarray: IoU matrix of shape (A, B)
+    """
+    a = np.asarray(boxes_a, dtype=np.float64).reshape(-1, 4)
+    b = np.asarray(boxes_b, dtype=np.float64).reshape(-1, 4)
+    top = np.maximum(a[:, None, 0], b[None, :, 0])
+    right = np.minimum(a[:, None, 1], b[None, :, 1])
+    bottom = np.minimum(a[:, None, 2], b[None, :, 2])
+    left = np.maximum(a[:, None, 3], b[None, :, 3])
+    intersection = np.clip(right - left, 0, None) * np.clip(bottom - top, 0, None)
+    area_a = (a[:, 1] - a[:, 3]) * (a[:, 2] - a[:, 0])
+    area_b = (b[:, 1] - b[:, 3]) * (b[:, 2] - b[:, 0])
+    union = area_a[:, None] + area_b[None, :] - intersection
+    return np.where(union > 0, intersection / np.maximum(union, 1e-9), 0.0)
+
+class FaceTrack:
+    """One tracked face with its accumulated identity votes"""
+
+    def __init__(self, track_id, box):
+        self.track_id = track_id
+        self.box = box
+        self.encoded_box = None
+        self.last_encoded = None
+        self.missed = 0
+        self.hits = 1
+        self.encodings = 0
+        self.votes = {}
+        self.best_distance = {}
+        self.qualities = []   # Min-heap of the best TRACK_TOP_K quality scores encoded
+
+    def needs_encoding(self, frame_index, refresh_frames=TRACK_REFRESH_FRAMES, move_iou=TRACK_MOVE_IOU):
+        """Whether the track's identity should be recomputed this frame"""
+        if self.encoded_box is None:
+            return True
+        if frame_index - self.last_encoded >= refresh_frames:
+            return True
+        return bool(box_iou([self.box], [self.encoded_box])[0, 0] < move_iou)
+
+    def accepts(self, quality, min_quality=TRACK_MIN_QUALITY, top_k=TRACK_TOP_K):
+        """Whether a face of this quality is worth encoding for the track
+
+        Args:
+            quality (FaceQuality): Quality of the face in the current frame
+            min_quality (float): Absolute quality gate
+            top_k (int): Encodings kept before only better faces are accepted
+        """
+        if quality.score < min_quality:
+            return False
+        if len(self.qualities) >= top_k and quality.score <= self.qualities[0]:
+            return False
+        return True
+
+    def add_match(self, candidates, frame_index, tolerance, quality=None, top_k=TRACK_TOP_K):
+        """Record the matcher result for a fresh encoding of this track
+
+        Args:
+            candidates (list): FaceCandidate list for the encoding, best first
+            frame_index (int): Frame the encoding was computed on
+            tolerance (float): Match tolerance used to turn distance into a vote
+            quality (FaceQuality): Quality of the encoded face, weights the vote
+            top_k (int): Best quality scores kept for the ``accepts`` gate
+        """
+        self.encoded_box = self.box
+        self.last_encoded = frame_index
+        self.encodings += 1
+        weight = 1.0
+        if quality is not None:
+            if len(self.qualities) < top_k:
+                heapq.heappush(self.qualities, quality.score)
+            else:
+                heapq.heappushpop(self.qualities, quality.score)
+            weight = quality.score
+        if not candidates:
+            return
+        best = candidates[0]
+        vote = max(0.0, 1.0 - best.distance / tolerance) * weight
+        self.votes[best.name] = self.votes.get(best.name, 0.0) + vote
+        self.best_distance[best.name] = min(self.best_distance.get(best.name, best.distance), best.distance)
+
+    @property
+    def identity(self):
+        """Identity with the most votes on this track, None if unknown"""
+        if not self.votes:
+            return None
+        return max(self.votes, key=self.votes.get)
+
+    def candidates(self):
+        """Track-level candidate list, in the matcher's output format"""
+        name = self.identity
+        if name is None:
+            return []
+        return [FaceCandidate(name, self.best_distance[name], self.encodings)]
+
+class IoUTracker:
+    """Greedy IoU tracker for face boxes"""
+
+    def __init__(self, match_iou=TRACK_MATCH_IOU, max_missed=TRACK_MAX_MISSED):
+        self.match_iou = match_iou
+        self.max_missed = max_missed
+        self.tracks = []
+        self._next_id = 0
+
+    def update(self, boxes):
+        """Associate a frame's detections with the current tracks
+
+        Args:
+            boxes (list): Detected (top, right, bottom, left) boxes
+
+        Returns:
+            list: FaceTrack for each detection, in detection order
+        """
+        assigned = [None] * len(boxes)
+        matched_tracks = set()
+
+        if self.tracks and boxes:
+            iou = box_iou([track.box for track in self.tracks], boxes)
+            # Greedy: best remaining pair first
+            for flat in np.argsort(iou, axis=None)[::-1]:
+                t, d = np.unravel_index(flat, iou.shape)
+                if iou[t, d] < self.match_iou:
+                    break
+                if t in matched_tracks or assigned[d] is not None:
+                    continue
+                track = self.tracks[t]
+                track.box = boxes[d]
+                track.missed = 0
+                track.hits += 1
+                assigned[d] = track
+                matched_tracks.add(t)
+
+        survivors = []
+        for t, track in enumerate(self.tracks):
+            if t not in matched_tracks:
+                track.missed += 1
+            if track.missed <= self.max_missed:
+                survivors.append(track)
+        self.tracks = survivors
+
+        for d, box in enumerate(boxes):
+            if assigned[d] is None:
+                track = FaceTrack(self._next_id, box)
+                self._next_id += 1
+                self.tracks.append(track)
+                assigned[d] = track
+        return assigned
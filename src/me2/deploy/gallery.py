@@ -0,0 +1,285 @@
+"""Face Gallery Store for Biometric Authentication
+
+Keeps enrolled face encodings in a compact, memory-mappable layout:
+- One contiguous float32 (N, 128) encoding matrix
+- One int32 label array indexing into a name table
+- Versioned binary file format that can be opened with np.memmap
+- Process-wide cache so the gallery is loaded once and reused
+"""
+
+import os
+import sys
+import json
+import pickle
+import struct
+import threading
+
+import numpy as np
+
+# Add config path
+current_dir = os.path.dirname(__file__)
+config_dir = os.path.join(current_dir, '../')
+sys.path.append(config_dir)
+import gui_app.config as cf
+from deploy.face_index import FACE_INDEX_PATH
+
+# Gallery locations
+EMBEDDINGS_DIR = f"{cf.me2}/deploy/embeddings"
+FACE_GALLERY_PATH = f"{EMBEDDINGS_DIR}/faces.gallery"
+LEGACY_FACE_PICKLE_PATH = f"{EMBEDDINGS_DIR}/encodings_faces.pickle"
+
+# Binary format
+#   header  : magic, version, dim, count, names_offset, names_size
+#   payload : float32 encodings (count, dim) | int32 labels (count) | UTF-8 JSON names
+GALLERY_MAGIC = b"FACEGAL\x00"
+GALLERY_VERSION = 1
+ENCODING_DIM = 128
+_HEADER_FORMAT = "<8sIIQQQ"
+_HEADER_SIZE = 64
+_DATA_ALIGNMENT = 64
+
+def _align(offset):
+    """Round an offset up to the data alignment boundary"""
+    return (offset + _DATA_ALIGNMENT - 1) // _DATA_ALIGNMENT * _DATA_ALIGNMENT
+
+class FaceGallery:
+    """Enrolled face encodings stored as a single contiguous matrix"""
+
+    def __init__(self, encodings, labels, names):
+        """
+        Args:
+            encodings (np.ndarray): float32 matrix of shape (N, dim)
+            labels (np.ndarray): int32 array of shape (N,) indexing ``names``
+            names (list): Identity name table
+        """
+        self.encodings = encodings
+        self.labels = labels
+        self.names = list(names)
+
+    @classmethod
+    def from_encodings(cls, encodings, names):
+        """Build a gallery from parallel lists of encodings and names
+
+        Args:
+            encodings (list): Per-image 128-d encodings
+            names (list): Identity name for each encoding
+
+        Returns:
+            FaceGallery: Packed gallery
+        """
+        name_table = []
+        name_index = {}
+        labels = np.empty(len(names), dtype=np.int32)
+        for i, name in enumerate(names):
+            if name not in name_index:
+                name_index[name] = len(name_table)
+                name_table.append(name)
+            labels[i] = name_index[name]
+
+        if len(encodings):
+            matrix = np.ascontiguousarray(np.asarray(encodings, dtype=np.float32))
+        else:
+            matrix = np.empty((0, ENCODING_DIM), dtype=np.float32)
+        return cls(matrix, labels, name_table)
+
+    @classmethod
+    def from_pickle(cls, pickle_path=LEGACY_FACE_PICKLE_PATH):
+        """Convert a legacy ``{"encodings": [...], "names": [...]}`` pickle
+
+        Args:
+            pickle_path (str): Path to the legacy face encodings pickle
+
+        Returns:
+            FaceGallery: Packed gallery
+        """
+        with open(pickle_path, "rb") as f:
+            face_data = pickle.load(f)
+        return cls.from_encodings(face_data["encodings"], face_data["names"])
+
+    def __len__(self):
+        return len(self.labels)
+
+    @property
+    def dim(self):
+        """Encoding dimensionality"""
+        return self.encodings.shape[1]
+
+    @property
+    def identity_count(self):
+        """Number of distinct enrolled identities"""
+        return len(self.names)
+
+    def label_names(self, labels):
+        """Map label indices to identity names
+
+        Args:
+            labels (iterable): Label indices
+
+        Returns:
+            list: Identity names
+        """
+        return [self.names[label] for label in labels]
+
+    def with_user(self, name, encodings):
+        """Copy of the gallery with one identity's encodings replaced
+
+        The current gallery is left untouched so readers holding it are
+        unaffected (copy-on-write). Other identities keep their labels.
+
+        Args:
+            name (str): Identity to add or re-enroll
+            encodings (list): New 128-d encodings for ``name``
+
+        Returns:
+            FaceGallery: New gallery
+        """
+        encodings = np.asarray(encodings, dtype=np.float32).reshape(-1, ENCODING_DIM)
+        if name in self.names:
+            label = self.names.index(name)
+            keep = np.asarray(self.labels) != label
+            names = self.names
+        else:
+            label = len(self.names)
+            keep = np.ones(len(self.labels), dtype=bool)
+            names = self.names + [name]
+
+        matrix = np.concatenate([np.asarray(self.encodings)[keep], encodings])
+        labels = np.concatenate([np.asarray(self.labels)[keep],
+                                 np.full(len(encodings), label, dtype=np.int32)])
+        return FaceGallery(np.ascontiguousarray(matrix), labels, names)
+
+    def save(self, gallery_path=FACE_GALLERY_PATH):
+        """Write the gallery atomically in the versioned binary format
+
+        Args:
+            gallery_path (str): Destination file path
+        """
+        count, dim = self.encodings.shape
+        names_blob = json.dumps(self.names).encode("utf-8")
+
+        encodings_offset = _HEADER_SIZE
+        labels_offset = _align(encodings_offset + count * dim * 4)
+        names_offset = _align(labels_offset + count * 4)
+
+        header = struct.pack(
+            _HEADER_FORMAT, GALLERY_MAGIC, GALLERY_VERSION, dim, count,
+            names_offset, len(names_blob)
+        )
+
+        os.makedirs(os.path.dirname(gallery_path) or ".", exist_ok=True)
+        temp_path = f"{gallery_path}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(header.ljust(_HEADER_SIZE, b"\x00"))
+            f.write(np.ascontiguousarray(self.encodings, dtype="<f4").tobytes())
+            f.write(b"\x00" * (labels_offset - f.tell()))
+            f.write(np.ascontiguousarray(self.labels, dtype="<i4").tobytes())
+            f.write(b"\x00" * (names_offset - f.tell()))
+            f.write(names_blob)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, gallery_path)
+
+    @classmethod
+    def load(cls, gallery_path=FACE_GALLERY_PATH, mmap=True):
+        """Open a gallery file
+
+        Args:
+            gallery_path (str): Gallery file path
+            mmap (bool): Memory-map the arrays instead of reading them
+
+        Returns:
+            FaceGallery: Loaded gallery
+
+        Raises:
+            ValueError: If the file is not a supported gallery
+        """
+        with open(gallery_path, "rb") as f:
+            header = f.read(_HEADER_SIZE)
+            if len(header) < struct.calcsize(_HEADER_FORMAT):
+                raise ValueError(f"Truncated gallery file: {gallery_path}")
+            magic, version, dim, count, names_offset, names_size = struct.unpack_from(
+                _HEADER_FORMAT, header
+            )
+            if magic != GALLERY_MAGIC:
+                raise ValueError(f"Not a face gallery file: {gallery_path}")
+            if version != GALLERY_VERSION:
+                raise ValueError(f"Unsupported gallery version {version}: {gallery_path}")
+            f.seek(names_offset)
+            names = json.loads(f.read(names_size).decode("utf-8"))
+
+        encodings_offset = _HEADER_SIZE
+        labels_offset = _align(encodings_offset + count * dim * 4)
+
+        if count == 0:
+            encodings = np.empty((0, dim), dtype=np.float32)
+            labels = np.empty(0, dtype=np.int32)
+        elif mmap:
+            encodings = np.memmap(gallery_path, dtype="<f4", mode="r",
+                                  offset=encodings_offset, shape=(count, dim))
+            labels = np.memmap(gallery_path, dtype="<i4", mode="r",
+                               offset=labels_offset, shape=(count,))
+        else:
+            with open(gallery_path, "rb") as f:
+                f.seek(encodings_offset)
+                encodings = np.fromfile(f, dtype="<f4", count=count * dim).reshape(count, dim)
+                f.seek(labels_offset)
+                labels = np.fromfile(f, dtype="<i4", count=count)
+
+        return cls(encodings, labels, names)
+
+# Process-wide gallery cache, keyed by path and invalidated on file change
+_gallery_cache = {}
+_gallery_cache_lock = threading.Lock()
+
+def _file_signature(file_path):
+    """Identify a file version by modification time and size"""
+    stat = os.stat(file_path)
+    return stat.st_mtime_ns, stat.st_size
+
+def load_face_gallery(gallery_path=FACE_GALLERY_PATH):
+    """Get the face gallery, loading it only when the file has changed
+
+    Falls back to converting the legacy pickle once if no gallery file
+    exists yet.
+
+    Args:
+        gallery_path (str): Gallery file path
+
+    Returns:
+        FaceGallery: Cached gallery, or None if nothing is enrolled
+    """
+    with _gallery_cache_lock:
+        if not os.path.exists(gallery_path):
+            if gallery_path != FACE_GALLERY_PATH or not os.path.exists(LEGACY_FACE_PICKLE_PATH):
+                return None
+            print("Converting legacy face encodings to gallery format...")
+            FaceGallery.from_pickle(LEGACY_FACE_PICKLE_PATH).save(gallery_path)
+
+        signature = _file_signature(gallery_path)
+        cached = _gallery_cache.get(gallery_path)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+
+        print(f"Loading face gallery from {gallery_path}...")
+        gallery = FaceGallery.load(gallery_path)
+        _gallery_cache[gallery_path] = (signature, gallery)
+        return gallery
+
+def publish_face_gallery(gallery, gallery_path=FACE_GALLERY_PATH):
+    """Write a new gallery and swap it into the process-wide cache
+
+    The file is replaced atomically, so other processes pick it up on
+    their next ``load_face_gallery`` call; this process switches over
+    immediately without re-reading the file. The saved nearest-neighbour
+    index no longer matches the gallery and is removed, so matching is
+    exact until the next training run rebuilds it.
+
+    Args:
+        gallery (FaceGallery): Gallery to publish
+        gallery_path (str): Gallery file path
+    """
+    with _gallery_cache_lock:
+        gallery.save(gallery_path)
+        _gallery_cache[gallery_path] = (_file_signature(gallery_path), gallery)
+        if gallery_path == FACE_GALLERY_PATH and os.path.exists(FACE_INDEX_PATH):
+            os.remove(FACE_INDEX_PATH)
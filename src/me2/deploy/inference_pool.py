@@ -0,0 +1,352 @@
+"""Process-Pool Face Inference
+
+Runs face detection and encoding outside the GIL of the serving process:
+- Worker processes (one per core by default) each load the dlib models
+  once and are pinned to their own CPU core
+- Frames and face chips travel through pre-allocated shared-memory
+  slots, so only a slot index and the array shape are pickled
+- The number of slots bounds the jobs in flight: submitters block while
+  every slot is busy (backpressure) and give up after a timeout
+- Batches of chips are split across workers and encoded in parallel
+- Queue wait and compute time are recorded in the metrics registry
+
+Workers are started through a fork server, never forked from the serving
+process and its capture, encoder and event-log threads. They re-import
+the launching script as ``__mp_main__``, so scripts must keep device and
+model start-up out of that import.
+"""
+
+import os
+import sys
+import time
+import queue
+import atexit
+import threading
+import multiprocessing
+from multiprocessing import shared_memory
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+
+# Add config path
+current_dir = os.path.dirname(__file__)
+config_dir = os.path.join(current_dir, '../')
+sys.path.append(config_dir)
+import gui_app.config as cf
+from deploy.metrics import observe, increment
+
+# Pool settings
+IN_FLIGHT_PER_WORKER = 2       # Shared-memory slots per worker
+SUBMIT_TIMEOUT = 5.0           # Seconds to wait for a free slot before giving up
+CALL_TIMEOUT = 30.0            # Seconds to wait for a job's result before giving up
+STARTUP_TIMEOUT = 60.0         # Seconds for the workers to load their models
+START_METHOD = "forkserver"
+MIN_CHIPS_PER_WORKER = 2       # Smaller chip batches are not split further
+
+# Job kinds
+JOB_DETECT = "detect"
+JOB_ENCODE = "encode"
+JOB_EXTRACT_CHIPS = "extract_chips"
+JOB_ENCODE_CHIPS = "encode_chips"
+
+class InferencePoolBusyError(RuntimeError):
+    """Raised when no shared-memory slot frees up within the submit timeout"""
+
+class InferenceTimeoutError(RuntimeError):
+    """Raised when a worker does not return a job's result in time"""
+
+# Worker process state, set by _init_worker
+_worker_slots = []
+_worker_core = None
+
+def _init_worker(slot_names, counter, pin):
+    """Worker initializer: pin to a core, attach the slots and load the models"""
+    global _worker_slots, _worker_core
+
+    # One worker per core: keep native libraries single-threaded
+    for variable in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+        os.environ[variable] = "1"
+
+    with counter.get_lock():
+        index = counter.value
+        counter.value += 1
+    if pin and hasattr(os, "sched_setaffinity"):
+        cores = sorted(os.sched_getaffinity(0))
+        _worker_core = cores[index % len(cores)]
+        try:
+            os.sched_setaffinity(0, {_worker_core})
+        except OSError as e:
+            print(f"[WARNING] Inference worker {os.getpid()} not pinned: {e}")
+            _worker_core = None
+
+    _worker_slots = [shared_memory.SharedMemory(name=name) for name in slot_names]
+
+    # Load dlib models and the detection cascade before the first job
+    import face_recognition
+    from deploy.face_detection import get_face_detector
+    get_face_detector()
+
+def _slot_array(slot, shape, dtype):
+    """View of an array stored in a shared-memory slot (worker side)"""
+    return np.ndarray(shape, dtype=np.dtype(dtype), buffer=_worker_slots[slot].buf)
+
+def _run_job(kind, slot, shape, dtype, payload, args):
+    """Run one inference job in a worker
+
+    Args:
+        kind (str): One of the JOB_* kinds
+        slot (int): Shared-memory slot holding the input array, None if
+            the array was pickled into ``payload``
+        shape (tuple): Input array shape
+        dtype (str): Input array dtype
+        payload (np.ndarray): Input array when it did not fit a slot
+        args (tuple): Job arguments, e.g. the face boxes
+
+    Returns:
+        tuple: (result, compute_seconds, worker_pid, worker_core)
+    """
+    import face_recognition
+    from deploy.face_detection import get_face_detector
+    from modele.chip_store import extract_chips, encode_chips
+
+    start_time = time.time()
+    array = payload if slot is None else _slot_array(slot, shape, dtype)
+    if kind == JOB_DETECT:
+        result = get_face_detector(*args).detect(array)
+    elif kind == JOB_ENCODE:
+        result = np.array(face_recognition.face_encodings(array, list(args[0]))).reshape(-1, 128)
+    elif kind == JOB_EXTRACT_CHIPS:
+        result = extract_chips(array, list(args[0]))
+    elif kind == JOB_ENCODE_CHIPS:
+        result = encode_chips(array)
+    else:
+        raise ValueError(f"Unknown inference job '{kind}'")
+    # Results must not reference the slot, it is reused once the job returns
+    del array
+    return result, time.time() - start_time, os.getpid(), _worker_core
+
+def _ping():
+    """No-op job used to wait for worker start-up"""
+    return os.getpid(), _worker_core
+
+class InferencePool:
+    """Worker processes for face detection and encoding"""
+
+    def __init__(self, workers=None, pin=None, max_frame_pixels=None):
+        """
+        Args:
+            workers (int): Worker processes, defaults to ``cf.INFERENCE_WORKERS``
+                (0 = one per CPU core)
+            pin (bool): Pin each worker to its own core, defaults to
+                ``cf.INFERENCE_PIN_WORKERS``
+            max_frame_pixels (int): Largest RGB frame passed through shared
+                memory, defaults to ``cf.INFERENCE_MAX_FRAME_PIXELS``; larger
+                frames are pickled
+        """
+        self.workers = workers or cf.INFERENCE_WORKERS or os.cpu_count() or 1
+        self.pin = cf.INFERENCE_PIN_WORKERS if pin is None else pin
+        self.slot_bytes = 3 * (max_frame_pixels or cf.INFERENCE_MAX_FRAME_PIXELS)
+        self._slots = []
+        self._free_slots = queue.Queue()
+        self._executor = None
+        self._lock = threading.Lock()
+
+        # Counters
+        self.submitted = 0
+        self.completed = 0
+        self.rejected = 0
+        self.jobs_per_worker = {}
+        self.cores = {}
+
+    def start(self):
+        """Allocate the slots and start the workers (idempotent)
+
+        Blocks until the workers have loaded their models and answer jobs.
+
+        Returns:
+            InferencePool: self
+        """
+        self._running_executor()
+        return self
+
+    def _running_executor(self):
+        """Current executor, launching the workers on first use"""
+        with self._lock:
+            if self._executor is None:
+                self._launch()
+            return self._executor
+
+    def _launch(self):
+        """Create the slots and the worker processes (lock held)"""
+        if not self._slots:
+            for index in range(self.workers * IN_FLIGHT_PER_WORKER):
+                self._slots.append(shared_memory.SharedMemory(create=True, size=self.slot_bytes))
+                self._free_slots.put(index)
+
+        start_time = time.time()
+        context = multiprocessing.get_context(START_METHOD)
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=([slot.name for slot in self._slots], context.Value("i", 0), self.pin),
+        )
+        # Bring the workers up now instead of on the first attempt
+        pings = [self._executor.submit(_ping) for _ in range(self.workers)]
+        for ping in pings:
+            pid, core = ping.result(timeout=STARTUP_TIMEOUT)
+            self.cores[pid] = core
+        print(f"[INFO] Inference pool started with {self.workers} workers in "
+              f"{time.time() - start_time:.2f}s (pinned: {self.pin})")
+
+    def _restart(self, broken):
+        """Replace a pool whose worker died, unless another thread already did"""
+        with self._lock:
+            if self._executor is broken:
+                broken.shutdown(wait=False, cancel_futures=True)
+                increment("inference_pool_restarts")
+                print("[WARNING] Inference worker died - restarting the pool")
+                self.cores = {}
+                self._launch()
+            return self._executor
+
+    def submit(self, kind, array, *args):
+        """Queue one job, copying its input into a free shared-memory slot
+
+        Args:
+            kind (str): One of the JOB_* kinds
+            array (np.ndarray): Input frame or chips
+            *args: Job arguments
+
+        Returns:
+            concurrent.futures.Future: Resolves to (result, compute_seconds,
+            worker_pid, worker_core)
+
+        Raises:
+            InferencePoolBusyError: If every slot stays busy for ``SUBMIT_TIMEOUT``
+        """
+        executor = self._running_executor()
+        array = np.ascontiguousarray(array)
+        slot = None
+        if array.nbytes <= self.slot_bytes:
+            try:
+                slot = self._free_slots.get(timeout=SUBMIT_TIMEOUT)
+            except queue.Empty:
+                self.rejected += 1
+                increment("inference_pool_rejected")
+                raise InferencePoolBusyError(f"All {len(self._slots)} inference slots busy")
+            np.ndarray(array.shape, dtype=array.dtype, buffer=self._slots[slot].buf)[:] = array
+
+        submitted_at = time.time()
+        job = (_run_job, kind, slot, array.shape, array.dtype.str, array if slot is None else None, args)
+        try:
+            try:
+                future = executor.submit(*job)
+            except BrokenProcessPool:
+                future = self._restart(executor).submit(*job)
+        except Exception:
+            if slot is not None:
+                self._free_slots.put(slot)
+            raise
+        self.submitted += 1
+        future.add_done_callback(lambda done: self._finish(done, kind, slot, submitted_at))
+        return future
+
+    def _finish(self, future, kind, slot, submitted_at):
+        """Release the job's slot and record its timings"""
+        if slot is not None:
+            self._free_slots.put(slot)
+        if future.cancelled() or future.exception() is not None:
+            return
+        _, seconds, pid, _ = future.result()
+        self.completed += 1
+        self.jobs_per_worker[pid] = self.jobs_per_worker.get(pid, 0) + 1
+        observe(f"inference_{kind}", seconds)
+        observe("inference_queue", max(0.0, time.time() - submitted_at - seconds))
+
+    def _result(self, future, kind):
+        """Wait for a job's result, raising instead of hanging on a stuck worker"""
+        try:
+            return future.result(timeout=CALL_TIMEOUT)[0]
+        except FutureTimeoutError:
+            increment("inference_timeouts", job=kind)
+            raise InferenceTimeoutError(f"Inference job '{kind}' took longer than {CALL_TIMEOUT:.0f}s")
+
+    def _call(self, kind, array, *args):
+        return self._result(self.submit(kind, array, *args), kind)
+
+    def detect(self, rgb_frame):
+        """Detect faces in a worker, same contract as ``FaceDetector.detect``"""
+        return self._call(JOB_DETECT, rgb_frame, cf.FACE_DETECTOR_PROPOSAL,
+                          cf.FACE_DETECTOR_REFINE, cf.FACE_DETECTOR_WIDTH)
+
+    def encode(self, rgb_frame, boxes):
+        """Encode faces in a worker, same contract as ``face_recognition.face_encodings``"""
+        if not boxes:
+            return []
+        return list(self._call(JOB_ENCODE, rgb_frame, tuple(boxes)))
+
+    def extract_chips(self, rgb_image, boxes):
+        """Align faces in a worker, same contract as ``chip_store.extract_chips``"""
+        return self._call(JOB_EXTRACT_CHIPS, rgb_image, tuple(boxes))
+
+    def encode_chips(self, chips):
+        """Encode chips, split across the workers
+
+        Args:
+            chips (np.ndarray): uint8 chips of shape (F, 150, 150, 3)
+
+        Returns:
+            np.ndarray: float64 encodings of shape (F, 128)
+        """
+        if len(chips) == 0:
+            return np.empty((0, 128))
+        parts = max(1, min(self.workers, len(chips) // MIN_CHIPS_PER_WORKER))
+        futures = [self.submit(JOB_ENCODE_CHIPS, part) for part in np.array_split(chips, parts)]
+        return np.concatenate([self._result(future, JOB_ENCODE_CHIPS) for future in futures])
+
+    def stats(self):
+        """Pool counters for monitoring"""
+        return {
+            "workers": self.workers,
+            "running": self._executor is not None,
+            "slots": len(self._slots),
+            "free_slots": self._free_slots.qsize(),
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "jobs_per_worker": dict(self.jobs_per_worker),
+            "cores": dict(self.cores),
+        }
+
+    def shutdown(self):
+        """Stop the workers and release the shared memory"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+        for slot in self._slots:
+            slot.close()
+            slot.unlink()
+        self._slots = []
+        self._free_slots = queue.Queue()
+
+# One pool per serving process
+_inference_pool = None
+_inference_pool_lock = threading.Lock()
+
+def get_inference_pool():
+    """Get the process-wide inference pool
+
+    Returns:
+        InferencePool: Shared pool, None when ``cf.INFERENCE_POOL`` is off
+    """
+    global _inference_pool
+    if not cf.INFERENCE_POOL:
+        return None
+    with _inference_pool_lock:
+        if _inference_pool is None:
+            _inference_pool = InferencePool()
+            atexit.register(_inference_pool.shutdown)
+        return _inference_pool
@@ -0,0 +1,215 @@
+"""Authentication Job Scheduler
+
+Queues authentication attempts for the async web service:
+- Each attempt is a job with an id, a state and an event history
+- A bounded queue rejects new jobs once the host is saturated
+- One job per door at a time (a door's camera and microphone are
+  exclusive) and at most ``max_active`` jobs across all doors
+- Pipelines run in worker threads; their progress messages are
+  forwarded to async subscribers such as SSE streams
+"""
+
+import os
+import sys
+import time
+import uuid
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+# Add config path
+current_dir = os.path.dirname(__file__)
+config_dir = os.path.join(current_dir, '../')
+sys.path.append(config_dir)
+import gui_app.config as cf
+
+# Job states
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+# Terminal event types, the last event of every job
+FINAL_EVENTS = ("result", "failed")
+
+JOB_RETENTION_SECONDS = 300   # Finished jobs stay queryable this long
+DEFAULT_DOOR = "main"
+
+class QueueFullError(RuntimeError):
+    """Raised when the scheduler cannot accept another job"""
+
+class AuthJob:
+    """One queued or running authentication attempt
+
+    All methods must be called from the event loop thread.
+    """
+
+    def __init__(self, job_id, door):
+        self.job_id = job_id
+        self.door = door
+        self.state = JOB_QUEUED
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.result = None
+        self.events = []
+        self._subscribers = set()
+        self._task = None
+
+    @property
+    def is_finished(self):
+        return self.state in (JOB_DONE, JOB_FAILED)
+
+    def publish(self, event_type, **data):
+        """Record an event and hand it to every live subscriber"""
+        event = {"type": event_type, "job": self.job_id, "door": self.door,
+                 "time": round(time.time(), 3), **data}
+        self.events.append(event)
+        for queue in self._subscribers:
+            queue.put_nowait(event)
+
+    async def stream(self, heartbeat=None):
+        """Replay the job's events, then follow it until it finishes
+
+        Args:
+            heartbeat (float): Yield None after this many idle seconds so
+                the caller can keep its connection alive
+
+        Yields:
+            dict: Events, oldest first (None for heartbeats)
+        """
+        queue = asyncio.Queue()
+        history = list(self.events)
+        self._subscribers.add(queue)
+        try:
+            for event in history:
+                yield event
+            if self.is_finished:
+                return
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), heartbeat)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                yield event
+                if event["type"] in FINAL_EVENTS:
+                    return
+        finally:
+            self._subscribers.discard(queue)
+
+    def summary(self):
+        """JSON-serialisable view of the job"""
+        return {
+            "job": self.job_id,
+            "door": self.door,
+            "state": self.state,
+            "created": round(self.created, 3),
+            "started": self.started and round(self.started, 3),
+            "finished": self.finished and round(self.finished, 3),
+            "result": self.result,
+        }
+
+class AuthJobScheduler:
+    """Bounded scheduler running blocking authentication jobs off the event loop"""
+
+    def __init__(self, runner, max_active=None, max_queued=None):
+        """
+        Args:
+            runner (callable): ``runner(door, status_callback)`` running one
+                blocking attempt and returning a JSON-serialisable dict
+            max_active (int): Jobs running at once, defaults to ``cf.WEB_MAX_ACTIVE_JOBS``
+            max_queued (int): Jobs allowed to wait, defaults to ``cf.WEB_MAX_QUEUED_JOBS``
+        """
+        self.runner = runner
+        self.max_active = max_active or cf.WEB_MAX_ACTIVE_JOBS
+        self.max_queued = cf.WEB_MAX_QUEUED_JOBS if max_queued is None else max_queued
+        self.jobs = {}
+        self._slots = asyncio.Semaphore(self.max_active)
+        self._door_locks = {}
+        self._executor = ThreadPoolExecutor(max_workers=self.max_active, thread_name_prefix="auth-job")
+
+    def _door_lock(self, door):
+        lock = self._door_locks.get(door)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._door_locks[door] = lock
+        return lock
+
+    def _prune(self):
+        """Forget finished jobs past their retention time"""
+        cutoff = time.time() - JOB_RETENTION_SECONDS
+        for job_id in [job_id for job_id, job in self.jobs.items()
+                       if job.is_finished and job.finished < cutoff]:
+            del self.jobs[job_id]
+
+    def pending(self):
+        """Number of queued and running jobs"""
+        return sum(not job.is_finished for job in self.jobs.values())
+
+    def submit(self, door=DEFAULT_DOOR):
+        """Enqueue an authentication attempt (call from the event loop)
+
+        Args:
+            door (str): Door whose camera and microphone the job uses
+
+        Returns:
+            AuthJob: The queued job
+
+        Raises:
+            QueueFullError: When ``max_active + max_queued`` jobs are pending
+        """
+        self._prune()
+        pending = self.pending()
+        if pending >= self.max_active + self.max_queued:
+            raise QueueFullError(f"{pending} authentication jobs pending, try again later")
+
+        job = AuthJob(uuid.uuid4().hex, door)
+        self.jobs[job.job_id] = job
+        job.publish("queued", position=pending)
+        # Keep a reference, the loop only holds tasks weakly
+        job._task = asyncio.get_running_loop().create_task(self._run(job))
+        return job
+
+    def get(self, job_id):
+        """Job by id, None if unknown or expired"""
+        return self.jobs.get(job_id)
+
+    async def _run(self, job):
+        loop = asyncio.get_running_loop()
+
+        def status_callback(message):
+            # Called from the worker thread
+            loop.call_soon_threadsafe(lambda: job.publish("status", message=message))
+
+        # Take the door before a global slot so a busy door does not hold one
+        async with self._door_lock(job.door):
+            async with self._slots:
+                job.state = JOB_RUNNING
+                job.started = time.time()
+                job.publish("started", waited=round(job.started - job.created, 3))
+                try:
+                    result = await loop.run_in_executor(self._executor, self.runner, job.door, status_callback)
+                except Exception as e:
+                    job.state = JOB_FAILED
+                    job.finished = time.time()
+                    job.publish("failed", message=f"Authentication error: {e}")
+                    return
+                job.result = result
+                job.state = JOB_DONE
+                job.finished = time.time()
+                job.publish("result", **result)
+
+    def stats(self):
+        """Queue occupancy for health endpoints"""
+        running = [job for job in self.jobs.values() if job.state == JOB_RUNNING]
+        return {
+            "running": len(running),
+            "queued": sum(job.state == JOB_QUEUED for job in self.jobs.values()),
+            "max_active": self.max_active,
+            "max_queued": self.max_queued,
+            "busy_doors": sorted({job.door for job in running}),
+        }
+
+    def shutdown(self):
+        """Stop the worker threads once running jobs finish"""
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,228 @@
+"""Vectorized Face Matcher for Biometric Authentication
+
+Scores query face encodings against the whole face gallery at once:
+- Single NumPy distance computation for a batch of queries
+- Per-identity aggregation (min distance, mean distance or top-k vote)
+- Ranked candidates with distances for every query
+- Optional approximate nearest-neighbour index for very large galleries
+"""
+
+import os
+import sys
+import threading
+from collections import namedtuple
+
+import numpy as np
+
+# Add config path
+current_dir = os.path.dirname(__file__)
+config_dir = os.path.join(current_dir, '../')
+sys.path.append(config_dir)
+import gui_app.config as cf
+from deploy.face_index import get_face_index
+
+# Matching parameters
+FACE_MATCH_TOLERANCE = cf.FACE_CONFIDENCE  # Max euclidean distance for a match
+FACE_MATCH_AGGREGATION = "vote"
+FACE_MATCH_TOP_K = 5
+FACE_MATCH_ANN_CANDIDATES = 32  # Neighbours retrieved per query from an approximate index
+AGGREGATION_MODES = ("min", "mean", "vote")
+
+# Ranked match for one identity
+FaceCandidate = namedtuple("FaceCandidate", ["name", "distance", "votes"])
+
+class FaceMatcher:
+    """Batch face matcher over a packed face gallery"""
+
+    def __init__(self, gallery, tolerance=FACE_MATCH_TOLERANCE,
+                 aggregation=FACE_MATCH_AGGREGATION, top_k=FACE_MATCH_TOP_K, index=None):
+        """
+        Args:
+            gallery (FaceGallery): Enrolled face encodings
+            tolerance (float): Max distance for an encoding to count as a match
+            aggregation (str): 'min', 'mean' or 'vote'
+            top_k (int): Neighbours considered per query in 'vote' mode
+            index (FaceIndex): Approximate index to query instead of a full scan
+        """
+        if aggregation not in AGGREGATION_MODES:
+            raise ValueError(f"Unknown aggregation '{aggregation}', expected one of {AGGREGATION_MODES}")
+
+        self.gallery = gallery
+        self.tolerance = tolerance
+        self.aggregation = aggregation
+        self.top_k = top_k
+        self.index = index if index is not None and not index.exact else None
+
+        self._encodings = np.ascontiguousarray(gallery.encodings, dtype=np.float32)
+        self._squared_norms = np.einsum("ij,ij->i", self._encodings, self._encodings)
+
+        # Group gallery columns by identity so per-identity reductions are one reduceat
+        labels = np.asarray(gallery.labels)
+        self._order = np.argsort(labels, kind="stable")
+        sorted_labels = labels[self._order]
+        if len(sorted_labels):
+            boundaries = np.r_[True, sorted_labels[1:] != sorted_labels[:-1]]
+        else:
+            boundaries = np.empty(0, dtype=bool)
+        self._group_starts = np.flatnonzero(boundaries)
+        self._group_labels = sorted_labels[self._group_starts]
+        self._group_sizes = np.diff(np.r_[self._group_starts, len(sorted_labels)])
+
+        # Gallery column -> identity group position
+        self._column_group = np.empty(len(labels), dtype=np.intp)
+        self._column_group[self._order] = np.cumsum(boundaries) - 1
+
+    def distances(self, queries):
+        """Euclidean distances from every query to every gallery encoding
+
+        Args:
+            queries (array-like): Query encodings of shape (Q, dim)
+
+        Returns:
+            np.ndarray: Distance matrix of shape (Q, N)
+        """
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        query_norms = np.einsum("ij,ij->i", queries, queries)
+        squared = query_norms[:, None] + self._squared_norms[None, :] - 2.0 * (queries @ self._encodings.T)
+        np.maximum(squared, 0.0, out=squared)
+        return np.sqrt(squared)
+
+    def _group_reduce(self, values, ufunc):
+        """Reduce (Q, N) values per identity group with a ufunc"""
+        return ufunc.reduceat(values[:, self._order], self._group_starts, axis=1)
+
+    def match(self, queries, max_candidates=3):
+        """Rank enrolled identities for each query encoding
+
+        Args:
+            queries (array-like): Query encodings of shape (Q, dim)
+            max_candidates (int): Candidates returned per query
+
+        Returns:
+            list: One list of FaceCandidate per query, best first
+        """
+        if len(queries) == 0 or len(self._group_labels) == 0:
+            return [[] for _ in range(len(queries))]
+
+        if self.index is not None:
+            score_dist, votes, ranking, accepted = self._aggregate_neighbors(queries)
+        else:
+            score_dist, votes, ranking, accepted = self._aggregate_exact(queries)
+
+        results = []
+        for q in range(len(ranking)):
+            candidates = []
+            for group in ranking[q, :max_candidates]:
+                if not accepted[q, group]:
+                    continue
+                candidates.append(FaceCandidate(
+                    self.gallery.names[self._group_labels[group]],
+                    float(score_dist[q, group]),
+                    int(votes[q, group])
+                ))
+            results.append(candidates)
+        return results
+
+    def _aggregate_exact(self, queries):
+        """Per-identity scores from a full scan of the gallery"""
+        dist = self.distances(queries)
+        query_count, gallery_size = dist.shape
+        within = dist <= self.tolerance
+        min_dist = self._group_reduce(dist, np.minimum)
+
+        if self.aggregation == "vote":
+            k = min(self.top_k, gallery_size)
+            nearest = np.argpartition(dist, k - 1, axis=1)[:, :k]
+            nearest_within = np.take_along_axis(within, nearest, axis=1)
+            votes = np.zeros((query_count, len(self._group_labels)), dtype=np.int32)
+            rows = np.repeat(np.arange(query_count), k)
+            np.add.at(votes, (rows, self._column_group[nearest].ravel()), nearest_within.ravel())
+            score_dist = min_dist
+            ranking = np.lexsort((score_dist, -votes), axis=-1)
+            accepted = votes > 0
+        else:
+            votes = self._group_reduce(within.astype(np.int32), np.add)
+            if self.aggregation == "min":
+                score_dist = min_dist
+            else:
+                score_dist = self._group_reduce(dist, np.add) / self._group_sizes
+            ranking = np.argsort(score_dist, axis=1)
+            accepted = score_dist <= self.tolerance
+
+        return score_dist, votes, ranking, accepted
+
+    def _aggregate_neighbors(self, queries):
+        """Per-identity scores from the approximate index neighbours only"""
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        k = min(max(self.top_k, FACE_MATCH_ANN_CANDIDATES), len(self.gallery))
+        dist, columns = self.index.search(queries, k)
+        found = columns >= 0
+
+        query_count, group_count = len(queries), len(self._group_labels)
+        rows = np.broadcast_to(np.arange(query_count)[:, None], columns.shape)[found]
+        groups = self._column_group[columns[found]]
+        found_dist = dist[found]
+        within = found_dist <= self.tolerance
+
+        min_dist = np.full((query_count, group_count), np.inf)
+        np.minimum.at(min_dist, (rows, groups), found_dist)
+
+        if self.aggregation == "vote":
+            # Neighbours come back sorted, so the first top_k columns are the vote
+            in_top_k = np.broadcast_to(np.arange(columns.shape[1]) < self.top_k, columns.shape)[found]
+            votes = np.zeros((query_count, group_count), dtype=np.int32)
+            np.add.at(votes, (rows, groups), within & in_top_k)
+            score_dist = min_dist
+            ranking = np.lexsort((score_dist, -votes), axis=-1)
+            accepted = votes > 0
+        else:
+            votes = np.zeros((query_count, group_count), dtype=np.int32)
+            np.add.at(votes, (rows, groups), within)
+            if self.aggregation == "min":
+                score_dist = min_dist
+            else:
+                sums = np.zeros((query_count, group_count))
+                counts = np.zeros((query_count, group_count))
+                np.add.at(sums, (rows, groups), found_dist)
+                np.add.at(counts, (rows, groups), 1)
+                with np.errstate(invalid="ignore", divide="ignore"):
+                    score_dist = np.where(counts > 0, sums / counts, np.inf)
+            ranking = np.argsort(score_dist, axis=1)
+            accepted = score_dist <= self.tolerance
+
+        return score_dist, votes, ranking, accepted
+
+    def identify(self, queries):
+        """Best identity for each query encoding
+
+        Args:
+            queries (array-like): Query encodings of shape (Q, dim)
+
+        Returns:
+            list: Identity name per query, 'Unknown' when nothing matches
+        """
+        return [
+            candidates[0].name if candidates else "Unknown"
+            for candidates in self.match(queries, max_candidates=1)
+        ]
+
+# Matcher cache, rebuilt only when the gallery object changes
+_matcher_cache = (None, None)
+_matcher_cache_lock = threading.Lock()
+
+def get_face_matcher(gallery):
+    """Get a matcher for the given gallery, reusing the cached one if possible
+
+    Args:
+        gallery (FaceGallery): Current face gallery
+
+    Returns:
+        FaceMatcher: Matcher bound to ``gallery``
+    """
+    global _matcher_cache
+    with _matcher_cache_lock:
+        cached_gallery, cached_matcher = _matcher_cache
+        if cached_gallery is not gallery:
+            cached_matcher = FaceMatcher(gallery, index=get_face_index(gallery))
+            _matcher_cache = (gallery, cached_matcher)
+        return cached_matcher
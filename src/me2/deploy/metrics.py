@@ -0,0 +1,190 @@
+"""Pipeline Metrics
+
+In-process timing histograms and counters for the authentication hot path:
+- ``span(stage)`` context manager and ``observe(stage, seconds)`` for
+  code that already measures its own timings
+- Fixed-bucket histograms (O(log buckets) per observation, no samples kept)
+- Counters with label sets, e.g. authentication outcomes
+- Prometheus text exposition for ``/metrics`` and a snapshot for the GUI
+"""
+
+import time
+import bisect
+import threading
+from contextlib import contextmanager
+
+METRIC_PREFIX = "me2"
+
+# Latency buckets (seconds) from sub-millisecond matching to multi-second captures
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+    0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+class Histogram:
+    """Cumulative latency histogram with fixed bucket bounds"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # Last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        """Record one duration"""
+        slot = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            self.counts[slot] += 1
+            self.count += 1
+            self.sum += seconds
+
+    def quantile(self, q):
+        """Approximate quantile by linear interpolation inside its bucket
+
+        Args:
+            q (float): Quantile in [0, 1]
+
+        Returns:
+            float: Seconds, 0 if empty
+        """
+        with self._lock:
+            counts = list(self.counts)
+            total = self.count
+        if total == 0:
+            return 0.0
+        rank = q * total
+        cumulative = 0
+        for slot, count in enumerate(counts):
+            if cumulative + count >= rank and count > 0:
+                if slot == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[slot - 1] if slot > 0 else 0.0
+                return lower + (self.buckets[slot] - lower) * (rank - cumulative) / count
+            cumulative += count
+        return self.buckets[-1]
+
+    def state(self):
+        """Consistent copy of (bucket counts, count, sum)"""
+        with self._lock:
+            return list(self.counts), self.count, self.sum
+
+class MetricsRegistry:
+    """Stage latency histograms and labelled counters of one process"""
+
+    def __init__(self):
+        self._histograms = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+
+    def histogram(self, stage):
+        """Histogram of a stage, created on first use"""
+        histogram = self._histograms.get(stage)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(stage, Histogram())
+        return histogram
+
+    def observe(self, stage, seconds):
+        """Record a duration for a stage"""
+        self.histogram(stage).observe(seconds)
+
+    def increment(self, name, amount=1, **labels):
+        """Add to a counter identified by its name and label values"""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def counter(self, name, **labels):
+        """Current value of a counter; without labels, summed over all label sets"""
+        with self._lock:
+            if labels:
+                return self._counters.get((name, tuple(sorted(labels.items()))), 0)
+            return sum(value for (counter_name, _), value in self._counters.items() if counter_name == name)
+
+    def snapshot(self):
+        """Per-stage summary for dashboards
+
+        Returns:
+            dict: stage -> {"count", "mean_ms", "p50_ms", "p95_ms"}
+        """
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+        summary = {}
+        for stage, histogram in histograms:
+            _, count, total = histogram.state()
+            summary[stage] = {
+                "count": count,
+                "mean_ms": 1000.0 * total / count if count else 0.0,
+                "p50_ms": 1000.0 * histogram.quantile(0.5),
+                "p95_ms": 1000.0 * histogram.quantile(0.95),
+            }
+        return summary
+
+    def render_prometheus(self):
+        """Prometheus text exposition (version 0.0.4) of every metric
+
+        Returns:
+            str: Exposition text
+        """
+        name = f"{METRIC_PREFIX}_stage_duration_seconds"
+        lines = [
+            f"# HELP {name} Duration of authentication pipeline stages",
+            f"# TYPE {name} histogram",
+        ]
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+        for stage, histogram in histograms:
+            counts, count, total = histogram.state()
+            cumulative = 0
+            for bound, bucket_count in zip(histogram.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f'{name}_bucket{{stage="{stage}",le="{bound:g}"}} {cumulative}')
+            lines.append(f'{name}_bucket{{stage="{stage}",le="+Inf"}} {count}')
+            lines.append(f'{name}_sum{{stage="{stage}"}} {total:.6f}')
+            lines.append(f'{name}_count{{stage="{stage}"}} {count}')
+
+        with self._lock:
+            counters = sorted(self._counters.items())
+        declared = set()
+        for (counter_name, labels), value in counters:
+            full_name = f"{METRIC_PREFIX}_{counter_name}_total"
+            if full_name not in declared:
+                lines.append(f"# TYPE {full_name} counter")
+                declared.add(full_name)
+            label_text = ",".join(f'{key}="{label}"' for key, label in labels)
+            lines.append(f"{full_name}{{{label_text}}} {value}" if label_text else f"{full_name} {value}")
+
+        lines.append(f"# TYPE {METRIC_PREFIX}_uptime_seconds gauge")
+        lines.append(f"{METRIC_PREFIX}_uptime_seconds {time.time() - self.started_at:.1f}")
+        return "\n".join(lines) + "\n"
+
+# Process-wide registry shared by the pipeline, the web apps and the GUI
+_registry = MetricsRegistry()
+
+def get_metrics():
+    """Get the process-wide metrics registry"""
+    return _registry
+
+def observe(stage, seconds):
+    """Record a duration for a stage in the process-wide registry"""
+    _registry.observe(stage, seconds)
+
+def increment(name, amount=1, **labels):
+    """Add to a counter in the process-wide registry"""
+    _registry.increment(name, amount, **labels)
+
+@contextmanager
+def span(stage):
+    """Time the enclosed block as one observation of ``stage``
+
+    Example:
+        with span("face_encode"):
+            encodings = face_recognition.face_encodings(rgb, boxes)
+    """
+    start_time = time.perf_counter()
+    try:
+        yield
+    finally:
+        _registry.observe(stage, time.perf_counter() - start_time)
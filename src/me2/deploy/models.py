@@ -0,0 +1,180 @@
+"""Resident Model Registry for Biometric Authentication
+
+Keeps inference models loaded for the lifetime of the process:
+- Loads the ECAPA-TDNN speaker model exactly once
+- Warms the model up with a dummy batch before traffic is served
+- Hands out shared, thread-safe handles to the web app and the GUI
+- Starts the face inference worker processes during warm-up
+- Reports readiness for health checks and load balancers
+"""
+
+import os
+import sys
+import time
+import threading
+
+import torch
+from speechbrain.inference.speaker import SpeakerRecognition
+
+# Add config path
+current_dir = os.path.dirname(__file__)
+config_dir = os.path.join(current_dir, '../')
+sys.path.append(config_dir)
+import gui_app.config as cf
+from deploy.inference_pool import get_inference_pool
+
+# Speaker model settings
+SPEAKER_MODEL_SOURCE = "speechbrain/spkrec-ecapa-voxceleb"
+SPEAKER_MODEL_DIR = f"{cf.me2}/deploy/pretrained_models/spkrec-ecapa-voxceleb"
+
+# Warm-up settings (ECAPA-TDNN expects 16kHz mono input)
+WARMUP_SAMPLE_RATE = 16000
+WARMUP_DURATION = 1.0
+
+class SharedModel:
+    """Thread-safe handle around a resident model
+
+    Every method call on the wrapped model is serialized through a
+    re-entrant lock, so the same instance can be used concurrently by
+    Flask worker threads and Qt background threads.
+    """
+
+    def __init__(self, model, lock=None):
+        self._model = model
+        self.lock = lock or threading.RLock()
+
+    @property
+    def model(self):
+        """Underlying model (callers must hold ``lock`` while using it)"""
+        return self._model
+
+    def __getattr__(self, name):
+        attribute = getattr(self._model, name)
+        if not callable(attribute):
+            return attribute
+
+        def locked_call(*args, **kwargs):
+            with self.lock:
+                return attribute(*args, **kwargs)
+
+        return locked_call
+
+class ModelRegistry:
+    """Process-wide registry of resident inference models"""
+
+    def __init__(self):
+        self._load_lock = threading.Lock()
+        self._speaker_model = None
+        self._ready = threading.Event()
+        self._warmup_thread = None
+        self._error = None
+        self._load_seconds = None
+        self._warmup_seconds = None
+
+    def get_speaker_model(self):
+        """Return the shared speaker recognition handle, loading it on first use
+
+        Returns:
+            SharedModel: Thread-safe handle around the ECAPA-TDNN model
+        """
+        if self._speaker_model is None:
+            with self._load_lock:
+                if self._speaker_model is None:
+                    self._speaker_model = self._load_speaker_model()
+        return self._speaker_model
+
+    def _load_speaker_model(self):
+        """Load the ECAPA-TDNN model from the local pretrained directory"""
+        print("Loading speaker recognition model...")
+        start_time = time.time()
+        model = SpeakerRecognition.from_hparams(
+            source=SPEAKER_MODEL_SOURCE,
+            savedir=SPEAKER_MODEL_DIR
+        )
+        self._load_seconds = time.time() - start_time
+        print(f"Speaker model loaded in {self._load_seconds:.2f}s")
+        return SharedModel(model)
+
+    def warm_up(self):
+        """Load all models and run a dummy batch through them
+
+        Returns:
+            bool: True once the registry is ready to serve requests
+        """
+        try:
+            speaker_model = self.get_speaker_model()
+
+            start_time = time.time()
+            dummy_batch = torch.zeros(1, int(WARMUP_SAMPLE_RATE * WARMUP_DURATION))
+            dummy_lens = torch.ones(1)
+            speaker_model.encode_batch(dummy_batch, dummy_lens, normalize=False)
+            self._warmup_seconds = time.time() - start_time
+            print(f"Speaker model warmed up in {self._warmup_seconds:.2f}s")
+
+            # Face workers load dlib once here, not on the first attempt
+            inference_pool = get_inference_pool()
+            if inference_pool is not None:
+                inference_pool.start()
+
+            self._error = None
+            self._ready.set()
+        except Exception as e:
+            self._error = str(e)
+            print(f"Model warm-up failed: {e}")
+        return self._ready.is_set()
+
+    def start_warmup(self):
+        """Warm models up in a background thread (idempotent)
+
+        Returns:
+            threading.Thread: The warm-up thread
+        """
+        with self._load_lock:
+            if self._warmup_thread is None or (
+                not self._warmup_thread.is_alive() and not self._ready.is_set()
+            ):
+                self._warmup_thread = threading.Thread(
+                    target=self.warm_up, name="model-warmup", daemon=True
+                )
+                self._warmup_thread.start()
+        return self._warmup_thread
+
+    def is_ready(self):
+        """Check whether warm-up has completed successfully"""
+        return self._ready.is_set()
+
+    def wait_until_ready(self, timeout=None):
+        """Block until warm-up has completed
+
+        Args:
+            timeout (float): Maximum seconds to wait, None to wait forever
+
+        Returns:
+            bool: True if the registry is ready
+        """
+        return self._ready.wait(timeout)
+
+    def status(self):
+        """Describe the registry state for health endpoints
+
+        Returns:
+            dict: Readiness flag, load/warm-up timings and last error
+        """
+        return {
+            "ready": self.is_ready(),
+            "speaker_model_loaded": self._speaker_model is not None,
+            "load_seconds": self._load_seconds,
+            "warmup_seconds": self._warmup_seconds,
+            "error": self._error,
+        }
+
+# Global registry instance shared by the web app and the GUI
+_model_registry = ModelRegistry()
+
+def get_registry():
+    """Get the process-wide model registry"""
+    return _model_registry
+
+def get_speaker_model():
+    """Get the shared speaker recognition handle"""
+    return _model_registry.get_speaker_model()
@@ -0,0 +1,267 @@
+"""Parallel Authentication Pipeline
+
+Runs both biometric modalities at the same time:
+- Face recognition and voice recording/analysis in parallel threads
+- Cancels the other modality as soon as one fails decisively
+- Fuses the results through authenticate_user
+- Uploaded frames and audio clips can replace the local camera and
+  microphone, decoded and matched entirely in memory
+- Every attempt is appended to the authentication event log
+- Site doors run the same pipeline on their own camera and microphone,
+  sharing one batched face encoder
+
+End-to-end latency is close to max(face, voice) instead of their sum.
+"""
+
+import os
+import sys
+import time
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+# Add config path
+current_dir = os.path.dirname(__file__)
+config_dir = os.path.join(current_dir, '../')
+sys.path.append(config_dir)
+from deploy.decision import (
+    initialize_models, recognize_faces, process_voice, identify_voice, authenticate_user,
+    CAMERA_WARMUP_TIMEOUT
+)
+from deploy.capture import FrameSequence, decode_image, get_capture_service
+from deploy.voice_stream import decode_audio
+from deploy.metrics import observe
+from deploy.event_log import record_event
+
+# Upload limits per attempt
+MAX_UPLOAD_FRAMES = 16
+MAX_UPLOAD_AUDIO_SECONDS = 15.0
+PUBLIC_FAILURE_MESSAGE = "Authentication failed"
+
+# Outcome of one authentication attempt
+AuthenticationResult = namedtuple(
+    "AuthenticationResult",
+    ["is_authenticated", "user", "message", "face_names", "speaker", "elapsed",
+     "face_confidence", "voice_similarity", "latencies"]
+)
+
+def _describe_failure(face_names, speaker):
+    """Human readable reason for a failed attempt"""
+    if not face_names:
+        return "No recognized faces detected"
+    if speaker == "Unknown":
+        return "Voice not recognized"
+    if speaker not in face_names:
+        return f"Face and voice mismatch (voice: {speaker})"
+    return "Authentication failed"
+
+class AuthenticationPipeline:
+    """Orchestrates parallel face and voice authentication"""
+
+    def __init__(self, verification_model=None, status_callback=None, source="local"):
+        """
+        Args:
+            verification_model: Speaker model handle, defaults to the resident one
+            status_callback (callable): Receives progress messages (str)
+            source (str): Where the biometrics come from, recorded in the event log
+        """
+        self.verification_model = verification_model or initialize_models()
+        self.status_callback = status_callback
+        self.source = source
+        self.cancel_event = threading.Event()
+        self.latencies = {}
+
+    def _status(self, message):
+        if self.status_callback is not None:
+            self.status_callback(message)
+
+    def _timed(self, modality, function):
+        """Run one modality, recording its latency"""
+        start_time = time.time()
+        try:
+            return function()
+        finally:
+            self.latencies[modality] = time.time() - start_time
+
+    def _run_faces(self):
+        return recognize_faces(cancel_event=self.cancel_event)
+
+    def _run_voice(self):
+        return process_voice(self.verification_model, cancel_event=self.cancel_event, return_similarity=True)
+
+    def run(self):
+        """Capture and analyse both modalities concurrently
+
+        Returns:
+            AuthenticationResult: Fused decision with per-modality results
+        """
+        start_time = time.time()
+        self.cancel_event.clear()
+        self.latencies = {}
+        self._status("Capturing face and recording voice...")
+
+        face_names = set()
+        face_confidence = 0.0
+        speaker = "Unknown"
+        similarity = 0.0
+
+        with ThreadPoolExecutor(max_workers=2, thread_name_prefix="auth") as executor:
+            face_future = executor.submit(self._timed, "face", self._run_faces)
+            voice_future = executor.submit(self._timed, "voice", self._run_voice)
+            pending = {face_future, voice_future}
+
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+
+                if face_future in done:
+                    face_decision = face_future.result()
+                    face_names = face_decision.names
+                    face_confidence = face_decision.confidence
+                    if not face_names:
+                        # No known face: the voice result cannot change the outcome
+                        self._status("No recognized faces - stopping voice capture")
+                        self.cancel_event.set()
+                    elif pending:
+                        self._status(f"Face recognized ({', '.join(sorted(face_names))}) - analysing voice...")
+
+                if voice_future in done:
+                    _, speaker, similarity = voice_future.result()
+                    if speaker == "Unknown" and pending:
+                        # Unknown voice: the face result cannot change the outcome
+                        self._status("Voice not recognized - stopping face capture")
+                        self.cancel_event.set()
+
+        is_authenticated, user = authenticate_user(face_names, speaker)
+        elapsed = time.time() - start_time
+        observe("authentication", elapsed)
+        print(f"Authentication pipeline completed in {elapsed:.2f}s")
+
+        self.latencies["total"] = elapsed
+        if is_authenticated:
+            result = AuthenticationResult(True, user, f"Authentication successful for {user}",
+                                          face_names, speaker, elapsed, face_confidence, similarity,
+                                          dict(self.latencies))
+        else:
+            result = AuthenticationResult(False, speaker, _describe_failure(face_names, speaker),
+                                          face_names, speaker, elapsed, face_confidence, similarity,
+                                          dict(self.latencies))
+        self._record(result)
+        return result
+
+    def _record(self, result):
+        """Append the attempt to the event log (non-blocking)"""
+        record_event(
+            "authentication",
+            source=self.source,
+            user=result.user,
+            decision="granted" if result.is_authenticated else "denied",
+            message=result.message,
+            face={"names": sorted(result.face_names), "confidence": round(float(result.face_confidence), 4)},
+            voice={"speaker": result.speaker, "similarity": round(float(result.voice_similarity), 4)},
+            latency_ms={name: round(1000.0 * seconds, 1) for name, seconds in result.latencies.items()},
+        )
+
+    def cancel(self):
+        """Abort both modalities of a running attempt"""
+        self.cancel_event.set()
+
+class UploadAuthenticationPipeline(AuthenticationPipeline):
+    """Authenticates client-captured frames and audio instead of local devices"""
+
+    def __init__(self, frames, recording, sample_rate, verification_model=None, status_callback=None):
+        """
+        Args:
+            frames (list): BGR frames, oldest first
+            recording (np.ndarray): Audio samples of shape (frames, channels)
+            sample_rate (int): Sample rate of ``recording``
+            verification_model: Speaker model handle, defaults to the resident one
+            status_callback (callable): Receives progress messages (str)
+        """
+        super().__init__(verification_model, status_callback, source="upload")
+        self.frames = frames
+        self.recording = recording
+        self.sample_rate = sample_rate
+
+    def _run_faces(self):
+        return recognize_faces(cancel_event=self.cancel_event, frame_source=FrameSequence(self.frames))
+
+    def _run_voice(self):
+        return identify_voice(self.recording, self.sample_rate, self.verification_model, return_similarity=True)
+
+class DoorAuthenticationPipeline(AuthenticationPipeline):
+    """Authenticates at one door of a multi-door site"""
+
+    def __init__(self, door, verification_model=None, status_callback=None, face_encoder=None):
+        """
+        Args:
+            door (DoorConfig): Door whose camera and microphone are used
+            verification_model: Speaker model handle, defaults to the resident one
+            status_callback (callable): Receives progress messages (str)
+            face_encoder: ``(rgb_frame, boxes) -> encodings`` callable, e.g.
+                the door's handle on the shared encoding batcher
+        """
+        super().__init__(verification_model, status_callback, source=f"door:{door.name}")
+        self.door = door
+        self.face_encoder = face_encoder
+
+    def _run_faces(self):
+        frame_source = get_capture_service(self.door.camera)
+        if frame_source.wait_for_frame(-1, CAMERA_WARMUP_TIMEOUT) is None:
+            print(f"Camera of door '{self.door.name}' did not deliver a frame during warm-up")
+        return recognize_faces(cancel_event=self.cancel_event, frame_source=frame_source,
+                               face_encoder=self.face_encoder)
+
+    def _run_voice(self):
+        return process_voice(self.verification_model, cancel_event=self.cancel_event,
+                             return_similarity=True, device=self.door.audio_device)
+
+def authenticate_upload(images, audio, verification_model=None):
+    """Authenticate encoded frames and an audio clip sent by a remote client
+
+    Args:
+        images (list): Encoded images (bytes, JPEG/PNG), oldest first
+        audio (bytes): Encoded audio clip (WAV/FLAC/OGG)
+        verification_model: Speaker model handle, defaults to the resident one
+
+    Returns:
+        AuthenticationResult: Fused decision
+
+    Raises:
+        ValueError: If the upload is empty, too large or not decodable
+    """
+    if not images:
+        raise ValueError("No frames uploaded")
+    if len(images) > MAX_UPLOAD_FRAMES:
+        raise ValueError(f"Too many frames ({len(images)} > {MAX_UPLOAD_FRAMES})")
+    if not audio:
+        raise ValueError("No audio clip uploaded")
+
+    frames = [decode_image(data) for data in images]
+    recording, sample_rate = decode_audio(audio)
+    if len(recording) / sample_rate > MAX_UPLOAD_AUDIO_SECONDS:
+        raise ValueError(f"Audio clip longer than {MAX_UPLOAD_AUDIO_SECONDS:.0f}s")
+
+    return UploadAuthenticationPipeline(frames, recording, sample_rate, verification_model).run()
+
+def result_as_dict(result):
+    """Client-facing, JSON-serialisable view of an AuthenticationResult
+
+    Remote clients only learn whether they were admitted and as whom.
+    Recognized faces, the speaker and the match scores stay in the event
+    log, so they cannot be used to tune a spoof or list enrolled users.
+    """
+    if result.is_authenticated:
+        return {"is_authenticated": True, "user": result.user, "message": result.message}
+    return {"is_authenticated": False, "message": PUBLIC_FAILURE_MESSAGE}
+
+def run_authentication(verification_model=None, status_callback=None):
+    """Run one parallel face + voice authentication attempt
+
+    Args:
+        verification_model: Speaker model handle, defaults to the resident one
+        status_callback (callable): Receives progress messages (str)
+
+    Returns:
+        AuthenticationResult: Fused decision
+    """
+    return AuthenticationPipeline(verification_model, status_callback).run()
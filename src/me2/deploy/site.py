@@ -0,0 +1,75 @@
+"""Site Configuration
+
+Describes the doors served by one inference host:
+- One DoorConfig per ``cf.SITE_DOORS`` entry (camera, microphone,
+  actuator and latency objective)
+- Validation of names and required fields
+- Access to each door's actuator through the IoT controller registry
+"""
+
+import os
+import sys
+from collections import namedtuple
+
+# Add config path
+current_dir = os.path.dirname(__file__)
+config_dir = os.path.join(current_dir, '../')
+sys.path.append(config_dir)
+import gui_app.config as cf
+
+DEFAULT_SLO_MS = 8000
+
+DoorConfig = namedtuple(
+    "DoorConfig", ["name", "camera", "audio_device", "servo_pin", "arduino_port", "slo_ms"]
+)
+
+def parse_door(entry):
+    """Build a DoorConfig from one ``cf.SITE_DOORS`` entry
+
+    Raises:
+        ValueError: If the name or camera is missing
+    """
+    name = entry.get("name")
+    if not name:
+        raise ValueError(f"Site door without a name: {entry}")
+    if entry.get("camera") is None:
+        raise ValueError(f"Door '{name}' has no camera")
+    return DoorConfig(
+        name=name,
+        camera=entry["camera"],
+        audio_device=entry.get("audio_device"),
+        servo_pin=entry.get("servo_pin"),
+        arduino_port=entry.get("arduino_port"),
+        slo_ms=float(entry.get("slo_ms", DEFAULT_SLO_MS)),
+    )
+
+def load_site(entries=None):
+    """Doors of the site, in configuration order
+
+    Args:
+        entries (list): Door dicts, defaults to ``cf.SITE_DOORS``
+
+    Returns:
+        dict: Door name -> DoorConfig
+
+    Raises:
+        ValueError: On an invalid entry or duplicate door names
+    """
+    doors = {}
+    for entry in (cf.SITE_DOORS if entries is None else entries):
+        door = parse_door(entry)
+        if door.name in doors:
+            raise ValueError(f"Duplicate site door '{door.name}'")
+        doors[door.name] = door
+    if not doors:
+        raise ValueError("The site has no doors")
+    return doors
+
+def door_controller(door):
+    """IoT controller driving a door's actuator"""
+    from iot.iot import get_door_controller, SERVO_GPIO_PIN, ARDUINO_PORT
+    return get_door_controller(
+        door.name,
+        SERVO_GPIO_PIN if door.servo_pin is None else door.servo_pin,
+        ARDUINO_PORT if door.arduino_port is None else door.arduino_port,
+    )
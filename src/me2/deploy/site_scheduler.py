@@ -0,0 +1,179 @@
+"""Multi-Door Site Scheduler
+
+Serves every door of a site from one inference host:
+- One queue per door; a door runs at most one attempt at a time (its
+  camera, microphone and actuator are exclusive)
+- A shared pool of ``cf.SITE_WORKERS`` attempt slots, handed to the idle
+  door whose waiting attempt is closest to its latency objective
+  (earliest deadline first), so a busy door cannot starve the others
+- Face encodings of all doors go through one batched encoder
+- Per-door latency histograms and SLO violation counters
+- Granted attempts open the door through its own IoT controller
+"""
+
+import os
+import sys
+import time
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+
+# Add config path
+current_dir = os.path.dirname(__file__)
+config_dir = os.path.join(current_dir, '../')
+sys.path.append(config_dir)
+import gui_app.config as cf
+from deploy.site import load_site, door_controller
+from deploy.pipeline import DoorAuthenticationPipeline
+from deploy.encoder_batcher import get_encoding_batcher
+from deploy.metrics import observe, increment
+
+class _DoorAttempt:
+    """One authentication attempt waiting for or holding a worker"""
+
+    __slots__ = ("door", "status_callback", "submitted", "deadline", "future")
+
+    def __init__(self, door, status_callback):
+        self.door = door
+        self.status_callback = status_callback
+        self.submitted = time.time()
+        self.deadline = self.submitted + door.slo_ms / 1000.0
+        self.future = Future()
+
+class SiteScheduler:
+    """Fair, deadline-aware scheduling of authentication attempts across doors"""
+
+    def __init__(self, doors=None, workers=None, verification_model=None, actuate=True):
+        """
+        Args:
+            doors (dict): Door name -> DoorConfig, defaults to ``load_site()``
+            workers (int): Concurrent attempts across all doors, defaults to
+                ``cf.SITE_WORKERS`` (0 = one per door)
+            verification_model: Speaker model handle, loaded on first attempt if None
+            actuate (bool): Open the door after a successful attempt
+        """
+        self.doors = load_site() if doors is None else doors
+        self.workers = workers or cf.SITE_WORKERS or len(self.doors)
+        self.verification_model = verification_model
+        self.actuate = actuate
+        self.encoder = get_encoding_batcher()
+        self._queues = {name: deque() for name in self.doors}
+        self._busy = set()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="site")
+
+        # Counters
+        self.completed = {name: 0 for name in self.doors}
+        self.slo_violations = {name: 0 for name in self.doors}
+
+    def submit(self, door_name, status_callback=None):
+        """Queue an authentication attempt at a door
+
+        Args:
+            door_name (str): Configured door
+            status_callback (callable): Receives progress messages (str)
+
+        Returns:
+            concurrent.futures.Future: Resolves to the AuthenticationResult
+
+        Raises:
+            ValueError: If the door is not part of the site
+        """
+        door = self.doors.get(door_name)
+        if door is None:
+            raise ValueError(f"Unknown door '{door_name}'")
+        attempt = _DoorAttempt(door, status_callback)
+        with self._lock:
+            self._queues[door.name].append(attempt)
+            self._dispatch()
+        return attempt.future
+
+    def _dispatch(self):
+        """Start waiting attempts on free workers, earliest deadline first
+
+        Must be called with ``self._lock`` held.
+        """
+        while len(self._busy) < self.workers:
+            heads = [queue[0] for name, queue in self._queues.items() if queue and name not in self._busy]
+            if not heads:
+                return
+            attempt = min(heads, key=lambda head: head.deadline)
+            self._queues[attempt.door.name].popleft()
+            self._busy.add(attempt.door.name)
+            self._executor.submit(self._run, attempt)
+
+    def _encoder_for(self, attempt):
+        """Face encoder routing a door's faces through the shared batcher"""
+        def encode(rgb_frame, boxes):
+            return self.encoder.encode(attempt.door.name, rgb_frame, boxes, attempt.deadline)
+        return encode
+
+    def _run(self, attempt):
+        """Worker: run one attempt, actuate the door and free its slot"""
+        door = attempt.door
+        try:
+            if not attempt.future.set_running_or_notify_cancel():
+                return
+            if self.verification_model is None:
+                from deploy.decision import initialize_models
+                self.verification_model = initialize_models()
+            try:
+                result = DoorAuthenticationPipeline(
+                    door, self.verification_model, attempt.status_callback, self._encoder_for(attempt)
+                ).run()
+                if result.is_authenticated and self.actuate:
+                    door_controller(door).open_door()
+            except Exception as e:
+                print(f"[WARNING] Authentication at door '{door.name}' failed: {e}")
+                attempt.future.set_exception(e)
+                return
+
+            # Latency from submission, including time spent queued
+            elapsed = time.time() - attempt.submitted
+            observe(f"door_{door.name}", elapsed)
+            self.completed[door.name] += 1
+            if elapsed * 1000.0 > door.slo_ms:
+                self.slo_violations[door.name] += 1
+                increment("slo_violations", door=door.name)
+                print(f"[WARNING] Door '{door.name}' missed its {door.slo_ms:.0f} ms objective "
+                      f"({elapsed * 1000.0:.0f} ms)")
+            attempt.future.set_result(result)
+        finally:
+            with self._lock:
+                self._busy.discard(door.name)
+                self._dispatch()
+
+    def stats(self):
+        """Per-door queue and SLO counters for monitoring"""
+        with self._lock:
+            doors = {
+                name: {
+                    "queued": len(queue),
+                    "running": name in self._busy,
+                    "completed": self.completed[name],
+                    "slo_violations": self.slo_violations[name],
+                    "slo_ms": self.doors[name].slo_ms,
+                }
+                for name, queue in self._queues.items()
+            }
+        return {"workers": self.workers, "doors": doors, "encoder": self.encoder.stats()}
+
+    def shutdown(self):
+        """Cancel waiting attempts and wait for running ones"""
+        with self._lock:
+            for queue in self._queues.values():
+                while queue:
+                    queue.popleft().future.cancel()
+        self._executor.shutdown(wait=True)
+
+# One scheduler per inference host
+_site_scheduler = None
+_site_scheduler_lock = threading.Lock()
+
+def get_site_scheduler():
+    """Get the process-wide site scheduler, created on first use"""
+    global _site_scheduler
+    with _site_scheduler_lock:
+        if _site_scheduler is None:
+            _site_scheduler = SiteScheduler()
+        return _site_scheduler
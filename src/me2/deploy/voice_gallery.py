@@ -0,0 +1,356 @@
+"""Voice Gallery Store for Biometric Authentication
+
+Keeps enrolled speaker embeddings in a compact matrix layout:
+- L2-normalized float32 embedding matrix with per-row user labels
+- Per-user centroids and optional k prototypes per user
+- Identification as one matrix-vector cosine product, with an optional
+  re-rank of the best users on their raw embeddings
+"""
+
+import os
+import sys
+import pickle
+import threading
+
+import numpy as np
+
+# Add config path
+current_dir = os.path.dirname(__file__)
+config_dir = os.path.join(current_dir, '../')
+sys.path.append(config_dir)
+import gui_app.config as cf
+from deploy.face_index import kmeans
+
+# Gallery locations
+EMBEDDINGS_DIR = f"{cf.me2}/deploy/embeddings"
+VOICE_GALLERY_PATH = f"{EMBEDDINGS_DIR}/voices.gallery.npz"
+LEGACY_VOICE_PICKLE_PATH = f"{EMBEDDINGS_DIR}/encodings_voices.pickle"
+
+# Identification defaults
+VOICE_GALLERY_VERSION = 1
+VOICE_PROTOTYPES_PER_USER = cf.VOICE_PROTOTYPES_PER_USER
+VOICE_RERANK_USERS = 3
+
+def _to_vector(embedding):
+    """Flatten a torch tensor or array embedding into a float32 vector"""
+    if hasattr(embedding, "detach"):
+        embedding = embedding.detach().cpu().numpy()
+    return np.asarray(embedding, dtype=np.float32).reshape(-1)
+
+def _normalize(matrix):
+    """L2-normalize rows (or a single vector)"""
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-6)
+
+class VoiceGallery:
+    """Enrolled speaker embeddings with per-user centroids and prototypes"""
+
+    def __init__(self, embeddings, labels, names, centroids, prototypes=None, prototype_labels=None):
+        """
+        Args:
+            embeddings (np.ndarray): L2-normalized float32 matrix (N, dim)
+            labels (np.ndarray): int32 user index for each embedding row
+            names (list): User name table
+            centroids (np.ndarray): L2-normalized per-user centroids (U, dim)
+            prototypes (np.ndarray): Optional L2-normalized prototypes (P, dim)
+            prototype_labels (np.ndarray): User index for each prototype row
+        """
+        self.embeddings = embeddings
+        self.labels = labels
+        self.names = list(names)
+        self.centroids = centroids
+        self.prototypes = prototypes
+        self.prototype_labels = prototype_labels
+
+        # Rows of each user, for re-ranking on raw embeddings
+        order = np.argsort(labels, kind="stable")
+        offsets = np.r_[0, np.cumsum(np.bincount(labels, minlength=len(self.names)))]
+        self._user_rows = [order[offsets[u]:offsets[u + 1]] for u in range(len(self.names))]
+
+    @classmethod
+    def from_embeddings(cls, voice_embeddings, prototypes_per_user=VOICE_PROTOTYPES_PER_USER):
+        """Build a gallery from ``[(username, [embedding, ...]), ...]``
+
+        Args:
+            voice_embeddings (list): Per-user embedding lists (torch or NumPy)
+            prototypes_per_user (int): k-means prototypes per user, 0 to disable
+
+        Returns:
+            VoiceGallery: Packed gallery
+        """
+        names = []
+        rows = []
+        labels = []
+        for username, user_embeddings in voice_embeddings:
+            if not user_embeddings:
+                continue
+            label = len(names)
+            names.append(username)
+            for embedding in user_embeddings:
+                rows.append(_to_vector(embedding))
+                labels.append(label)
+
+        embeddings = _normalize(np.stack(rows)) if rows else np.empty((0, 0), dtype=np.float32)
+        labels = np.asarray(labels, dtype=np.int32)
+
+        centroids = np.stack([
+            embeddings[labels == u].mean(axis=0) for u in range(len(names))
+        ]) if names else np.empty((0, embeddings.shape[1]), dtype=np.float32)
+        centroids = _normalize(centroids).astype(np.float32)
+
+        prototypes = None
+        prototype_labels = None
+        if prototypes_per_user and names:
+            prototype_rows = []
+            prototype_owner = []
+            for u in range(len(names)):
+                user_rows = embeddings[labels == u]
+                if len(user_rows) <= prototypes_per_user:
+                    user_prototypes = user_rows
+                else:
+                    user_prototypes, _ = kmeans(user_rows, prototypes_per_user)
+                prototype_rows.append(_normalize(user_prototypes))
+                prototype_owner.extend([u] * len(user_prototypes))
+            prototypes = np.concatenate(prototype_rows).astype(np.float32)
+            prototype_labels = np.asarray(prototype_owner, dtype=np.int32)
+
+        return cls(embeddings.astype(np.float32), labels, names, centroids, prototypes, prototype_labels)
+
+    @classmethod
+    def from_pickle(cls, pickle_path=LEGACY_VOICE_PICKLE_PATH, prototypes_per_user=VOICE_PROTOTYPES_PER_USER):
+        """Convert the legacy ``[(username, [tensor, ...]), ...]`` pickle
+
+        Args:
+            pickle_path (str): Path to the legacy voice embeddings pickle
+            prototypes_per_user (int): k-means prototypes per user, 0 to disable
+
+        Returns:
+            VoiceGallery: Packed gallery
+        """
+        with open(pickle_path, "rb") as f:
+            voice_embeddings = pickle.load(f)
+        return cls.from_embeddings(voice_embeddings, prototypes_per_user)
+
+    def __len__(self):
+        return len(self.labels)
+
+    @property
+    def user_count(self):
+        """Number of enrolled users"""
+        return len(self.names)
+
+    def with_user(self, username, user_embeddings, prototypes_per_user=VOICE_PROTOTYPES_PER_USER):
+        """Copy of the gallery with one user's embeddings replaced
+
+        Only the affected user's centroid and prototypes are recomputed;
+        the current gallery is left untouched (copy-on-write).
+
+        Args:
+            username (str): User to add or re-enroll
+            user_embeddings (list): New embeddings (torch or NumPy)
+            prototypes_per_user (int): k-means prototypes, used when the
+                gallery has prototypes
+
+        Returns:
+            VoiceGallery: New gallery
+        """
+        rows = _normalize(np.stack([_to_vector(e) for e in user_embeddings])).astype(np.float32)
+        if username in self.names:
+            label = self.names.index(username)
+            names = self.names
+            keep = self.labels != label
+        else:
+            label = len(self.names)
+            names = self.names + [username]
+            keep = np.ones(len(self.labels), dtype=bool)
+
+        embeddings = np.concatenate([self.embeddings[keep], rows])
+        labels = np.concatenate([self.labels[keep], np.full(len(rows), label, dtype=np.int32)])
+
+        centroids = np.array(self.centroids, copy=True)
+        centroid = _normalize(rows.mean(axis=0)).astype(np.float32)
+        if label < len(centroids):
+            centroids[label] = centroid
+        else:
+            centroids = np.concatenate([centroids, centroid[None, :]])
+
+        prototypes = self.prototypes
+        prototype_labels = self.prototype_labels
+        if prototypes is not None:
+            if len(rows) <= prototypes_per_user:
+                user_prototypes = rows
+            else:
+                user_prototypes, _ = kmeans(rows, prototypes_per_user)
+            keep_prototypes = prototype_labels != label
+            prototypes = np.concatenate([
+                prototypes[keep_prototypes], _normalize(user_prototypes).astype(np.float32)
+            ])
+            prototype_labels = np.concatenate([
+                prototype_labels[keep_prototypes],
+                np.full(len(user_prototypes), label, dtype=np.int32)
+            ])
+
+        return VoiceGallery(embeddings, labels, names, centroids, prototypes, prototype_labels)
+
+    def save(self, gallery_path=VOICE_GALLERY_PATH):
+        """Write the gallery atomically as an .npz archive
+
+        Args:
+            gallery_path (str): Destination file path
+        """
+        os.makedirs(os.path.dirname(gallery_path) or ".", exist_ok=True)
+        arrays = {
+            "version": np.array(VOICE_GALLERY_VERSION),
+            "embeddings": self.embeddings,
+            "labels": self.labels,
+            "names": np.array(self.names, dtype=str),
+            "centroids": self.centroids,
+        }
+        if self.prototypes is not None:
+            arrays["prototypes"] = self.prototypes
+            arrays["prototype_labels"] = self.prototype_labels
+
+        temp_path = f"{gallery_path}.tmp.npz"
+        np.savez(temp_path, **arrays)
+        os.replace(temp_path, gallery_path)
+
+    @classmethod
+    def load(cls, gallery_path=VOICE_GALLERY_PATH):
+        """Open a gallery file
+
+        Args:
+            gallery_path (str): Gallery file path
+
+        Returns:
+            VoiceGallery: Loaded gallery
+
+        Raises:
+            ValueError: If the file version is not supported
+        """
+        with np.load(gallery_path) as archive:
+            version = int(archive["version"])
+            if version != VOICE_GALLERY_VERSION:
+                raise ValueError(f"Unsupported voice gallery version {version}: {gallery_path}")
+            has_prototypes = "prototypes" in archive.files
+            return cls(
+                archive["embeddings"],
+                archive["labels"],
+                archive["names"].tolist(),
+                archive["centroids"],
+                archive["prototypes"] if has_prototypes else None,
+                archive["prototype_labels"] if has_prototypes else None,
+            )
+
+    def user_scores(self, query):
+        """Cosine similarity of a query to every user
+
+        Uses the best prototype per user when prototypes exist, the
+        user centroid otherwise.
+
+        Args:
+            query (array-like): Query embedding
+
+        Returns:
+            np.ndarray: Similarity per user (U,)
+        """
+        query = _normalize(_to_vector(query))
+        if self.prototypes is None:
+            return self.centroids @ query
+
+        scores = np.full(self.user_count, -np.inf, dtype=np.float32)
+        np.maximum.at(scores, self.prototype_labels, self.prototypes @ query)
+        return scores
+
+    def ranked_scores(self, query, rerank_users=VOICE_RERANK_USERS):
+        """Per-user similarity with the best users re-scored on raw embeddings
+
+        Args:
+            query (array-like): Query embedding (torch tensor or array)
+            rerank_users (int): Best users re-scored on their raw embeddings,
+                0 to keep the centroid/prototype score
+
+        Returns:
+            np.ndarray: Similarity per user (U,); when re-ranking, users
+            outside the shortlist score -inf so both scales never compete
+        """
+        scores = self.user_scores(query)
+
+        if rerank_users:
+            query_vector = _normalize(_to_vector(query))
+            shortlist = np.argsort(scores)[::-1][:rerank_users]
+            reranked = np.full(self.user_count, -np.inf, dtype=np.float32)
+            for user in shortlist:
+                reranked[user] = float(np.max(self.embeddings[self._user_rows[user]] @ query_vector))
+            scores = reranked
+        return scores
+
+    def identify(self, query, threshold, rerank_users=VOICE_RERANK_USERS):
+        """Identify the speaker of a query embedding
+
+        Args:
+            query (array-like): Query embedding (torch tensor or array)
+            threshold (float): Minimum cosine similarity to accept
+            rerank_users (int): Best users re-scored on their raw embeddings,
+                0 to keep the centroid/prototype score
+
+        Returns:
+            tuple: (is_authenticated, speaker_name, similarity)
+        """
+        if self.user_count == 0:
+            return False, "Unknown", 0.0
+
+        scores = self.ranked_scores(query, rerank_users)
+        best_user = int(np.argmax(scores))
+        similarity = float(scores[best_user])
+        if similarity > threshold:
+            return True, self.names[best_user], similarity
+        return False, "Unknown", similarity
+
+# Process-wide gallery cache, invalidated when the file changes
+_gallery_cache = {}
+_gallery_cache_lock = threading.Lock()
+
+def load_voice_gallery(gallery_path=VOICE_GALLERY_PATH):
+    """Get the voice gallery, loading it only when the file has changed
+
+    Falls back to converting the legacy pickle once if no gallery file
+    exists yet.
+
+    Args:
+        gallery_path (str): Gallery file path
+
+    Returns:
+        VoiceGallery: Cached gallery, or None if nothing is enrolled
+    """
+    with _gallery_cache_lock:
+        if not os.path.exists(gallery_path):
+            if gallery_path != VOICE_GALLERY_PATH or not os.path.exists(LEGACY_VOICE_PICKLE_PATH):
+                return None
+            print("Converting legacy voice embeddings to gallery format...")
+            VoiceGallery.from_pickle(LEGACY_VOICE_PICKLE_PATH).save(gallery_path)
+
+        stat = os.stat(gallery_path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        cached = _gallery_cache.get(gallery_path)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+
+        print(f"Loading voice gallery from {gallery_path}...")
+        gallery = VoiceGallery.load(gallery_path)
+        _gallery_cache[gallery_path] = (signature, gallery)
+        return gallery
+
+def publish_voice_gallery(gallery, gallery_path=VOICE_GALLERY_PATH):
+    """Write a new gallery and swap it into the process-wide cache
+
+    Other processes pick up the atomically replaced file on their next
+    ``load_voice_gallery`` call.
+
+    Args:
+        gallery (VoiceGallery): Gallery to publish
+        gallery_path (str): Gallery file path
+    """
+    with _gallery_cache_lock:
+        gallery.save(gallery_path)
+        stat = os.stat(gallery_path)
+        _gallery_cache[gallery_path] = ((stat.st_mtime_ns, stat.st_size), gallery)
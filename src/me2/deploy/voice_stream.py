@@ -0,0 +1,416 @@
+"""Streaming Voice Recognition with Voice-Activity Detection
+
+Identifies the speaker while they are still talking:
+- Audio sources: live microphone (sounddevice.InputStream callbacks)
+  or a WAV file replayed as a simulated stream
+- Energy-based voice-activity detection with an adaptive noise floor
+- ECAPA-TDNN embeddings on sliding windows of speech only
+- Stops as soon as the best user and similarity margin are stable
+
+Usage:
+    python voice_stream.py recording.wav [--realtime]
+"""
+
+import io
+import os
+import sys
+import time
+import queue
+import argparse
+from collections import namedtuple
+
+import numpy as np
+import torch
+import torchaudio
+import sounddevice as sd
+import soundfile as sf
+
+# Add config path
+current_dir = os.path.dirname(__file__)
+config_dir = os.path.join(current_dir, '../')
+sys.path.append(config_dir)
+import gui_app.config as cf
+from deploy.voice_gallery import load_voice_gallery
+from deploy.metrics import span
+
+# Model input format
+MODEL_SAMPLE_RATE = 16000
+
+# Stream and VAD settings
+STREAM_BLOCK_DURATION = 0.1   # Seconds per audio block
+VAD_FRAME_DURATION = 0.03     # Seconds per VAD decision
+VAD_NOISE_FACTOR = 3.0        # Speech when energy exceeds noise floor by this factor
+VAD_MIN_RMS = 0.005           # Absolute energy floor for speech
+VAD_HANGOVER_FRAMES = 8       # Frames kept after speech ends (word tails)
+
+# Early decision settings
+VOICE_STREAM_MAX_DURATION = cf.RECORDING_DURATION  # Hard cap on listening time
+VOICE_STREAM_STALL_MARGIN = 2.0   # Wall-clock seconds past the cap before a stalled source is abandoned
+VOICE_STREAM_MIN_SPEECH = 1.5     # Speech seconds before the first evaluation
+VOICE_STREAM_WINDOW = 3.0         # Speech seconds per embedding window
+VOICE_STREAM_HOP = 0.5            # New speech seconds between evaluations
+VOICE_STREAM_STABLE_WINDOWS = 2   # Consecutive agreeing evaluations to stop
+VOICE_STREAM_MIN_MARGIN = 0.05    # Best-vs-runner-up similarity margin to stop
+VOICE_STREAM_MARGIN_TOLERANCE = 0.05  # Max margin change between evaluations
+
+# Outcome of streaming voice recognition
+VoiceDecision = namedtuple(
+    "VoiceDecision",
+    ["is_authenticated", "speaker", "similarity", "margin",
+     "audio_seconds", "speech_seconds", "evaluations", "early_exit"]
+)
+
+def to_model_waveform(samples, sample_rate):
+    """Convert a NumPy recording to the model's mono 16kHz tensor
+
+    Args:
+        samples (np.ndarray): Audio of shape (frames,) or (frames, channels)
+        sample_rate (int): Sample rate of ``samples``
+
+    Returns:
+        torch.Tensor: float32 waveform of shape (frames,) at 16kHz
+    """
+    samples = np.asarray(samples, dtype=np.float32)
+    if samples.ndim == 2:
+        samples = samples.mean(axis=1)  # Channel mixdown
+    waveform = torch.from_numpy(np.ascontiguousarray(samples))
+    if sample_rate != MODEL_SAMPLE_RATE:
+        waveform = torchaudio.functional.resample(waveform, sample_rate, MODEL_SAMPLE_RATE)
+    return waveform
+
+def decode_audio(data):
+    """Decode an audio file (WAV, FLAC, OGG) held in memory
+
+    Args:
+        data (bytes): Encoded audio
+
+    Returns:
+        tuple: (float32 samples of shape (frames, channels), sample_rate)
+
+    Raises:
+        ValueError: If the data is not readable audio or is empty
+    """
+    try:
+        samples, sample_rate = sf.read(io.BytesIO(data), dtype="float32", always_2d=True)
+    except RuntimeError as e:
+        raise ValueError(f"Unsupported or corrupt audio: {e}")
+    if len(samples) == 0:
+        raise ValueError("Empty audio clip")
+    return samples, sample_rate
+
+class MicrophoneSource:
+    """Live microphone blocks delivered through an InputStream callback"""
+
+    def __init__(self, sample_rate=cf.AUDIO_SAMPLE_RATE, block_duration=STREAM_BLOCK_DURATION,
+                 device=None, channels=1):
+        """
+        Args:
+            sample_rate (int): Capture sample rate
+            block_duration (float): Seconds per delivered block
+            device: sounddevice input device, None for the default
+            channels (int): Captured channels (mixed down to mono)
+        """
+        self.sample_rate = sample_rate
+        self.finished = False
+        self.overflows = 0
+        self.blocks_dropped = 0
+        self._queue = queue.Queue(maxsize=int(VOICE_STREAM_MAX_DURATION / block_duration) + 10)
+        self._stream = sd.InputStream(
+            samplerate=sample_rate,
+            blocksize=int(sample_rate * block_duration),
+            device=device,
+            channels=channels,
+            dtype="float32",
+            callback=self._callback,
+        )
+        self._stream.start()
+
+    def _callback(self, indata, frames, time_info, status):
+        """Runs on the PortAudio thread - copy and hand off only"""
+        if status:
+            self.overflows += 1
+        try:
+            self._queue.put_nowait(indata.mean(axis=1).copy())
+        except queue.Full:
+            self.blocks_dropped += 1
+
+    def read(self, timeout=None):
+        """Next mono block, or None on timeout"""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        """Stop and close the input stream"""
+        self.finished = True
+        self._stream.stop()
+        self._stream.close()
+
+class WavFileSource:
+    """WAV file replayed block by block as a simulated live stream"""
+
+    def __init__(self, audio_path, block_duration=STREAM_BLOCK_DURATION, realtime=False):
+        """
+        Args:
+            audio_path (str): Audio file readable by soundfile
+            block_duration (float): Seconds per delivered block
+            realtime (bool): Pace blocks at wall-clock speed like a microphone
+        """
+        self._file = sf.SoundFile(audio_path)
+        self.sample_rate = self._file.samplerate
+        self.finished = False
+        self._block_frames = int(self.sample_rate * block_duration)
+        self._realtime = realtime
+        self._start_time = time.time()
+        self._delivered = 0
+
+    def read(self, timeout=None):
+        """Next mono block, or None once the file is exhausted"""
+        if self.finished:
+            return None
+        block = self._file.read(self._block_frames, dtype="float32", always_2d=True)
+        if not len(block):
+            self.finished = True
+            return None
+
+        if self._realtime:
+            due = self._start_time + self._delivered / self.sample_rate
+            time.sleep(max(0.0, due - time.time()))
+        self._delivered += len(block)
+        return block.mean(axis=1)
+
+    def close(self):
+        """Close the underlying file"""
+        self.finished = True
+        self._file.close()
+
+class EnergyVAD:
+    """Frame-energy voice-activity detector with an adaptive noise floor"""
+
+    def __init__(self, sample_rate, frame_duration=VAD_FRAME_DURATION):
+        self.frame_size = max(1, int(sample_rate * frame_duration))
+        self.noise_floor = None
+        self._pending = np.empty(0, dtype=np.float32)
+        self._hangover = 0
+
+    def process(self, block):
+        """Return the voiced samples of a block
+
+        Args:
+            block (np.ndarray): Mono float32 samples
+
+        Returns:
+            np.ndarray: Concatenated voiced frames (possibly empty)
+        """
+        samples = np.concatenate([self._pending, block]) if len(self._pending) else block
+        frame_count = len(samples) // self.frame_size
+        self._pending = samples[frame_count * self.frame_size:]
+        if frame_count == 0:
+            return np.empty(0, dtype=np.float32)
+
+        frames = samples[:frame_count * self.frame_size].reshape(frame_count, self.frame_size)
+        energies = np.sqrt(np.mean(frames * frames, axis=1))
+
+        voiced = np.zeros(frame_count, dtype=bool)
+        for i, energy in enumerate(energies):
+            if self.noise_floor is None:
+                self.noise_floor = energy
+            threshold = max(self.noise_floor * VAD_NOISE_FACTOR, VAD_MIN_RMS)
+            if energy > threshold:
+                voiced[i] = True
+                self._hangover = VAD_HANGOVER_FRAMES
+            else:
+                # Track the floor quickly downwards, slowly upwards
+                self.noise_floor = min(energy, self.noise_floor * 1.05) if energy < self.noise_floor \
+                    else self.noise_floor * 0.95 + energy * 0.05
+                if self._hangover > 0:
+                    voiced[i] = True
+                    self._hangover -= 1
+
+        return frames[voiced].reshape(-1)
+
+class StreamingVoiceRecognizer:
+    """Identifies a speaker from sliding windows of detected speech"""
+
+    def __init__(self, verification_model, voice_gallery, threshold):
+        """
+        Args:
+            verification_model: Speaker model handle (encode_batch)
+            voice_gallery (VoiceGallery): Enrolled speakers
+            threshold (float): Minimum cosine similarity to accept
+        """
+        self.verification_model = verification_model
+        self.voice_gallery = voice_gallery
+        self.threshold = threshold
+
+    def _evaluate(self, speech, sample_rate):
+        """Embed a speech window and score it against the gallery
+
+        Returns:
+            tuple: (best_name, similarity, margin)
+        """
+        with span("voice_embedding"):
+            waveform = to_model_waveform(speech, sample_rate)
+            embedding = self.verification_model.encode_batch(waveform.unsqueeze(0), None, normalize=False)
+        with span("voice_match"):
+            scores = self.voice_gallery.ranked_scores(embedding)
+
+        order = np.argsort(scores)[::-1]
+        best = float(scores[order[0]])
+        # Without a second (shortlisted) user the margin is measured to the threshold
+        runner_up = float(scores[order[1]]) if len(order) > 1 and np.isfinite(scores[order[1]]) \
+            else self.threshold
+        return self.voice_gallery.names[order[0]], best, best - runner_up
+
+    def _is_stable(self, history):
+        """Same accepted user with a steady, sufficient margin"""
+        if len(history) < VOICE_STREAM_STABLE_WINDOWS:
+            return False
+        recent = history[-VOICE_STREAM_STABLE_WINDOWS:]
+        names = {name for name, _, _ in recent}
+        margins = [margin for _, _, margin in recent]
+        return (
+            len(names) == 1
+            and all(similarity > self.threshold for _, similarity, _ in recent)
+            and min(margins) >= VOICE_STREAM_MIN_MARGIN
+            and max(margins) - min(margins) <= VOICE_STREAM_MARGIN_TOLERANCE
+        )
+
+    def run(self, source, cancel_event=None, max_duration=VOICE_STREAM_MAX_DURATION):
+        """Consume an audio source until a stable decision or the time cap
+
+        Args:
+            source: MicrophoneSource, WavFileSource or any object with
+                ``read(timeout)``, ``sample_rate`` and ``finished``
+            cancel_event (threading.Event): Set by another thread to abort
+            max_duration (float): Maximum seconds of audio to consume; a
+                source that stalls is abandoned ``VOICE_STREAM_STALL_MARGIN``
+                seconds after this much wall-clock time
+
+        Returns:
+            VoiceDecision: Speaker decision and how much audio it needed,
+            Unknown if the source stalled
+        """
+        sample_rate = source.sample_rate
+        vad = EnergyVAD(sample_rate)
+        max_samples = int(max_duration * sample_rate)
+        window_samples = int(VOICE_STREAM_WINDOW * sample_rate)
+        hop_samples = int(VOICE_STREAM_HOP * sample_rate)
+        min_speech_samples = int(VOICE_STREAM_MIN_SPEECH * sample_rate)
+
+        # Speech is bounded by max_duration, so preallocate it once
+        speech = np.empty(max_samples, dtype=np.float32)
+        speech_length = 0
+        audio_samples = 0
+        evaluated_at = 0
+        history = []
+        early_exit = False
+        deadline = time.time() + max_duration + VOICE_STREAM_STALL_MARGIN
+
+        while audio_samples < max_samples:
+            if time.time() > deadline:
+                print(f"[WARNING] Audio source stalled after {audio_samples / sample_rate:.1f}s of audio")
+                return VoiceDecision(False, "Unknown", 0.0, 0.0, audio_samples / sample_rate,
+                                     speech_length / sample_rate, len(history), False)
+            if cancel_event is not None and cancel_event.is_set():
+                print("Voice stream cancelled")
+                return VoiceDecision(False, "Unknown", 0.0, 0.0, audio_samples / sample_rate,
+                                     speech_length / sample_rate, len(history), False)
+
+            block = source.read(timeout=0.5)
+            if block is None:
+                if source.finished:
+                    break
+                continue
+            block = block[:max_samples - audio_samples]
+            audio_samples += len(block)
+
+            voiced = vad.process(block)
+            voiced = voiced[:max_samples - speech_length]
+            speech[speech_length:speech_length + len(voiced)] = voiced
+            speech_length += len(voiced)
+
+            if speech_length >= min_speech_samples and speech_length - evaluated_at >= hop_samples:
+                window = speech[max(0, speech_length - window_samples):speech_length]
+                history.append(self._evaluate(window, sample_rate))
+                evaluated_at = speech_length
+                if self._is_stable(history):
+                    early_exit = True
+                    break
+
+        # Final decision on whatever speech was collected
+        if not early_exit and speech_length > 0 and speech_length != evaluated_at:
+            window = speech[max(0, speech_length - window_samples):speech_length]
+            history.append(self._evaluate(window, sample_rate))
+
+        if not history:
+            return VoiceDecision(False, "Unknown", 0.0, 0.0, audio_samples / sample_rate,
+                                 speech_length / sample_rate, 0, False)
+
+        name, similarity, margin = history[-1]
+        is_authenticated = similarity > self.threshold
+        return VoiceDecision(
+            is_authenticated,
+            name if is_authenticated else "Unknown",
+            similarity,
+            margin,
+            audio_samples / sample_rate,
+            speech_length / sample_rate,
+            len(history),
+            early_exit,
+        )
+
+def recognize_voice_stream(verification_model, threshold, source=None, cancel_event=None, device=None):
+    """Identify the speaker from a live or simulated audio stream
+
+    Args:
+        verification_model: Speaker model handle
+        threshold (float): Minimum cosine similarity to accept
+        source: Audio source, defaults to the microphone
+        cancel_event (threading.Event): Set by another thread to abort
+        device: Microphone used when no source is given, defaults to
+            ``cf.AUDIO_INPUT_DEVICE``
+
+    Returns:
+        VoiceDecision: Speaker decision
+    """
+    voice_gallery = load_voice_gallery()
+    if voice_gallery is None:
+        raise FileNotFoundError("Voice gallery not found - train the voice model first")
+
+    owns_source = source is None
+    if owns_source:
+        source = MicrophoneSource(device=cf.AUDIO_INPUT_DEVICE if device is None else device)
+    try:
+        decision = StreamingVoiceRecognizer(verification_model, voice_gallery, threshold).run(
+            source, cancel_event
+        )
+    finally:
+        if owns_source:
+            source.close()
+
+    print(f"Voice stream: {decision.speaker} (similarity: {decision.similarity:.3f}, "
+          f"margin: {decision.margin:.3f}, audio: {decision.audio_seconds:.2f}s, "
+          f"speech: {decision.speech_seconds:.2f}s, early exit: {decision.early_exit})")
+    return decision
+
+def main():
+    """Run streaming recognition on a WAV file"""
+    parser = argparse.ArgumentParser(description="Streaming voice recognition on a WAV file")
+    parser.add_argument("audio_path", help="Recorded audio file")
+    parser.add_argument("--realtime", action="store_true", help="Replay at wall-clock speed")
+    args = parser.parse_args()
+
+    from deploy.models import get_speaker_model
+
+    start_time = time.time()
+    source = WavFileSource(args.audio_path, realtime=args.realtime)
+    try:
+        recognize_voice_stream(get_speaker_model(), cf.VOICE_THRESHOLD, source)
+    finally:
+        source.close()
+    print(f"Processed in {time.time() - start_time:.2f}s")
+
+if __name__ == "__main__":
+    main()
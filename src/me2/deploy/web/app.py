@@ -4,19 +4,60 @@ Provides web interface for facial and voice recognition authentication.
 Supports real-time biometric verification with dual-factor authentication.
 """
 
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Request, Response, render_template, request, jsonify
+import io
 import sys
 import os
+import hmac
+import uuid
+import tempfile
 import base64
+from werkzeug.utils import secure_filename
 
 # Add parent directory to path for imports
 current_dir = os.path.dirname(__file__)
 config_dir = os.path.join(current_dir, '../../')
 sys.path.append(config_dir)
 
-from deploy.decision import initialize_models, process_faces, process_voice
+from deploy.decision import initialize_models
+from deploy.pipeline import run_authentication, authenticate_upload, result_as_dict
+from deploy.models import get_registry
+from deploy.capture import get_capture_service
+from deploy.enrollment import enroll_user, is_enrolled, UserExistsError
+from deploy.metrics import get_metrics
+from deploy.event_log import get_event_log
+import gui_app.config as cf
+
+class InMemoryRequest(Request):
+    """Request keeping uploaded files in memory instead of temporary files"""
+    
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return io.BytesIO()
 
 app = Flask(__name__)
+app.request_class = InMemoryRequest
+app.config['MAX_CONTENT_LENGTH'] = cf.WEB_MAX_UPLOAD_MB * 1024 * 1024
+
+# Load and warm up models once at startup, not per request
+model_registry = get_registry()
+
+# Keep the camera stream open so each login reads from the ring buffer
+capture_service = None
+
+# Inference worker processes re-import this script as __mp_main__: only the
+# server itself warms models up and opens the camera
+if __name__ != '__mp_main__':
+    model_registry.start_warmup()
+    capture_service = get_capture_service()
+
+LOCAL_ADDRESSES = ('127.0.0.1', '::1')
+
+def is_admin_request():
+    """Check the admin token, or require a local client when none is configured"""
+    if cf.WEB_ADMIN_TOKEN:
+        token = request.headers.get('X-Admin-Token', '')
+        return hmac.compare_digest(token.encode(), cf.WEB_ADMIN_TOKEN.encode())
+    return request.remote_addr in LOCAL_ADDRESSES
 
 @app.route('/msg')
 def index(msg):
@@ -43,31 +84,124 @@ def welcome(name):
     """Welcome page for authenticated users"""
     return render_template("index1.html", name=name)
 
+@app.route('/health')
+def health():
+    """Liveness probe - the process is up and serving HTTP"""
+    return jsonify({
+        'status': 'ok',
+        'models': model_registry.status(),
+        'camera': capture_service.stats()
+    })
+
+@app.route('/ready')
+def ready():
+    """Readiness probe - only succeeds once model warm-up has finished"""
+    status = model_registry.status()
+    if status['ready']:
+        return jsonify({'status': 'ready', 'models': status})
+    return jsonify({'status': 'warming_up', 'models': status}), 503
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus scrape endpoint - pipeline stage histograms and counters"""
+    return Response(get_metrics().render_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+@app.route('/events')
+def events():
+    """Recent authentication events from the in-memory ring buffer"""
+    limit = max(1, request.args.get('limit', default=50, type=int))
+    return jsonify({'events': get_event_log().recent(limit)})
+
+@app.route('/enroll', methods=['POST'])
+def enroll():
+    """Hot-enroll one user from uploaded face images and voice samples
+    
+    Multipart form: ``username``, files ``faces`` and ``voices``, and
+    ``reenroll=1`` to replace an enrolled user's templates. Uploads are
+    staged in a temporary directory and only moved into the dataset (so
+    the next training run includes them) once the live galleries have
+    been updated, replacing the user's older samples. Requires the
+    ``X-Admin-Token`` header, or a local client when no token is set.
+    """
+    if not is_admin_request():
+        return jsonify({'success': False, 'message': 'Admin credentials required'}), 403
+    
+    username = request.form.get('username', '')
+    if not username or secure_filename(username) != username:
+        return jsonify({'success': False, 'message': 'Invalid username'}), 400
+    reenroll = request.form.get('reenroll', '').lower() in ('1', 'true', 'yes')
+    if not reenroll and is_enrolled(username):
+        return jsonify({'success': False, 'message': f'User {username} is already enrolled'}), 409
+    
+    # Uploads left in the staging directory are discarded on failure
+    with tempfile.TemporaryDirectory(prefix='enroll-') as staging_dir:
+        saved = {'faces': [], 'voices': []}
+        for kind in saved:
+            for upload in request.files.getlist(kind):
+                if not upload.filename:
+                    continue
+                extension = os.path.splitext(secure_filename(upload.filename))[1].lower()
+                file_path = os.path.join(staging_dir, f"{uuid.uuid4().hex[:10]}{extension}")
+                upload.save(file_path)
+                saved[kind].append(file_path)
+        
+        try:
+            result = enroll_user(username, saved['faces'], saved['voices'], model_registry.get_speaker_model(),
+                                 replace=reenroll, store_in_dataset=True)
+        except UserExistsError as e:
+            return jsonify({'success': False, 'message': str(e)}), 409
+        except ValueError as e:
+            return jsonify({'success': False, 'message': str(e)}), 400
+        except Exception as e:
+            return jsonify({'success': False, 'message': f"Enrollment error: {e}"}), 500
+    
+    return jsonify({
+        'success': True,
+        'username': result.username,
+        'faces': result.faces,
+        'voices': result.voices,
+        'elapsed': round(result.elapsed, 3)
+    })
+
+@app.route('/authenticate', methods=['POST'])
+def authenticate():
+    """Authenticate frames and an audio clip captured by the client
+    
+    Multipart form: image files ``frames`` (JPEG/PNG, oldest first) and
+    one ``audio`` file (WAV/FLAC/OGG). Uploads are decoded and matched
+    in memory, so concurrent clients never touch the disk or the
+    server's own camera and microphone.
+    """
+    images = [upload.read() for upload in request.files.getlist('frames')]
+    audio = request.files.get('audio')
+    
+    try:
+        result = authenticate_upload(images, audio.read() if audio else b'', model_registry.get_speaker_model())
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    except Exception as e:
+        return jsonify({'success': False, 'message': f"Authentication error: {e}"}), 500
+    
+    return jsonify({'success': True, **result_as_dict(result)})
+
 @app.route("/login")
 def login():
     """Main authentication endpoint - combines face and voice recognition"""
     try:
-        # Initialize voice recognition model
+        # Get resident voice recognition model
         verification = initialize_models()
         
-        # Process facial recognition
-        recognized_faces = process_faces()
+        # Capture face and voice in parallel and fuse the results
+        result = run_authentication(verification)
         
-        if recognized_faces:
-            # Process voice recognition
-            voice_allowed, speaker = process_voice(verification)
-            
-            if voice_allowed and speaker != "Unknown" and speaker in recognized_faces:
-                return welcome(speaker)
-            else:
-                message = "Authentication failed: Face and voice don't match"
-        else:
-            message = "No recognized faces detected"
-            
-        return index(message)
+        if result.is_authenticated:
+            return welcome(result.user)
+        
+        return index(f"Authentication failed: {result.message}")
         
     except Exception as e:
         return index(f"Authentication error: {str(e)}")
 
 if __name__ == '__main__':
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    # Blocking logins; deploy/web/asgi_app.py serves them as queued jobs instead
+    app.run(host='0.0.0.0', port=5000, threaded=True)
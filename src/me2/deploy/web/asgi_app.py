@@ -0,0 +1,231 @@
+"""Async (ASGI) Web Service for Multimodal Biometric Authentication
+
+Serves the same pages as the Flask app without blocking a worker per login:
+- POST /login enqueues an authentication job and returns its id at once
+- GET /jobs/<id>/events streams the job's progress as Server-Sent Events
+- A bounded scheduler limits concurrent camera/microphone use per host
+- POST /authenticate matches client-captured frames and audio in memory
+
+Run with ``python deploy/web/asgi_app.py`` or
+``uvicorn asgi_app:app --app-dir deploy/web``.
+"""
+
+import os
+import sys
+import json
+
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from starlette.routing import Mount, Route
+from starlette.staticfiles import StaticFiles
+from starlette.templating import Jinja2Templates
+
+# Add parent directory to path for imports
+current_dir = os.path.dirname(__file__)
+config_dir = os.path.join(current_dir, '../../')
+sys.path.append(config_dir)
+
+from deploy.pipeline import authenticate_upload, result_as_dict, MAX_UPLOAD_FRAMES
+from deploy.models import get_registry
+from deploy.capture import get_capture_service
+from deploy.jobs import AuthJobScheduler, QueueFullError
+from deploy.site_scheduler import get_site_scheduler
+from deploy.inference_pool import get_inference_pool
+from deploy.metrics import get_metrics
+from deploy.event_log import get_event_log
+import gui_app.config as cf
+
+SSE_HEARTBEAT_SECONDS = 15.0
+RETRY_AFTER_SECONDS = 5
+MAX_UPLOAD_BYTES = cf.WEB_MAX_UPLOAD_MB * 1024 * 1024
+
+templates = Jinja2Templates(directory=os.path.join(current_dir, "templates"))
+
+# Load and warm up models once at startup, not per request
+model_registry = get_registry()
+
+# Keep the camera stream open so each login reads from the ring buffer
+capture_service = None
+
+# Doors of the site, sharing one encoder and a fair pool of attempt slots
+site_scheduler = None
+DEFAULT_DOOR = None
+
+# Face detection/encoding worker processes (started by the model warm-up)
+inference_pool = None
+
+# Inference worker processes re-import this script as __mp_main__: only the
+# server itself warms models up, opens the camera and starts the schedulers
+SERVING = __name__ != '__mp_main__'
+if SERVING:
+    model_registry.start_warmup()
+    capture_service = get_capture_service()
+    site_scheduler = get_site_scheduler()
+    DEFAULT_DOOR = next(iter(site_scheduler.doors))
+    inference_pool = get_inference_pool()
+
+def run_door_authentication(door, status_callback):
+    """Blocking authentication attempt, run by the scheduler's worker threads
+
+    Args:
+        door (str): Site door the attempt is for
+        status_callback (callable): Receives progress messages (str)
+
+    Returns:
+        dict: JSON-serialisable decision
+    """
+    result = site_scheduler.submit(door, status_callback).result()
+    return dict(result_as_dict(result),
+                redirect=f"/welcome/{result.user}" if result.is_authenticated else None)
+
+scheduler = AuthJobScheduler(run_door_authentication) if SERVING else None
+
+async def index(request):
+    """Login page"""
+    return templates.TemplateResponse(request, "index.html", {"message": ""})
+
+async def welcome(request):
+    """Welcome page for authenticated users"""
+    return templates.TemplateResponse(request, "index1.html", {"name": request.path_params["name"]})
+
+async def health(request):
+    """Liveness probe - the process is up and serving HTTP"""
+    return JSONResponse({
+        "status": "ok",
+        "models": model_registry.status(),
+        "camera": capture_service.stats(),
+        "jobs": scheduler.stats(),
+        "site": site_scheduler.stats(),
+        "inference": inference_pool.stats() if inference_pool else None,
+    })
+
+async def ready(request):
+    """Readiness probe - only succeeds once model warm-up has finished"""
+    status = model_registry.status()
+    if status["ready"]:
+        return JSONResponse({"status": "ready", "models": status})
+    return JSONResponse({"status": "warming_up", "models": status}, status_code=503)
+
+async def metrics(request):
+    """Prometheus scrape endpoint - pipeline stage histograms and counters"""
+    return PlainTextResponse(get_metrics().render_prometheus(), media_type="text/plain; version=0.0.4")
+
+async def events(request):
+    """Recent authentication events from the in-memory ring buffer"""
+    try:
+        limit = max(1, int(request.query_params.get("limit", 50)))
+    except ValueError:
+        limit = 50
+    return JSONResponse({"events": get_event_log().recent(limit)})
+
+async def login(request):
+    """Enqueue an authentication job and point the client at its event stream"""
+    door = request.query_params.get("door", DEFAULT_DOOR)
+    if door not in site_scheduler.doors:
+        return JSONResponse({"success": False, "message": f"Unknown door '{door}'"}, status_code=404)
+    try:
+        job = scheduler.submit(door)
+    except QueueFullError as e:
+        return JSONResponse({"success": False, "message": str(e)}, status_code=503,
+                            headers={"Retry-After": str(RETRY_AFTER_SECONDS)})
+    return JSONResponse({
+        "success": True,
+        "job": job.job_id,
+        "status": f"/jobs/{job.job_id}",
+        "events": f"/jobs/{job.job_id}/events",
+    }, status_code=202)
+
+async def read_limited_body(request, limit=MAX_UPLOAD_BYTES):
+    """Read a request body, giving up as soon as it exceeds ``limit`` bytes
+
+    Returns:
+        bytes: Body, None if the declared or streamed size is over the limit
+    """
+    declared = request.headers.get("content-length", "")
+    if declared.isdigit() and int(declared) > limit:
+        return None
+    chunks = []
+    size = 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > limit:
+            return None
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+async def authenticate(request):
+    """Authenticate frames and an audio clip captured by the client
+
+    Multipart form: image files ``frames`` (JPEG/PNG, oldest first) and
+    one ``audio`` file (WAV/FLAC/OGG), decoded and matched in memory.
+    Bodies over ``cf.WEB_MAX_UPLOAD_MB`` are rejected with 413.
+    """
+    body = await read_limited_body(request)
+    if body is None:
+        return JSONResponse({"success": False, "message": f"Upload larger than {cf.WEB_MAX_UPLOAD_MB} MB"},
+                            status_code=413)
+
+    async def replay_body():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async with Request(request.scope, replay_body).form(max_files=MAX_UPLOAD_FRAMES + 1) as form:
+        images = [await upload.read() for upload in form.getlist("frames")]
+        upload = form.get("audio")
+        audio = await upload.read() if hasattr(upload, "read") else b""
+
+    try:
+        result = await run_in_threadpool(authenticate_upload, images, audio, model_registry.get_speaker_model())
+    except ValueError as e:
+        return JSONResponse({"success": False, "message": str(e)}, status_code=400)
+    except Exception as e:
+        return JSONResponse({"success": False, "message": f"Authentication error: {e}"}, status_code=500)
+    return JSONResponse({"success": True, **result_as_dict(result)})
+
+def _unknown_job(job_id):
+    return JSONResponse({"success": False, "message": f"Unknown job {job_id}"}, status_code=404)
+
+async def job_status(request):
+    """Current state of a job, with its decision once finished"""
+    job = scheduler.get(request.path_params["job_id"])
+    if job is None:
+        return _unknown_job(request.path_params["job_id"])
+    return JSONResponse(job.summary())
+
+async def job_events(request):
+    """Server-Sent Events stream of a job's progress"""
+    job = scheduler.get(request.path_params["job_id"])
+    if job is None:
+        return _unknown_job(request.path_params["job_id"])
+
+    async def event_stream():
+        async for event in job.stream(heartbeat=SSE_HEARTBEAT_SECONDS):
+            if event is None:
+                yield ": keepalive\n\n"
+            else:
+                yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+app = Starlette(
+    routes=[
+        Route("/", index),
+        Route("/login", login, methods=["POST"]),
+        Route("/authenticate", authenticate, methods=["POST"]),
+        Route("/jobs/{job_id}", job_status),
+        Route("/jobs/{job_id}/events", job_events),
+        Route("/welcome/{name}", welcome),
+        Route("/health", health),
+        Route("/ready", ready),
+        Route("/metrics", metrics),
+        Route("/events", events),
+        Mount("/static", StaticFiles(directory=os.path.join(current_dir, "static")), name="static"),
+    ],
+    on_shutdown=[scheduler.shutdown],
+)
+
+if __name__ == '__main__':
+    import uvicorn
+    uvicorn.run(app, host='0.0.0.0', port=5000)
@@ -12,10 +12,25 @@ import random
 import subprocess as cmd
 import soundfile as sf
 import time
+import sys
+import threading
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from deploy.capture import get_capture_service
+from deploy.enrollment import enroll_from_dataset
 
 
 FORM_CLASS,_ = loadUiType(path.join(path.dirname(__file__),"addPan.ui"))
 
+
+def enroll_when_copied(name, copies):
+    """Hot-enroll a new user once their dataset files are in place"""
+    for proc in copies:
+        proc.wait()
+    try:
+        enroll_from_dataset(name)
+    except Exception as e:
+        print(f"Hot enrollment of {name} failed (run training instead): {e}")
+
    
 
 
@@ -72,12 +87,14 @@ class addPan(QtWidgets.QWidget,FORM_CLASS):
 
     def takeImage(self):
         generated = self.generate_image_name()
-        cap = cv2.VideoCapture(cf.camurl)
-        ret, frame = cap.read()
+        # shared capture service keeps the camera open between shots
+        frame = get_capture_service(cf.camurl).snapshot()
+        if frame is None:
+            self.infos.setText("camera not available")
+            return
         frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
         chemin = f"{cf.cashcamera}/{generated}.jpg"
         cv2.imwrite(chemin, frame)
-        cap.release()
         self.images.addItem(chemin)
         self.temp_imgs["taken"].append(chemin)
     
@@ -116,36 +133,39 @@ class addPan(QtWidgets.QWidget,FORM_CLASS):
             time.sleep(0.1)
             proc3 = cmd.Popen([f"mkdir {cf.dataset}/{name}{cf.voices}"], stdout=cmd.PIPE, stderr=cmd.PIPE, shell=True)
             time.sleep(0.1)
+            copies = []
             for typ,imgs in self.temp_imgs.items():
                if typ=="taken":
                   for im in imgs:
                     if im not in self.todelete:
                         time.sleep(0.08)
-                        cmd.Popen([f"cp {im} {cf.dataset}/{name}{cf.faces}/"], stdout=cmd.PIPE,stderr=cmd.PIPE,shell=True)
+                        copies.append(cmd.Popen([f"cp {im} {cf.dataset}/{name}{cf.faces}/"], stdout=cmd.PIPE,stderr=cmd.PIPE,shell=True))
                else:
                   for im in imgs:
                     if im not in self.todelete:
                         time.sleep(0.08)
                         nim = self.generate_image_name()
-                        cmd.Popen([f"cp {im} {cf.dataset}/{name}{cf.faces}/{nim}.{im.split('.')[-1]}"],stdout=cmd.PIPE,stderr=cmd.PIPE,shell=True)
+                        copies.append(cmd.Popen([f"cp {im} {cf.dataset}/{name}{cf.faces}/{nim}.{im.split('.')[-1]}"],stdout=cmd.PIPE,stderr=cmd.PIPE,shell=True))
             for typ,auds in self.temp_audios.items():
                if typ=="taken":
                   for aud in auds:
                     if aud not in self.todelete:
                      time.sleep(0.08)
-                     cmd.Popen([f"cp {aud} {cf.dataset}/{name+cf.voices}/"], stdout=cmd.PIPE,stderr=cmd.PIPE,shell=True)
+                     copies.append(cmd.Popen([f"cp {aud} {cf.dataset}/{name+cf.voices}/"], stdout=cmd.PIPE,stderr=cmd.PIPE,shell=True))
                else:
                   for aud in auds:
                     if aud not in self.todelete:
                       time.sleep(0.08)
                       naud = self.generate_image_name()
-                      cmd.Popen([f"cp {aud} {cf.dataset}/{name+cf.voices}/{naud}.{aud.split('.')[-1]}"],stdout=cmd.PIPE,stderr=cmd.PIPE,shell=True)     
+                      copies.append(cmd.Popen([f"cp {aud} {cf.dataset}/{name+cf.voices}/{naud}.{aud.split('.')[-1]}"],stdout=cmd.PIPE,stderr=cmd.PIPE,shell=True))     
             cmd.Popen([f"rm {cf.cashcamera}/*"], stdout=cmd.PIPE,stderr=cmd.PIPE,shell=True)
             cmd.Popen([f"rm {cf.cashaudio}/*"], stdout=cmd.PIPE,stderr=cmd.PIPE,shell=True)
             self.temp_audios["taken"].clear()
             self.temp_audios['uploaded'].clear()
             self.temp_imgs["taken"].clear()
             self.temp_imgs["uploaded"].clear()
+            # Make the new user recognizable right away, without a retrain
+            threading.Thread(target=enroll_when_copied, args=(name, copies), daemon=True).start()
             parent = self.parent().parent()
             parent.switch_widget(configure(),parent.configure_switch,[parent.home_button, parent.train_switch,parent.door])
         else:
@@ -36,10 +36,77 @@ camurl = 'http://192.168.1.104:8080/video'  # IP camera URL
 VOICE_THRESHOLD = 0.10
 FACE_CONFIDENCE = 0.6
 
+# Face detection cascade: cheap proposals ("hog" or "haar") on a frame downscaled
+# to FACE_DETECTOR_WIDTH, then optional CNN refinement on crops ("cnn" or "none")
+FACE_DETECTOR_PROPOSAL = "hog"
+FACE_DETECTOR_REFINE = "none"
+FACE_DETECTOR_WIDTH = 500
+TRAINING_DETECTOR_PROPOSAL = "hog"
+TRAINING_DETECTOR_REFINE = "cnn"
+TRAINING_DETECTOR_WIDTH = 800
+
+# Track faces across frames and re-encode only when they move (False = encode every frame)
+FACE_TRACKING = True
+
+# Face gallery index built at training time ("flat", "ivf" or "hnsw")
+# Use "flat" (exact) for small sites; benchmark with deploy/face_index.py
+FACE_INDEX_TYPE = "flat"
+FACE_INDEX_PARAMS = {}  # e.g. {"nprobe": 8} for ivf, {"ef_search": 64} for hnsw
+
+# Voice gallery compression: k-means prototypes per user (0 = centroid only)
+VOICE_PROTOTYPES_PER_USER = 0
+
+# Training engine: worker processes (0 = one per CPU core) and images per resumable shard
+TRAINING_WORKERS = 0
+TRAINING_SHARD_SIZE = 64
+TRAINING_VOICE_BATCH_SIZE = 16  # Voice utterances per batched forward pass
+TRAINING_TORCH_THREADS = 0      # torch intra-op threads for voice training (0 = all cores)
+
+# Hot enrollment face detector ("hog" is fast enough for sub-second enrollment)
+ENROLL_FACE_MODEL = "hog"
+
+# Async web service: authentication jobs running at once across all doors,
+# and jobs allowed to wait before new logins are rejected
+WEB_MAX_ACTIVE_JOBS = 2
+WEB_MAX_QUEUED_JOBS = 8
+WEB_MAX_UPLOAD_MB = 32  # Request size limit for /authenticate uploads (kept in memory)
+# /enroll requires this token in the X-Admin-Token header; None = local requests only
+WEB_ADMIN_TOKEN = None
+
 # Recording parameters
 AUDIO_SAMPLE_RATE = 44100
 RECORDING_DURATION = 6.0
 
+# Streaming voice recognition: stop listening once the speaker is stable
+VOICE_STREAMING = True
+AUDIO_INPUT_DEVICE = None  # sounddevice input device, None for the default
+VOICE_DEBUG_CAPTURE = False  # Also write each recording to deploy/cachaud
+
+# Site layout: one entry per door served by this host. "camera" is a cv2.VideoCapture
+# source, "audio_device" a sounddevice input (None = default), "servo_pin" and
+# "arduino_port" the door actuator and "slo_ms" the attempt latency objective.
+SITE_DOORS = [
+    {"name": "main", "camera": camurl, "audio_device": AUDIO_INPUT_DEVICE,
+     "servo_pin": 17, "arduino_port": "/dev/ttyACM0", "slo_ms": 8000},
+]
+SITE_WORKERS = 0            # Doors authenticating at once (0 = every door)
+ENCODER_BATCH_SIZE = 16     # Faces per batched encoder call, across cameras
+ENCODER_BATCH_WAIT_MS = 5   # Wait for faces from other doors before encoding (0 = never)
+
+# Face inference worker processes: detection and encoding run outside the serving
+# process's GIL, each worker pinned to one core; frames up to INFERENCE_MAX_FRAME_PIXELS
+# (RGB) are passed through shared memory
+INFERENCE_POOL = True
+INFERENCE_WORKERS = 0                       # 0 = one per CPU core
+INFERENCE_PIN_WORKERS = True
+INFERENCE_MAX_FRAME_PIXELS = 1920 * 1080
+
+# Authentication event log (JSONL audit trail with size-based rotation)
+EVENT_LOG_DIR = str(SRC_DIR / "logs")
+EVENT_LOG_MAX_MB = 10      # Rotate the active file beyond this size
+EVENT_LOG_BACKUPS = 5      # Rotated files kept
+EVENT_LOG_RING_SIZE = 200  # Recent events kept in memory for the GUI and /events
+
 # Ensure cache directories exist
 os.makedirs(cache_camera, exist_ok=True)
 os.makedirs(cache_audio, exist_ok=True)
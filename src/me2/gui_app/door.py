@@ -19,7 +19,9 @@ from os import path
 # Import IoT and authentication modules
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 from iot.iot import get_status_of_door, open_door, close_door
-from deploy.decision import initialize_models, process_faces, process_voice, authenticate_user
+from deploy.decision import initialize_models
+from deploy.models import get_registry
+from deploy.pipeline import AuthenticationPipeline
 
 class AuthenticationThread(QThread):
     """Background thread for biometric authentication"""
@@ -31,40 +33,20 @@ class AuthenticationThread(QThread):
     def __init__(self):
         super().__init__()
         self.verification_model = None
+        self.pipeline = None
     
     def run(self):
         """Run biometric authentication process"""
         try:
-            # Initialize models
-            self.status_update.emit("Initializing authentication models...")
+            # Get resident models (loaded once per process)
+            if not get_registry().is_ready():
+                self.status_update.emit("Waiting for authentication models to load...")
             self.verification_model = initialize_models()
             
-            # Process facial recognition
-            self.status_update.emit("Capturing and analyzing facial features...")
-            recognized_faces = process_faces()
-            
-            if not recognized_faces:
-                self.authentication_complete.emit(False, "Unknown", "No recognized faces detected")
-                return
-            
-            # Process voice recognition
-            self.status_update.emit("Recording and analyzing voice (6 seconds)...")
-            voice_allowed, speaker = process_voice(self.verification_model)
-            
-            # Combine authentication results
-            is_authenticated, authenticated_user = authenticate_user(recognized_faces, speaker)
-            
-            if is_authenticated:
-                message = f"Authentication successful for {authenticated_user}"
-                self.authentication_complete.emit(True, authenticated_user, message)
-            else:
-                if speaker == "Unknown":
-                    message = "Voice not recognized"
-                elif speaker not in recognized_faces:
-                    message = f"Face and voice mismatch (voice: {speaker})"
-                else:
-                    message = "Authentication failed"
-                self.authentication_complete.emit(False, speaker, message)
+            # Capture face and voice in parallel and fuse the results
+            self.pipeline = AuthenticationPipeline(self.verification_model, self.status_update.emit)
+            result = self.pipeline.run()
+            self.authentication_complete.emit(result.is_authenticated, result.user, result.message)
                 
         except Exception as e:
             self.authentication_complete.emit(False, "Error", f"Authentication error: {str(e)}")
@@ -88,6 +70,10 @@ class DoorWidget(FORM_CLASS):
             self._setup_fallback_ui()
         
         self.auth_thread = None
+        
+        # Load models in the background so the first attempt is fast
+        get_registry().start_warmup()
+        
         self._setup_connections()
         self._update_door_status()
         self._setup_status_timer()
@@ -228,6 +214,8 @@ class DoorWidget(FORM_CLASS):
     def closeEvent(self, event):
         """Clean up when widget is closed"""
         if self.auth_thread and self.auth_thread.isRunning():
+            if self.auth_thread.pipeline:
+                self.auth_thread.pipeline.cancel()
             self.auth_thread.terminate()
             self.auth_thread.wait()
         
@@ -16,6 +16,7 @@ current_dir = os.path.dirname(__file__)
 config_dir = os.path.join(current_dir, '../')
 sys.path.append(config_dir)
 import config as cf
+from deploy.capture import get_capture_service
 
 FORM_CLASS,_ = loadUiType(path.join(path.dirname(__file__),"editPan.ui"))
 
@@ -83,12 +84,14 @@ class editPan(QtWidgets.QWidget,FORM_CLASS):
 
     def takeImage(self):
         generated = self.generate_image_name()
-        cap = cv2.VideoCapture(cf.camurl)
-        ret, frame = cap.read()
+        # shared capture service keeps the camera open between shots
+        frame = get_capture_service(cf.camurl).snapshot()
+        if frame is None:
+            self.infos.setText("camera not available")
+            return
         frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
         chemin = f"{cf.cashcamera}/{generated}.jpg"
         cv2.imwrite(chemin, frame)
-        cap.release()
         self.images.addItem(chemin)
         self.temp_imgs["taken"].append(chemin)
     
@@ -5,19 +5,32 @@ Provides overview and quick access to:
 - Recent authentication logs
 - Quick actions
 - System statistics
+- Live pipeline latency panel
+- Authentication events from the event log's ring buffer
 """
 
 import os
+import sys
 from PyQt5 import QtCore, QtGui, QtWidgets
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
-    QPushButton, QTextEdit, QGridLayout, QFrame
+    QPushButton, QTextEdit, QGridLayout, QFrame,
+    QTableWidget, QTableWidgetItem, QHeaderView
 )
 from PyQt5.QtCore import QTimer, Qt
 from PyQt5.QtGui import QFont, QPalette
 from PyQt5.uic import loadUiType
 from os import path
 
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from iot.iot import get_tracked_door_status
+from deploy.models import get_registry
+from deploy.metrics import get_metrics
+from deploy.event_log import get_event_log
+
+METRICS_REFRESH_MS = 2000
+ACTIVITY_LOG_ENTRIES = 50
+
 try:
     FORM_CLASS, _ = loadUiType(path.join(path.dirname(__file__), "home.ui"))
     UI_AVAILABLE = True
@@ -58,7 +71,7 @@ class HomeWidget(FORM_CLASS):
         cards_layout.addWidget(self.status_card, 0, 0)
         
         # Authentication stats card
-        self.auth_card = self._create_status_card("Today's Authentications", "0")
+        self.auth_card = self._create_status_card("Authentications", "0")
         cards_layout.addWidget(self.auth_card, 0, 1)
         
         # Models status card
@@ -77,8 +90,23 @@ class HomeWidget(FORM_CLASS):
         self.activity_log = QTextEdit()
         self.activity_log.setMaximumHeight(200)
         self.activity_log.setReadOnly(True)
+        # Qt drops the oldest lines itself, so appends stay O(1)
+        self.activity_log.document().setMaximumBlockCount(ACTIVITY_LOG_ENTRIES)
         main_layout.addWidget(self.activity_log)
         
+        # Live pipeline latency
+        metrics_label = QLabel("⏱️ Pipeline Latency")
+        metrics_label.setFont(QFont("Arial", 12, QFont.Bold))
+        main_layout.addWidget(metrics_label)
+        
+        self.metrics_table = QTableWidget(0, 4)
+        self.metrics_table.setHorizontalHeaderLabels(["Stage", "Count", "Mean (ms)", "p95 (ms)"])
+        self.metrics_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.metrics_table.verticalHeader().setVisible(False)
+        self.metrics_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.metrics_table.setMaximumHeight(220)
+        main_layout.addWidget(self.metrics_table)
+        
         # Quick actions
         actions_label = QLabel("⚡ Quick Actions")
         actions_label.setFont(QFont("Arial", 12, QFont.Bold))
@@ -141,6 +169,10 @@ class HomeWidget(FORM_CLASS):
     
     def _setup_dashboard(self):
         """Initialize dashboard with current system information"""
+        # Only show authentication events recorded from now on
+        recent = get_event_log().recent(1)
+        self._last_event_seq = recent[-1]["seq"] if recent else 0
+        
         # Add initial log entries
         self._add_log_entry("System initialized")
         self._add_log_entry("Biometric models loaded")
@@ -148,12 +180,17 @@ class HomeWidget(FORM_CLASS):
         
         # Update initial status
         self._update_system_status()
+        self._update_metrics_panel()
     
     def _setup_timer(self):
         """Setup timer for periodic updates"""
         self.update_timer = QTimer()
         self.update_timer.timeout.connect(self._update_system_status)
         self.update_timer.start(10000)  # Update every 10 seconds
+        
+        self.metrics_timer = QTimer()
+        self.metrics_timer.timeout.connect(self._refresh_live_data)
+        self.metrics_timer.start(METRICS_REFRESH_MS)
     
     def _update_system_status(self):
         """Update system status information"""
@@ -162,19 +199,52 @@ class HomeWidget(FORM_CLASS):
             self.status_card.value_label.setText("🟢 Online")
             
             # Update models status
-            self.models_card.value_label.setText("✅ Ready")
+            models = get_registry().status()
+            if models["ready"]:
+                self.models_card.value_label.setText("✅ Ready")
+            elif models["error"]:
+                self.models_card.value_label.setText("❌ Failed")
+            else:
+                self.models_card.value_label.setText("⏳ Loading")
             
-            # Update door status (would normally query actual door)
-            # For now, show simulated status
-            import random
-            door_states = ["🔒 Closed", "🔓 Open"]
-            # self.door_card.value_label.setText(random.choice(door_states))
-            self.door_card.value_label.setText("🔒 Closed")  # Default to closed
+            # Update door status (tracked, never the simulated sensor reading)
+            door_status = get_tracked_door_status()
+            if door_status == "opened":
+                self.door_card.value_label.setText("🔓 Open")
+            elif door_status == "closed":
+                self.door_card.value_label.setText("🔒 Closed")
+            else:
+                self.door_card.value_label.setText("❔ Unknown")
             
         except Exception as e:
             self.status_card.value_label.setText("🔴 Error")
             self._add_log_entry(f"Status update error: {e}")
     
+    def _refresh_live_data(self):
+        """Pull new authentication events and refresh the metrics panel"""
+        for event in get_event_log().since(self._last_event_seq):
+            self._last_event_seq = event["seq"]
+            if event["type"] == "authentication":
+                status = "✅ Success" if event["decision"] == "granted" else "❌ Failed"
+                total_ms = event["latency_ms"].get("total", 0.0)
+                self._add_log_entry(f"Authentication {status}: {event['user']} ({total_ms:.0f} ms)")
+        self._update_metrics_panel()
+    
+    def _update_metrics_panel(self):
+        """Refresh the authentication counter and the latency table"""
+        metrics = get_metrics()
+        self.auth_card.value_label.setText(str(metrics.counter("authentications")))
+        
+        snapshot = metrics.snapshot()
+        self.metrics_table.setRowCount(len(snapshot))
+        for row, (stage, summary) in enumerate(snapshot.items()):
+            values = [stage, str(summary["count"]), f"{summary['mean_ms']:.1f}", f"{summary['p95_ms']:.1f}"]
+            for column, value in enumerate(values):
+                item = QTableWidgetItem(value)
+                if column:
+                    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                self.metrics_table.setItem(row, column, item)
+    
     def _add_log_entry(self, message):
         """Add entry to activity log
         
@@ -185,14 +255,8 @@ class HomeWidget(FORM_CLASS):
         timestamp = datetime.now().strftime("%H:%M:%S")
         log_entry = f"[{timestamp}] {message}"
         
-        # Add to log and scroll to bottom
+        # Add to log (bounded by the document's maximum block count)
         self.activity_log.append(log_entry)
-        
-        # Keep log size manageable (last 50 entries)
-        text = self.activity_log.toPlainText()
-        lines = text.split('\n')
-        if len(lines) > 50:
-            self.activity_log.setPlainText('\n'.join(lines[-50:]))
     
     def log_authentication(self, user, success):
         """Log authentication attempt
@@ -204,14 +268,15 @@ class HomeWidget(FORM_CLASS):
         status = "✅ Success" if success else "❌ Failed"
         self._add_log_entry(f"Authentication {status}: {user}")
         
-        # Update authentication counter
-        current_count = int(self.auth_card.value_label.text())
-        self.auth_card.value_label.setText(str(current_count + 1))
+        # Authentication counter comes from the pipeline metrics
+        self._update_metrics_panel()
     
     def closeEvent(self, event):
         """Clean up when widget is closed"""
         if hasattr(self, 'update_timer'):
             self.update_timer.stop()
+        if hasattr(self, 'metrics_timer'):
+            self.metrics_timer.stop()
         event.accept()
 
 # Backward compatibility alias
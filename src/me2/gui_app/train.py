@@ -20,7 +20,8 @@ from PyQt5.uic import loadUiType
 from os import path
 
 # Add parent directory for imports
-sys.path.append(os.path.join(os.path.dirname(__file__), '..'))\n
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
 try:
     from modele.train_modele import BiometricTrainer
     TRAINER_AVAILABLE = True
@@ -42,10 +43,11 @@ class TrainingThread(QThread):
     status_update = pyqtSignal(str)    # Status message
     training_complete = pyqtSignal(bool, str)  # Success, message
     
-    def __init__(self, train_faces=True, train_voices=True):
+    def __init__(self, train_faces=True, train_voices=True, incremental=True):
         super().__init__()
         self.train_faces = train_faces
         self.train_voices = train_voices
+        self.incremental = incremental
         self.trainer = None
     
     def run(self):
@@ -55,7 +57,8 @@ class TrainingThread(QThread):
                 self.training_complete.emit(False, "Training module not available")
                 return
             
-            self.status_update.emit("Initializing trainer...")
+            mode = "incremental" if self.incremental else "full"
+            self.status_update.emit(f"Initializing trainer ({mode} mode)...")
             self.trainer = BiometricTrainer()
             self.progress_update.emit(10)
             
@@ -66,7 +69,7 @@ class TrainingThread(QThread):
                 self.status_update.emit("Training face recognition model...")
                 self.progress_update.emit(20)
                 
-                if self.trainer.train_face_recognition():
+                if self.trainer.train_face_recognition(self.incremental):
                     success_count += 1
                     self.status_update.emit("✅ Face recognition training completed")
                 else:
@@ -78,7 +81,7 @@ class TrainingThread(QThread):
                 self.status_update.emit("Training voice recognition model...")
                 self.progress_update.emit(60)
                 
-                if self.trainer.train_voice_recognition():
+                if self.trainer.train_voice_recognition(self.incremental):
                     success_count += 1
                     self.status_update.emit("✅ Voice recognition training completed")
                 else:
@@ -128,13 +131,18 @@ class TrainWidget(FORM_CLASS):
         options_group = QGroupBox("Training Options")
         options_layout = QFormLayout(options_group)
         
-        self.train_faces_cb = QCheckBox("Train Face Recognition")\n        self.train_faces_cb.setChecked(True)
+        self.train_faces_cb = QCheckBox("Train Face Recognition")
+        self.train_faces_cb.setChecked(True)
         options_layout.addRow(self.train_faces_cb)
         
         self.train_voices_cb = QCheckBox("Train Voice Recognition")
         self.train_voices_cb.setChecked(True)
         options_layout.addRow(self.train_voices_cb)
         
+        self.incremental_cb = QCheckBox("Only new or changed files (incremental)")
+        self.incremental_cb.setChecked(True)
+        options_layout.addRow(self.incremental_cb)
+        
         main_layout.addWidget(options_group)
         
         # Dataset info group
@@ -251,6 +259,7 @@ Voice Samples: {total_voices}"""
         # Check training options
         train_faces = self.train_faces_cb.isChecked()
         train_voices = self.train_voices_cb.isChecked()
+        incremental = self.incremental_cb.isChecked()
         
         if not train_faces and not train_voices:
             self._add_log("❌ Please select at least one training option")
@@ -263,7 +272,7 @@ Voice Samples: {total_voices}"""
         self.progress_bar.setValue(0)
         
         # Start training thread
-        self.training_thread = TrainingThread(train_faces, train_voices)
+        self.training_thread = TrainingThread(train_faces, train_voices, incremental)
         self.training_thread.progress_update.connect(self.progress_bar.setValue)
         self.training_thread.status_update.connect(self._add_log)
         self.training_thread.training_complete.connect(self._training_finished)
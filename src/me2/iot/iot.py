@@ -7,11 +7,19 @@ Provides hardware interfaces for:
 - Smart lock integration
 """
 
+import os
+import sys
 import time
 import random
 import logging
 from typing import Optional, Tuple
 
+# Add config path
+current_dir = os.path.dirname(__file__)
+config_dir = os.path.join(current_dir, '../')
+sys.path.append(config_dir)
+from deploy.metrics import span, increment
+
 try:
     from gpiozero import Servo
     import serial
@@ -27,10 +35,16 @@ ARDUINO_PORT = '/dev/ttyACM0'  # Linux
 BAUD_RATE = 9600
 SERVO_TIMEOUT = 1.0
 
+DEFAULT_DOOR_NAME = "main"
+
 class DoorController:
     """Smart door controller with servo and Arduino integration"""
     
-    def __init__(self):
+    def __init__(self, servo_pin: int = SERVO_GPIO_PIN, arduino_port: str = ARDUINO_PORT,
+                 name: str = DEFAULT_DOOR_NAME):
+        self.name = name
+        self.servo_pin = servo_pin
+        self.arduino_port = arduino_port
         self.servo = None
         self.arduino_connection = None
         self._door_status = "closed"
@@ -44,8 +58,8 @@ class DoorController:
             
         try:
             # Initialize servo
-            self.servo = Servo(SERVO_GPIO_PIN)
-            logging.info(f"Servo initialized on GPIO pin {SERVO_GPIO_PIN}")
+            self.servo = Servo(self.servo_pin)
+            logging.info(f"Servo of door '{self.name}' initialized on GPIO pin {self.servo_pin}")
         except Exception as e:
             logging.error(f"Failed to initialize servo: {e}")
     
@@ -85,7 +99,7 @@ class DoorController:
             return True
             
         try:
-            with serial.Serial(ARDUINO_PORT, BAUD_RATE, timeout=1) as ser:
+            with serial.Serial(self.arduino_port, BAUD_RATE, timeout=1) as ser:
                 time.sleep(2)  # Arduino initialization time
                 ser.write(command)
                 logging.info(f"Command sent to Arduino: {command}")
@@ -103,8 +117,12 @@ class DoorController:
         logging.info("Opening door...")
         
         # Method 1: Direct servo control
-        if self.set_servo_angle(1.0):  # Full open position
+        with span("door_open"):
+            actuated = self.set_servo_angle(1.0)  # Full open position
+        if actuated:
             self._door_status = "opened"
+        else:
+            increment("door_actuation_failures", action="open")
         
         # Method 2: Arduino control (alternative)
         # if self.communicate_with_arduino(b'o'):
@@ -122,8 +140,12 @@ class DoorController:
         logging.info("Closing door...")
         
         # Method 1: Direct servo control
-        if self.set_servo_angle(-1.0):  # Full closed position
+        with span("door_close"):
+            actuated = self.set_servo_angle(-1.0)  # Full closed position
+        if actuated:
             self._door_status = "closed"
+        else:
+            increment("door_actuation_failures", action="close")
         
         # Method 2: Arduino control (alternative)
         # if self.communicate_with_arduino(b'c'):
@@ -147,6 +169,16 @@ class DoorController:
         
         return self._door_status
     
+    def get_tracked_status(self) -> str:
+        """Door status as tracked from the last actuation, never simulated
+        
+        Returns:
+            str: 'opened' or 'closed', 'unknown' without GPIO hardware
+        """
+        if not GPIO_AVAILABLE:
+            return "unknown"
+        return self._door_status
+    
     def cleanup(self):
         """Clean up hardware resources"""
         if self.servo:
@@ -154,9 +186,31 @@ class DoorController:
         if self.arduino_connection:
             self.arduino_connection.close()
 
-# Global door controller instance
+# Global door controller instance (the default door)
 _door_controller = DoorController()
 
+# Controllers of a multi-door site, by door name
+_door_controllers = {DEFAULT_DOOR_NAME: _door_controller}
+
+def get_door_controller(name: Optional[str] = None, servo_pin: int = SERVO_GPIO_PIN,
+                        arduino_port: str = ARDUINO_PORT) -> DoorController:
+    """Get the controller of a door, creating it on first use
+    
+    Args:
+        name (str): Door name, None for the default door
+        servo_pin (int): GPIO pin of the door's servo
+        arduino_port (str): Serial port of the door's Arduino
+        
+    Returns:
+        DoorController: Shared controller of the door
+    """
+    name = name or DEFAULT_DOOR_NAME
+    controller = _door_controllers.get(name)
+    if controller is None:
+        controller = DoorController(servo_pin, arduino_port, name)
+        _door_controllers[name] = controller
+    return controller
+
 # Legacy function interfaces for backward compatibility
 def initialize_servo():
     """Legacy function - use DoorController class instead"""
@@ -166,6 +220,10 @@ def get_status_of_door() -> str:
     """Get current door status"""
     return _door_controller.get_door_status()
 
+def get_tracked_door_status() -> str:
+    """Get the tracked door status for dashboards ('unknown' without hardware)"""
+    return _door_controller.get_tracked_status()
+
 def open_door() -> str:
     """Open the door"""
     return _door_controller.open_door()
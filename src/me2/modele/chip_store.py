@@ -0,0 +1,187 @@
+"""Aligned Face Chip Store for Training
+
+Keeps the expensive part of face enrollment on disk:
+- Aligned 150x150 RGB face chips and 5-point landmarks per image
+- One chips .npy and one landmarks .npy per user, opened as memmaps
+- A JSON index mapping each dataset image (path, size, mtime) to its rows
+- Re-encoding from chips skips image decode, detection and alignment
+"""
+
+import os
+import sys
+import json
+import threading
+
+import dlib
+import numpy as np
+import face_recognition.api as face_api
+
+# Add config path
+current_dir = os.path.dirname(__file__)
+config_dir = os.path.join(current_dir, '../')
+sys.path.append(config_dir)
+import gui_app.config as cf
+
+# Store layout
+CHIP_STORE_DIR = f"{cf.me2}/deploy/embeddings/chips"
+CHIP_INDEX_NAME = "index.json"
+CHIP_STORE_VERSION = 1
+CHIP_SIZE = 150
+CHIP_PADDING = 0.25          # dlib's default padding for the face encoder
+LANDMARK_POINTS = 5
+
+def extract_chips(rgb_image, boxes):
+    """Align and crop each detected face
+
+    Args:
+        rgb_image (np.ndarray): RGB image
+        boxes (list): (top, right, bottom, left) face boxes
+
+    Returns:
+        tuple: (chips uint8 (F, 150, 150, 3), landmarks float32 (F, 5, 2))
+    """
+    chips = np.empty((len(boxes), CHIP_SIZE, CHIP_SIZE, 3), dtype=np.uint8)
+    landmarks = np.empty((len(boxes), LANDMARK_POINTS, 2), dtype=np.float32)
+    for i, box in enumerate(boxes):
+        shape = face_api.pose_predictor_5_point(rgb_image, face_api._css_to_rect(box))
+        chips[i] = dlib.get_face_chip(rgb_image, shape, size=CHIP_SIZE, padding=CHIP_PADDING)
+        landmarks[i] = [(point.x, point.y) for point in shape.parts()]
+    return chips, landmarks
+
+def encode_chips(chips):
+    """128-d encodings of aligned face chips in one batched call
+
+    Args:
+        chips (np.ndarray): uint8 chips of shape (F, 150, 150, 3)
+
+    Returns:
+        np.ndarray: float64 encodings of shape (F, 128)
+    """
+    if len(chips) == 0:
+        return np.empty((0, 128))
+    descriptors = face_api.face_encoder.compute_face_descriptor([np.ascontiguousarray(c) for c in chips])
+    return np.array([np.array(d) for d in descriptors])
+
+class FaceChipStore:
+    """Per-user chip and landmark arrays with an image index"""
+
+    def __init__(self, store_dir=CHIP_STORE_DIR):
+        self.store_dir = store_dir
+        self._lock = threading.Lock()
+        self._index = {}       # image_path -> {"user", "size", "mtime_ns", "rows": [start, count]}
+        self._arrays = {}      # user -> (chips memmap, landmarks memmap)
+        self._pending = {}     # image_path -> (user, signature, chips, landmarks)
+        self._load_index()
+
+    def _index_path(self):
+        return os.path.join(self.store_dir, CHIP_INDEX_NAME)
+
+    def _user_paths(self, user):
+        return (os.path.join(self.store_dir, f"{user}.chips.npy"),
+                os.path.join(self.store_dir, f"{user}.landmarks.npy"))
+
+    def _load_index(self):
+        if not os.path.exists(self._index_path()):
+            return
+        try:
+            with open(self._index_path()) as f:
+                data = json.load(f)
+            if data.get("version") == CHIP_STORE_VERSION:
+                self._index = data["images"]
+        except Exception as e:
+            print(f"[WARNING] Ignoring unreadable chip index: {e}")
+
+    def _user_arrays(self, user):
+        if user not in self._arrays:
+            chips_path, landmarks_path = self._user_paths(user)
+            self._arrays[user] = (np.load(chips_path, mmap_mode="r"), np.load(landmarks_path, mmap_mode="r"))
+        return self._arrays[user]
+
+    def get(self, image_path, signature):
+        """Cached chips of an image if it is unchanged
+
+        Args:
+            image_path (str): Dataset image path
+            signature (tuple): Current (size, mtime_ns) of the image
+
+        Returns:
+            tuple: (chips, landmarks) or None when missing or stale
+        """
+        with self._lock:
+            pending = self._pending.get(image_path)
+            if pending is not None:
+                return (pending[2], pending[3]) if pending[1] == signature else None
+            entry = self._index.get(image_path)
+            if entry is None or (entry["size"], entry["mtime_ns"]) != tuple(signature):
+                return None
+            try:
+                chips, landmarks = self._user_arrays(entry["user"])
+            except (OSError, ValueError):
+                return None
+            start, count = entry["rows"]
+            return chips[start:start + count], landmarks[start:start + count]
+
+    def add(self, image_path, user, signature, chips, landmarks):
+        """Queue the chips of a freshly processed image for the next flush"""
+        with self._lock:
+            self._pending[image_path] = (user, tuple(signature), chips, landmarks)
+
+    def flush(self, live_paths=None):
+        """Write pending chips, rewriting only the users they belong to
+
+        Args:
+            live_paths (set): When given, index entries for images not in
+                this set are dropped as well (deleted from the dataset)
+        """
+        with self._lock:
+            dirty = {user for user, _, _, _ in self._pending.values()}
+            if live_paths is not None:
+                dropped = [path for path in self._index if path not in live_paths]
+                dirty.update(self._index[path]["user"] for path in dropped)
+                for path in dropped:
+                    del self._index[path]
+            if not dirty:
+                return
+            os.makedirs(self.store_dir, exist_ok=True)
+
+            for user in dirty:
+                chip_rows = []
+                landmark_rows = []
+                user_index = {}
+                # Unchanged images of the user, then the new ones
+                for path, entry in self._index.items():
+                    if entry["user"] != user or path in self._pending:
+                        continue
+                    chips, landmarks = self._user_arrays(user)
+                    start, count = entry["rows"]
+                    user_index[path] = dict(entry, rows=[sum(len(c) for c in chip_rows), count])
+                    chip_rows.append(np.asarray(chips[start:start + count]))
+                    landmark_rows.append(np.asarray(landmarks[start:start + count]))
+                for path, (owner, signature, chips, landmarks) in self._pending.items():
+                    if owner != user:
+                        continue
+                    user_index[path] = {"user": user, "size": signature[0], "mtime_ns": signature[1],
+                                        "rows": [sum(len(c) for c in chip_rows), len(chips)]}
+                    chip_rows.append(np.asarray(chips, dtype=np.uint8))
+                    landmark_rows.append(np.asarray(landmarks, dtype=np.float32))
+
+                self._write_user(user, chip_rows, landmark_rows)
+                for path in [p for p, e in self._index.items() if e["user"] == user]:
+                    del self._index[path]
+                self._index.update(user_index)
+
+            self._pending.clear()
+            temp_path = f"{self._index_path()}.tmp"
+            with open(temp_path, "w") as f:
+                json.dump({"version": CHIP_STORE_VERSION, "images": self._index}, f)
+            os.replace(temp_path, self._index_path())
+
+    def _write_user(self, user, chip_rows, landmark_rows):
+        """Atomically replace a user's chip and landmark arrays"""
+        chips = np.concatenate(chip_rows) if chip_rows else np.empty((0, CHIP_SIZE, CHIP_SIZE, 3), np.uint8)
+        landmarks = np.concatenate(landmark_rows) if landmark_rows else np.empty((0, LANDMARK_POINTS, 2), np.float32)
+        self._arrays.pop(user, None)
+        for final_path, array in zip(self._user_paths(user), (chips, landmarks)):
+            temp_path = f"{final_path}.tmp.npy"
+            np.save(temp_path, array)
+            os.replace(temp_path, final_path)
@@ -0,0 +1,312 @@
+"""Parallel Face Enrollment Training
+
+Encodes the face dataset on every CPU core:
+- Process pool doing image decode, detection and encoding per image
+- Aligned face chips kept in a chip store, so later re-encodes skip
+  decode and detection entirely
+- Bounded number of in-flight images so memory stays flat
+- Results flushed to shard files as they arrive; an interrupted run
+  resumes from the shards instead of starting over
+- Throughput (images/s) reported per worker process
+"""
+
+import os
+import sys
+import time
+import glob
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+# Add config path
+current_dir = os.path.dirname(__file__)
+config_dir = os.path.join(current_dir, '../')
+sys.path.append(config_dir)
+import gui_app.config as cf
+from deploy.face_detection import get_face_detector
+from modele.chip_store import FaceChipStore, extract_chips, encode_chips
+
+# Training engine settings
+FACE_SHARD_DIR = f"{cf.me2}/deploy/embeddings/face_shards"
+FACE_SHARD_SIZE = cf.TRAINING_SHARD_SIZE        # Images per shard file
+FACE_TRAINING_WORKERS = cf.TRAINING_WORKERS      # 0 = one worker per CPU core
+IN_FLIGHT_PER_WORKER = 2                         # Bound on queued images per worker
+PROGRESS_INTERVAL = 5.0                          # Seconds between progress reports
+TRAINING_DETECTOR = (cf.TRAINING_DETECTOR_PROPOSAL, cf.TRAINING_DETECTOR_REFINE, cf.TRAINING_DETECTOR_WIDTH)
+
+def _file_signature(image_path):
+    """(size, mtime_ns) of a file, used to detect edits between runs"""
+    stat = os.stat(image_path)
+    return stat.st_size, stat.st_mtime_ns
+
+def encode_face_image(image_path, detector_config):
+    """Decode an image and encode every face in it (runs in a worker)
+
+    Args:
+        image_path (str): Dataset image path
+        detector_config (tuple): (proposal, refine, proposal_width) of the
+            detection cascade
+
+    Returns:
+        tuple: (image_path, encodings, chips, landmarks, worker_pid,
+        seconds, stage_timings, error, retryable); chips is None if the
+        image could not be processed, and ``retryable`` marks failures
+        (unreadable file, I/O or library errors) that a later run should
+        try again instead of recording the image as processed
+    """
+    start_time = time.time()
+    encodings = []
+    chips = landmarks = None
+    timings = {}
+    error = None
+    retryable = False
+    try:
+        image = cv2.imread(image_path)
+        if image is None:
+            error = "could not load image"
+            retryable = True
+        else:
+            rgb_image = np.ascontiguousarray(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
+            detections = get_face_detector(*detector_config).detect(rgb_image)
+            timings = dict(detections.timings)
+            if not detections.locations:
+                error = "no faces detected"
+
+            stage_start = time.time()
+            chips, landmarks = extract_chips(rgb_image, detections.locations)
+            timings["align"] = time.time() - stage_start
+
+            stage_start = time.time()
+            encodings = list(encode_chips(chips))
+            timings["encode"] = time.time() - stage_start
+    except Exception as e:
+        error = str(e)
+        retryable = True
+        chips = landmarks = None
+        encodings = []
+    return (image_path, encodings, chips, landmarks, os.getpid(),
+            time.time() - start_time, timings, error, retryable)
+
+class FaceShardStore:
+    """Shard files holding the encodings of already processed images"""
+
+    def __init__(self, shard_dir=FACE_SHARD_DIR):
+        self.shard_dir = shard_dir
+
+    def _shard_paths(self):
+        return sorted(glob.glob(os.path.join(self.shard_dir, "shard_*.npz")))
+
+    def load(self):
+        """Read every shard written so far
+
+        Returns:
+            dict: image_path -> (signature, encodings) for processed images
+        """
+        processed = {}
+        for shard_path in self._shard_paths():
+            try:
+                with np.load(shard_path) as shard:
+                    encodings = shard["encodings"]
+                    owners = shard["owners"]
+                    image_paths = shard["image_paths"].tolist()
+                    signatures = shard["signatures"]
+            except Exception as e:
+                print(f"[WARNING] Ignoring unreadable shard {shard_path}: {e}")
+                continue
+            for i, image_path in enumerate(image_paths):
+                processed[image_path] = (tuple(int(v) for v in signatures[i]), encodings[owners == i])
+        return processed
+
+    def write(self, results):
+        """Write one shard atomically
+
+        Args:
+            results (list): Tuples of (image_path, signature, encodings)
+        """
+        os.makedirs(self.shard_dir, exist_ok=True)
+        shard_path = os.path.join(self.shard_dir, f"shard_{len(self._shard_paths()):06d}.npz")
+
+        rows = [np.asarray(e, dtype=np.float64) for _, _, encodings in results for e in encodings]
+        owners = [i for i, (_, _, encodings) in enumerate(results) for _ in encodings]
+        temp_path = f"{shard_path}.tmp.npz"
+        np.savez(
+            temp_path,
+            encodings=np.stack(rows) if rows else np.empty((0, 128)),
+            owners=np.asarray(owners, dtype=np.int32),
+            image_paths=np.array([image_path for image_path, _, _ in results], dtype=str),
+            signatures=np.array([signature for _, signature, _ in results], dtype=np.int64).reshape(-1, 2),
+        )
+        os.replace(temp_path, shard_path)
+
+    def clear(self):
+        """Remove all shards once a run has completed"""
+        for shard_path in self._shard_paths():
+            os.remove(shard_path)
+
+class ParallelFaceTrainer:
+    """Process-pool face encoder with resumable shard output"""
+
+    def __init__(self, detector_config=TRAINING_DETECTOR, workers=FACE_TRAINING_WORKERS,
+                 shard_size=FACE_SHARD_SIZE, shard_dir=FACE_SHARD_DIR, reuse_chips=True):
+        """
+        Args:
+            detector_config (tuple): (proposal, refine, proposal_width) of
+                the detection cascade
+            reuse_chips (bool): Encode from cached aligned chips when the
+                image is unchanged instead of decoding and detecting again
+            workers (int): Worker processes, 0 for one per CPU core
+            shard_size (int): Images per shard file
+            shard_dir (str): Directory for resumable shard files
+        """
+        self.detector_config = tuple(detector_config)
+        self.workers = workers or os.cpu_count() or 1
+        self.shard_size = shard_size
+        self.store = FaceShardStore(shard_dir)
+        self.chip_store = FaceChipStore()
+        self.reuse_chips = reuse_chips
+        self.worker_stats = {}
+        self.stage_totals = {}
+
+    def _record(self, worker_pid, seconds, timings):
+        images, busy = self.worker_stats.get(worker_pid, (0, 0.0))
+        self.worker_stats[worker_pid] = (images + 1, busy + seconds)
+        for stage, stage_seconds in timings.items():
+            self.stage_totals[stage] = self.stage_totals.get(stage, 0.0) + stage_seconds
+
+    def report(self):
+        """Print per-worker throughput and per-stage timings"""
+        for number, (worker_pid, (images, busy)) in enumerate(sorted(self.worker_stats.items()), 1):
+            rate = images / busy if busy > 0 else 0.0
+            print(f"[INFO]   worker {number} (pid {worker_pid}): {images} images, {rate:.2f} images/s")
+        images = max(1, sum(count for count, _ in self.worker_stats.values()))
+        if self.stage_totals:
+            print("[INFO]   stage timings (ms/image): " + ", ".join(
+                f"{stage} {1000.0 * total / images:.1f}" for stage, total in self.stage_totals.items()
+            ))
+
+    def _encode_cached_chips(self, image_paths, results, shard_buffer):
+        """Encode images straight from the chip store
+
+        Returns:
+            list: Images with no usable cached chips
+        """
+        start_time = time.time()
+        uncached = []
+        encoded = 0
+        for image_path in image_paths:
+            signature = _file_signature(image_path)
+            cached = self.chip_store.get(image_path, signature)
+            if cached is None:
+                uncached.append(image_path)
+                continue
+            encodings = list(encode_chips(cached[0]))
+            results[image_path] = encodings
+            shard_buffer.append((image_path, signature, encodings))
+            encoded += 1
+            if len(shard_buffer) >= self.shard_size:
+                self.store.write(shard_buffer)
+                shard_buffer.clear()
+
+        if encoded:
+            elapsed = time.time() - start_time
+            print(f"[INFO] Encoded {encoded} images from cached face chips in {elapsed:.1f}s "
+                  f"({encoded / max(elapsed, 1e-6):.2f} images/s)")
+        return uncached
+
+    def encode(self, image_paths):
+        """Encode all images, reusing shards left by an interrupted run
+        and cached face chips of unchanged images
+
+        Args:
+            image_paths (list): Dataset image paths
+
+        Returns:
+            dict: image_path -> list of 128-d encodings (images without
+            faces map to an empty list; images that failed transiently are
+            left out so the next run retries them)
+        """
+        processed = self.store.load()
+        results = {}
+        pending = []
+        for image_path in image_paths:
+            cached = processed.get(image_path)
+            if cached is not None and cached[0] == _file_signature(image_path):
+                results[image_path] = list(cached[1])
+            else:
+                pending.append(image_path)
+
+        if results:
+            print(f"[INFO] Resuming: {len(results)} images already encoded, {len(pending)} remaining")
+
+        shard_buffer = []
+        if self.reuse_chips and pending:
+            pending = self._encode_cached_chips(pending, results, shard_buffer)
+        if not pending:
+            if shard_buffer:
+                self.store.write(shard_buffer)
+            return results
+
+        proposal, refine, _ = self.detector_config
+        print(f"[INFO] Encoding {len(pending)} images with {self.workers} workers "
+              f"({proposal} proposals, {refine} refinement)")
+        start_time = time.time()
+        last_report = start_time
+        max_in_flight = self.workers * IN_FLIGHT_PER_WORKER
+        remaining = iter(pending)
+        completed = 0
+
+        try:
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                in_flight = set()
+                exhausted = False
+                while in_flight or not exhausted:
+                    # Keep the pool fed without queueing the whole dataset
+                    while not exhausted and len(in_flight) < max_in_flight:
+                        image_path = next(remaining, None)
+                        if image_path is None:
+                            exhausted = True
+                            break
+                        in_flight.add(executor.submit(encode_face_image, image_path, self.detector_config))
+                    if not in_flight:
+                        break
+
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        (image_path, encodings, chips, landmarks,
+                         worker_pid, seconds, timings, error, retryable) = future.result()
+                        self._record(worker_pid, seconds, timings)
+                        completed += 1
+                        if retryable:
+                            # Not written to a shard, so a resumed run tries it again
+                            print(f"[WARNING] {Path(image_path).name}: {error} (will retry on the next run)")
+                            continue
+                        if error:
+                            print(f"[WARNING] {Path(image_path).name}: {error}")
+                        results[image_path] = encodings
+                        signature = _file_signature(image_path)
+                        shard_buffer.append((image_path, signature, encodings))
+                        if chips is not None:
+                            self.chip_store.add(image_path, Path(image_path).parent.parent.name,
+                                                signature, chips, landmarks)
+
+                    if len(shard_buffer) >= self.shard_size:
+                        self.store.write(shard_buffer)
+                        self.chip_store.flush()
+                        shard_buffer = []
+
+                    if time.time() - last_report >= PROGRESS_INTERVAL:
+                        last_report = time.time()
+                        rate = completed / (last_report - start_time)
+                        print(f"[INFO] {completed}/{len(pending)} images encoded ({rate:.2f} images/s)")
+        finally:
+            # Keep finished work even when the run is interrupted
+            if shard_buffer:
+                self.store.write(shard_buffer)
+            self.chip_store.flush()
+
+        elapsed = time.time() - start_time
+        print(f"[INFO] Encoded {completed} images in {elapsed:.1f}s ({completed / max(elapsed, 1e-6):.2f} images/s)")
+        self.report()
+        return results
@@ -0,0 +1,167 @@
+"""Training Manifest for Incremental Enrollment
+
+Maps every dataset file to the embeddings computed from it:
+- Keyed by path, with size, mtime and SHA-256 content hash
+- Size/mtime shortcut so unchanged files are never re-read
+- Content hash so touched-but-identical files are not re-encoded
+- Stored next to the galleries as one .npz archive
+"""
+
+import os
+import sys
+import hashlib
+from collections import namedtuple
+
+import numpy as np
+
+# Add config path
+current_dir = os.path.dirname(__file__)
+config_dir = os.path.join(current_dir, '../')
+sys.path.append(config_dir)
+import gui_app.config as cf
+
+# Manifest locations
+EMBEDDINGS_DIR = f"{cf.me2}/deploy/embeddings"
+FACE_MANIFEST_PATH = f"{EMBEDDINGS_DIR}/faces.manifest.npz"
+VOICE_MANIFEST_PATH = f"{EMBEDDINGS_DIR}/voices.manifest.npz"
+
+MANIFEST_VERSION = 1
+HASH_CHUNK_SIZE = 1 << 20
+
+# Cached embeddings of one dataset file
+ManifestEntry = namedtuple("ManifestEntry", ["size", "mtime_ns", "digest", "vectors"])
+
+# Files to (re-)encode and files that disappeared since the last run
+ManifestDelta = namedtuple("ManifestDelta", ["unchanged", "to_encode", "removed"])
+
+def content_hash(file_path):
+    """SHA-256 hex digest of a file's content"""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class TrainingManifest:
+    """Dataset file -> cached embeddings, persisted between training runs"""
+
+    def __init__(self, manifest_path, dim):
+        """
+        Args:
+            manifest_path (str): Manifest archive path
+            dim (int): Embedding dimension (128 for faces, 192 for voices)
+        """
+        self.manifest_path = manifest_path
+        self.dim = dim
+        self.entries = {}
+        self._pending_digests = {}
+
+    @classmethod
+    def load(cls, manifest_path, dim):
+        """Open a manifest, starting empty if it is missing or unreadable
+
+        Returns:
+            TrainingManifest: Loaded manifest
+        """
+        manifest = cls(manifest_path, dim)
+        if not os.path.exists(manifest_path):
+            return manifest
+
+        try:
+            with np.load(manifest_path) as archive:
+                version = int(archive["version"])
+                if version != MANIFEST_VERSION or archive["vectors"].shape[1] != dim:
+                    print(f"[WARNING] Ignoring incompatible manifest {manifest_path}")
+                    return manifest
+                paths = archive["paths"].tolist()
+                stats = archive["stats"]
+                digests = archive["digests"].tolist()
+                owners = archive["owners"]
+                vectors = archive["vectors"]
+        except Exception as e:
+            print(f"[WARNING] Ignoring unreadable manifest {manifest_path}: {e}")
+            return manifest
+
+        # Rows are grouped by owner, so each entry is one contiguous slice
+        offsets = np.r_[0, np.cumsum(np.bincount(owners, minlength=len(paths)))]
+        for i, file_path in enumerate(paths):
+            manifest.entries[file_path] = ManifestEntry(
+                int(stats[i, 0]), int(stats[i, 1]), digests[i], vectors[offsets[i]:offsets[i + 1]]
+            )
+        return manifest
+
+    def diff(self, file_paths):
+        """Compare the dataset against the manifest
+
+        Files whose size and mtime are unchanged are trusted without
+        reading them; otherwise the content hash decides.
+
+        Args:
+            file_paths (list): Current dataset files
+
+        Returns:
+            ManifestDelta: unchanged, to_encode and removed file paths
+        """
+        unchanged = []
+        to_encode = []
+        current = set(file_paths)
+
+        for file_path in file_paths:
+            stat = os.stat(file_path)
+            entry = self.entries.get(file_path)
+            if entry is not None and (entry.size, entry.mtime_ns) == (stat.st_size, stat.st_mtime_ns):
+                unchanged.append(file_path)
+                continue
+
+            digest = content_hash(file_path)
+            if entry is not None and entry.digest == digest:
+                # Touched but identical: refresh the stat, keep the embeddings
+                self.entries[file_path] = entry._replace(size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+                unchanged.append(file_path)
+            else:
+                self._pending_digests[file_path] = digest
+                to_encode.append(file_path)
+
+        removed = [file_path for file_path in self.entries if file_path not in current]
+        return ManifestDelta(unchanged, to_encode, removed)
+
+    def update(self, file_path, vectors):
+        """Record the embeddings of a (re-)encoded file
+
+        Args:
+            file_path (str): Dataset file
+            vectors (list): Embeddings from the file, empty if none were found
+        """
+        stat = os.stat(file_path)
+        digest = self._pending_digests.pop(file_path, None) or content_hash(file_path)
+        rows = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+        self.entries[file_path] = ManifestEntry(stat.st_size, stat.st_mtime_ns, digest, rows)
+
+    def remove(self, file_paths):
+        """Forget files that were deleted from the dataset"""
+        for file_path in file_paths:
+            self.entries.pop(file_path, None)
+
+    def vectors(self, file_path):
+        """Cached embeddings of a file (empty array if none)"""
+        entry = self.entries.get(file_path)
+        return entry.vectors if entry is not None else np.empty((0, self.dim), dtype=np.float32)
+
+    def save(self):
+        """Write the manifest atomically"""
+        os.makedirs(os.path.dirname(self.manifest_path) or ".", exist_ok=True)
+        paths = list(self.entries)
+        entries = [self.entries[file_path] for file_path in paths]
+        vectors = [entry.vectors for entry in entries]
+
+        temp_path = f"{self.manifest_path}.tmp.npz"
+        np.savez(
+            temp_path,
+            version=np.array(MANIFEST_VERSION),
+            paths=np.array(paths, dtype=str),
+            stats=np.array([(e.size, e.mtime_ns) for e in entries], dtype=np.int64).reshape(-1, 2),
+            digests=np.array([e.digest for e in entries], dtype=str),
+            owners=np.repeat(np.arange(len(entries), dtype=np.int32), [len(v) for v in vectors]),
+            vectors=np.concatenate(vectors) if vectors else np.empty((0, self.dim), dtype=np.float32),
+        )
+        os.replace(temp_path, self.manifest_path)
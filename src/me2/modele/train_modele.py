@@ -3,19 +3,25 @@
 Trains and generates embeddings for:
 - Facial recognition using FaceNet
 - Voice recognition using ECAPA-TDNN
-- Stores embeddings as pickle files for inference
+- Stores embeddings as pickle files plus compact face and voice galleries
+- Incremental runs re-encode only files added or changed since the last run
+
+Usage:
+    python train_modele.py [--full] [--redetect]
 """
 
 import os
 import sys
 import time
+import queue
 import pickle
+import argparse
+import threading
 import subprocess as cmd
 from pathlib import Path
 
-import cv2
-import numpy as np
-import face_recognition
+import torch
+import soundfile as sf
 from imutils import paths
 from speechbrain.inference.speaker import SpeakerRecognition
 
@@ -24,12 +30,26 @@ current_dir = os.path.dirname(__file__)
 config_dir = os.path.join(current_dir, '../')
 sys.path.append(config_dir)
 import gui_app.config as cf
+from deploy.gallery import FaceGallery, FACE_GALLERY_PATH
+from deploy.face_index import build_face_index, gallery_fingerprint, FACE_INDEX_PATH
+from deploy.voice_gallery import VoiceGallery, VOICE_GALLERY_PATH
+from modele.face_training import ParallelFaceTrainer, TRAINING_DETECTOR
+from modele.manifest import TrainingManifest, FACE_MANIFEST_PATH, VOICE_MANIFEST_PATH
+
+# Embedding dimensions cached in the training manifests
+FACE_ENCODING_DIM = 128
+VOICE_EMBEDDING_DIM = 192
+
+# Voice embedding batches: utterances per forward pass and torch threads (0 = all cores)
+VOICE_BATCH_SIZE = cf.TRAINING_VOICE_BATCH_SIZE
+VOICE_TORCH_THREADS = cf.TRAINING_TORCH_THREADS
 
 class BiometricTrainer:
     """Handles training of face and voice recognition models"""
     
     def __init__(self):
-        self.face_model = "cnn"  # Use CNN model for better accuracy
+        # HOG proposals refined by the CNN on face crops (see cf.TRAINING_DETECTOR_*)
+        self.face_detector = TRAINING_DETECTOR
         self.voice_model = None
         self._initialize_voice_model()
     
@@ -45,11 +65,17 @@ class BiometricTrainer:
         except Exception as e:
             print(f"Failed to initialize voice model: {e}")
     
-    def train_face_recognition(self):
+    def train_face_recognition(self, incremental=True, reuse_chips=True):
         """Train face recognition model and generate embeddings
         
-        Processes all face images in the dataset directory and creates
-        FaceNet embeddings for each person.
+        Processes the face images in the dataset directory in parallel
+        and creates FaceNet embeddings for each person. In incremental
+        mode only images added or changed since the last run are encoded.
+        
+        Args:
+            incremental (bool): Reuse cached embeddings from the manifest
+            reuse_chips (bool): Re-encode from cached aligned face chips
+                instead of decoding and detecting unchanged images again
         """
         print("[INFO] Starting face recognition training...")
         
@@ -64,56 +90,38 @@ class BiometricTrainer:
             print("No images found in dataset")
             return False
         
-        print(f"[INFO] Found {len(image_paths)} images to process")
+        print(f"[INFO] Found {len(image_paths)} images")
+        
+        # Work out which images need encoding
+        manifest = TrainingManifest.load(FACE_MANIFEST_PATH, FACE_ENCODING_DIM) if incremental \
+            else TrainingManifest(FACE_MANIFEST_PATH, FACE_ENCODING_DIM)
+        delta = manifest.diff(image_paths)
+        manifest.remove(delta.removed)
+        print(f"[INFO] {len(delta.to_encode)} new or changed, {len(delta.unchanged)} unchanged, "
+              f"{len(delta.removed)} removed images")
+        
+        # Decode, detect and encode on every core; resumes from shards if interrupted
+        face_trainer = ParallelFaceTrainer(detector_config=self.face_detector, reuse_chips=reuse_chips)
+        if delta.to_encode:
+            image_encodings = face_trainer.encode(delta.to_encode)
+            for image_path, encodings in image_encodings.items():
+                manifest.update(image_path, encodings)
+            # Failed images are dropped so the next run sees them as new
+            manifest.remove([image_path for image_path in delta.to_encode
+                             if image_path not in image_encodings])
+        manifest.save()
+        face_trainer.chip_store.flush(live_paths=set(image_paths))
         
         # Initialize storage for encodings
         known_encodings = []
         known_names = []
         
-        # Process each image
-        for i, image_path in enumerate(image_paths):
-            print(f"[INFO] Processing image {i + 1}/{len(image_paths)}: {Path(image_path).name}")
-            
+        for image_path in image_paths:
             # Extract person name from directory structure
             person_name = Path(image_path).parent.parent.name
-            
-            # Load and validate image
-            image = cv2.imread(image_path)
-            if image is None:
-                print(f"[WARNING] Could not load image: {image_path}")
-                continue
-            
-            # Convert BGR to RGB
-            rgb_image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-            
-            # Ensure image is in correct format
-            if rgb_image.dtype != 'uint8':
-                print(f"[WARNING] Image {image_path} is not 8-bit, skipping")
-                continue
-            
-            # Make image contiguous in memory
-            rgb_image = np.ascontiguousarray(rgb_image)
-            
-            try:
-                # Detect face locations
-                face_locations = face_recognition.face_locations(rgb_image, model=self.face_model)
-                
-                if not face_locations:
-                    print(f"[WARNING] No faces detected in {image_path}")
-                    continue
-                
-                # Generate face encodings
-                face_encodings = face_recognition.face_encodings(rgb_image, face_locations)
-                
-                # Store encodings for each detected face
-                for encoding in face_encodings:
-                    known_encodings.append(encoding)
-                    known_names.append(person_name)
-                    print(f"[INFO] Added encoding for {person_name}")
-                
-            except Exception as e:
-                print(f"[ERROR] Failed to process {image_path}: {e}")
-                continue
+            for encoding in manifest.vectors(image_path):
+                known_encodings.append(encoding)
+                known_names.append(person_name)
         
         if not known_encodings:
             print("[ERROR] No face encodings generated")
@@ -134,9 +142,38 @@ class BiometricTrainer:
         with open(encodings_path, "wb") as f:
             pickle.dump(face_data, f)
         
+        # Save packed gallery used by the decision module
+        face_gallery = FaceGallery.from_encodings(known_encodings, known_names)
+        face_gallery.save(FACE_GALLERY_PATH)
+        self.build_face_index(face_gallery)
+        
         print(f"[INFO] Face training completed. Saved {len(known_encodings)} encodings to {encodings_path}")
+        print(f"[INFO] Face gallery written to {FACE_GALLERY_PATH}")
+        
+        # Shards are only needed to resume an interrupted run
+        face_trainer.store.clear()
         return True
     
+    def build_face_index(self, face_gallery):
+        """Build the configured nearest-neighbour index for the face gallery
+        
+        Args:
+            face_gallery (FaceGallery): Freshly trained gallery
+        """
+        index_type = cf.FACE_INDEX_TYPE
+        if index_type == "flat":
+            # Exact matching needs no index; drop any stale approximate one
+            if os.path.exists(FACE_INDEX_PATH):
+                os.remove(FACE_INDEX_PATH)
+            return
+        
+        print(f"[INFO] Building {index_type} face index...")
+        start_time = time.time()
+        index = build_face_index(face_gallery.encodings, index_type,
+                                 **cf.FACE_INDEX_PARAMS)
+        index.save(FACE_INDEX_PATH, gallery_fingerprint(face_gallery))
+        print(f"[INFO] Face index built in {time.time() - start_time:.2f}s and saved to {FACE_INDEX_PATH}")
+    
     def get_voice_dataset(self):
         """Retrieve voice samples from dataset directory
         
@@ -170,29 +207,95 @@ class BiometricTrainer:
         
         return voice_data
     
-    def extract_voice_embedding(self, audio_path):
-        """Extract voice embedding from audio file
+    def _audio_length(self, audio_path):
+        """Approximate duration used to bucket utterances of similar length"""
+        try:
+            info = sf.info(audio_path)
+            return info.frames / info.samplerate
+        except Exception:
+            # Formats soundfile cannot parse: file size is a fair proxy
+            return os.path.getsize(audio_path) / 32000.0
+    
+    def _load_voice_batches(self, batches, batch_queue):
+        """Loader thread: decode each batch of files ahead of the model"""
+        for batch_files in batches:
+            loaded = []
+            for audio_path in batch_files:
+                try:
+                    loaded.append((audio_path, self.voice_model.load_audio(audio_path)))
+                except Exception as e:
+                    print(f"[ERROR] Failed to load {audio_path}: {e}")
+            batch_queue.put(loaded)
+        batch_queue.put(None)
+    
+    def extract_voice_embeddings(self, audio_paths, batch_size=VOICE_BATCH_SIZE):
+        """Extract voice embeddings for many files in padded batches
+        
+        Files are sorted by duration so each batch holds utterances of
+        similar length, padded to the longest one and passed with
+        relative ``wav_lens`` so padding does not affect the embedding.
+        Audio decoding runs in a loader thread while the model encodes
+        the previous batch.
         
         Args:
-            audio_path (str): Path to audio file
+            audio_paths (list): Audio file paths
+            batch_size (int): Utterances per forward pass
             
         Returns:
-            torch.Tensor: Voice embedding or None if failed
+            dict: audio_path -> 192-d embedding (np.ndarray) for each
+            file that could be processed
         """
-        try:
-            waveform = self.voice_model.load_audio(audio_path)
-            batch = waveform.unsqueeze(0)
-            embedding = self.voice_model.encode_batch(batch, None, normalize=False)
-            return embedding
-        except Exception as e:
-            print(f"[ERROR] Failed to extract embedding from {audio_path}: {e}")
-            return None
+        if not audio_paths:
+            return {}
+        
+        torch.set_num_threads(VOICE_TORCH_THREADS or os.cpu_count() or 1)
+        ordered = sorted(audio_paths, key=self._audio_length)
+        batches = [ordered[i:i + batch_size] for i in range(0, len(ordered), batch_size)]
+        
+        batch_queue = queue.Queue(maxsize=2)
+        loader = threading.Thread(target=self._load_voice_batches, args=(batches, batch_queue), daemon=True)
+        loader.start()
+        
+        start_time = time.time()
+        embeddings = {}
+        while True:
+            loaded = batch_queue.get()
+            if loaded is None:
+                break
+            if not loaded:
+                continue
+            
+            lengths = torch.tensor([len(waveform) for _, waveform in loaded], dtype=torch.float32)
+            batch = torch.zeros(len(loaded), int(lengths.max()))
+            for i, (_, waveform) in enumerate(loaded):
+                batch[i, :len(waveform)] = waveform
+            
+            try:
+                with torch.inference_mode():
+                    batch_embeddings = self.voice_model.encode_batch(batch, lengths / lengths.max(), normalize=False)
+            except Exception as e:
+                print(f"[ERROR] Failed to encode batch of {len(loaded)} files: {e}")
+                continue
+            
+            for (audio_path, _), embedding in zip(loaded, batch_embeddings):
+                embeddings[audio_path] = embedding.cpu().numpy().reshape(-1)
+            print(f"[INFO] Encoded {len(embeddings)}/{len(audio_paths)} voice samples")
+        
+        loader.join()
+        elapsed = time.time() - start_time
+        print(f"[INFO] Voice embeddings: {len(embeddings)} files in {elapsed:.1f}s "
+              f"({len(embeddings) / max(elapsed, 1e-6):.2f} files/s)")
+        return embeddings
     
-    def train_voice_recognition(self):
+    def train_voice_recognition(self, incremental=True):
         """Train voice recognition model and generate embeddings
         
-        Processes all voice samples in the dataset and creates
-        ECAPA-TDNN embeddings for each person.
+        Processes the voice samples in the dataset and creates
+        ECAPA-TDNN embeddings for each person. In incremental mode only
+        samples added or changed since the last run are encoded.
+        
+        Args:
+            incremental (bool): Reuse cached embeddings from the manifest
         """
         if not self.voice_model:
             print("[ERROR] Voice model not initialized")
@@ -206,26 +309,32 @@ class BiometricTrainer:
             print("[ERROR] No voice data found")
             return False
         
+        # Work out which samples need encoding
+        voice_files = [voice_file for _, files in voice_dataset for voice_file in files]
+        manifest = TrainingManifest.load(VOICE_MANIFEST_PATH, VOICE_EMBEDDING_DIM) if incremental \
+            else TrainingManifest(VOICE_MANIFEST_PATH, VOICE_EMBEDDING_DIM)
+        delta = manifest.diff(voice_files)
+        manifest.remove(delta.removed)
+        print(f"[INFO] {len(delta.to_encode)} new or changed, {len(delta.unchanged)} unchanged, "
+              f"{len(delta.removed)} removed voice samples")
+        
+        for voice_file, vector in self.extract_voice_embeddings(delta.to_encode).items():
+            manifest.update(voice_file, [vector])
+        manifest.save()
+        
         # Generate embeddings for each person
         voice_embeddings = []
         
         for person_name, voice_files in voice_dataset:
-            print(f"[INFO] Processing voice samples for {person_name}")
-            
-            person_embeddings = []
-            
-            for voice_file in voice_files:
-                print(f"[INFO] Processing: {Path(voice_file).name}")
-                
-                embedding = self.extract_voice_embedding(voice_file)
-                if embedding is not None:
-                    person_embeddings.append(embedding)
-                else:
-                    print(f"[WARNING] Failed to process {voice_file}")
+            person_embeddings = [
+                torch.from_numpy(vector.reshape(1, 1, -1))
+                for voice_file in voice_files
+                for vector in manifest.vectors(voice_file)
+            ]
             
             if person_embeddings:
                 voice_embeddings.append((person_name, person_embeddings))
-                print(f"[INFO] Generated {len(person_embeddings)} embeddings for {person_name}")
+                print(f"[INFO] {len(person_embeddings)} embeddings for {person_name}")
             else:
                 print(f"[WARNING] No valid embeddings for {person_name}")
         
@@ -243,8 +352,13 @@ class BiometricTrainer:
         with open(embeddings_path, "wb") as f:
             pickle.dump(voice_embeddings, f)
         
+        # Save compact gallery (normalized matrix, centroids, prototypes)
+        voice_gallery = VoiceGallery.from_embeddings(voice_embeddings)
+        voice_gallery.save(VOICE_GALLERY_PATH)
+        
         total_embeddings = sum(len(embs[1]) for embs in voice_embeddings)
         print(f"[INFO] Voice training completed. Saved {total_embeddings} embeddings to {embeddings_path}")
+        print(f"[INFO] Voice gallery with {voice_gallery.user_count} users written to {VOICE_GALLERY_PATH}")
         return True
     
     def cleanup_temp_files(self):
@@ -264,6 +378,14 @@ class BiometricTrainer:
 
 def main():
     """Main training function"""
+    parser = argparse.ArgumentParser(description="Train face and voice recognition models")
+    parser.add_argument("--full", action="store_true",
+                        help="Re-encode the whole dataset instead of only new or changed files")
+    parser.add_argument("--redetect", action="store_true",
+                        help="Ignore cached face chips and decode/detect every image again")
+    args = parser.parse_args()
+    incremental = not args.full
+    
     print("=" * 60)
     print("MULTIMODAL BIOMETRIC AUTHENTICATION - MODEL TRAINING")
     print("=" * 60)
@@ -276,7 +398,7 @@ def main():
         print("TRAINING FACE RECOGNITION MODEL")
         print("=" * 40)
         
-        face_success = trainer.train_face_recognition()
+        face_success = trainer.train_face_recognition(incremental, reuse_chips=not args.redetect)
         if face_success:
             print("✅ Face recognition training completed successfully")
         else:
@@ -287,7 +409,7 @@ def main():
         print("TRAINING VOICE RECOGNITION MODEL")
         print("=" * 40)
         
-        voice_success = trainer.train_voice_recognition()
+        voice_success = trainer.train_voice_recognition(incremental)
         if voice_success:
             print("✅ Voice recognition training completed successfully")
         else:
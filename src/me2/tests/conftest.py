@@ -0,0 +1,10 @@
+"""Shared pytest setup
+
+Makes the ``deploy``, ``modele`` and ``gui_app`` packages importable the
+same way the application scripts do, by putting ``src/me2`` on the path.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
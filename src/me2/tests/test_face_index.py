@@ -0,0 +1,64 @@
+"""Tests for the face gallery search indexes (deploy/face_index.py)"""
+
+import numpy as np
+import pytest
+
+from deploy.gallery import FaceGallery
+from deploy.face_index import (
+    FlatIndex, HNSWIndex, build_face_index, benchmark_index, gallery_fingerprint, load_face_index
+)
+
+def _clustered(seed=0, clusters=40, rows=2000, dim=128):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim)).astype(np.float32)
+    encodings = (centers[rng.integers(0, clusters, rows)]
+                 + 0.3 * rng.normal(size=(rows, dim))).astype(np.float32)
+    queries = (encodings[rng.integers(0, rows, 100)]
+               + 0.1 * rng.normal(size=(100, dim))).astype(np.float32)
+    return encodings, queries
+
+ENCODINGS, QUERIES = _clustered()
+BASELINE = FlatIndex().build(ENCODINGS).search(QUERIES, 10)[1]
+
+def test_flat_index_is_exact():
+    distances, indices = FlatIndex().build(ENCODINGS).search(ENCODINGS[:5], 1)
+    assert indices[:, 0].tolist() == [0, 1, 2, 3, 4]
+    np.testing.assert_allclose(distances[:, 0], 0.0, atol=1e-2)
+
+@pytest.mark.parametrize("kind", ["ivf", "hnsw"])
+def test_approximate_recall_against_flat(kind):
+    index = build_face_index(ENCODINGS, kind)
+    report = benchmark_index(index, ENCODINGS, QUERIES, k=10, baseline=BASELINE)
+    assert report["recall"] >= 0.9
+
+@pytest.mark.parametrize("kind", ["ivf", "hnsw"])
+def test_search_returns_sorted_distances(kind):
+    distances, indices = build_face_index(ENCODINGS, kind).search(QUERIES[:10], 10)
+    assert distances.shape == indices.shape == (10, 10)
+    assert (np.diff(distances, axis=1) >= -1e-5).all()
+
+@pytest.mark.parametrize("kind", ["flat", "ivf", "hnsw"])
+def test_saved_index_reloads_for_same_gallery(tmp_path, kind):
+    gallery = FaceGallery.from_encodings(list(ENCODINGS[:300]), [f"user{i % 30}" for i in range(300)])
+    path = str(tmp_path / "faces.index.npz")
+    index = build_face_index(gallery.encodings, kind)
+    index.save(path, gallery_fingerprint(gallery))
+
+    loaded = load_face_index(gallery, path)
+    assert loaded.kind == kind
+    np.testing.assert_array_equal(loaded.search(QUERIES[:5], 5)[1], index.search(QUERIES[:5], 5)[1])
+
+def test_saved_index_is_stale_for_changed_gallery(tmp_path):
+    gallery = FaceGallery.from_encodings(list(ENCODINGS[:300]), [f"user{i % 30}" for i in range(300)])
+    path = str(tmp_path / "faces.index.npz")
+    HNSWIndex().build(gallery.encodings).save(path, gallery_fingerprint(gallery))
+
+    # Same size, different content: only the fingerprint can tell them apart
+    changed = gallery.with_user("user0", ENCODINGS[300:310])
+    assert len(changed) == len(gallery)
+    assert load_face_index(changed, path) is None
+    assert load_face_index(gallery, str(tmp_path / "missing.npz")) is None
+
+def test_build_rejects_unknown_kind():
+    with pytest.raises(ValueError):
+        build_face_index(ENCODINGS, "lsh")
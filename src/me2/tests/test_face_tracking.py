@@ -0,0 +1,75 @@
+"""Tests for face tracking across frames (deploy/face_tracking.py)"""
+
+from collections import namedtuple
+
+import numpy as np
+
+from deploy.matcher import FaceCandidate
+from deploy.face_tracking import FaceTrack, IoUTracker, box_iou
+
+# Stand-in for face_quality.FaceQuality, only the score is used
+Quality = namedtuple("Quality", ["score"])
+
+def test_box_iou():
+    boxes = [(0, 10, 10, 0), (0, 20, 10, 10), (0, 15, 10, 5)]
+    iou = box_iou(boxes, boxes)
+    np.testing.assert_allclose(np.diag(iou), 1.0)
+    assert iou[0, 1] == 0.0
+    assert iou[0, 2] == iou[2, 0] == 50.0 / 150.0
+
+def test_tracker_follows_moving_face_and_opens_new_tracks():
+    tracker = IoUTracker()
+    first = tracker.update([(0, 100, 100, 0)])[0]
+    moved, newcomer = tracker.update([(5, 105, 105, 5), (300, 400, 400, 300)])
+
+    assert moved is first
+    assert moved.box == (5, 105, 105, 5)
+    assert moved.hits == 2
+    assert newcomer.track_id != first.track_id
+    assert len(tracker.tracks) == 2
+
+def test_tracker_drops_tracks_after_max_missed():
+    tracker = IoUTracker(max_missed=2)
+    track = tracker.update([(0, 100, 100, 0)])[0]
+    tracker.update([])
+    tracker.update([])
+    assert tracker.tracks == [track]
+    tracker.update([])
+    assert tracker.tracks == []
+
+def test_each_detection_gets_its_own_track():
+    tracker = IoUTracker()
+    tracker.update([(0, 100, 100, 0)])
+    # Two overlapping detections cannot share the existing track
+    tracks = tracker.update([(0, 100, 100, 0), (10, 110, 110, 10)])
+    assert tracks[0] is not tracks[1]
+
+def test_needs_encoding_on_refresh_and_movement():
+    track = FaceTrack(0, (0, 100, 100, 0))
+    assert track.needs_encoding(0)
+    track.add_match([], 0, tolerance=0.6)
+    assert not track.needs_encoding(1, refresh_frames=5)
+    assert track.needs_encoding(5, refresh_frames=5)
+    track.box = (60, 160, 160, 60)
+    assert track.needs_encoding(1, refresh_frames=5)
+
+def test_quality_gate_keeps_top_k():
+    track = FaceTrack(0, (0, 100, 100, 0))
+    assert not track.accepts(Quality(0.2), min_quality=0.35)
+    for score in (0.5, 0.9, 0.6, 0.7):
+        if track.accepts(Quality(score), top_k=3):
+            track.add_match([], 0, tolerance=0.6, quality=Quality(score), top_k=3)
+
+    assert sorted(track.qualities) == [0.6, 0.7, 0.9]
+    assert not track.accepts(Quality(0.55), top_k=3)
+    assert track.accepts(Quality(0.8), top_k=3)
+
+def test_votes_weighted_by_quality_and_distance():
+    track = FaceTrack(0, (0, 100, 100, 0))
+    track.add_match([FaceCandidate("alice", 0.3, 1)], 0, tolerance=0.6, quality=Quality(1.0))
+    track.add_match([FaceCandidate("bob", 0.1, 1)], 1, tolerance=0.6, quality=Quality(0.4))
+
+    # alice: (1 - 0.3 / 0.6) * 1.0 = 0.5, bob: (1 - 0.1 / 0.6) * 0.4 = 0.33
+    assert track.identity == "alice"
+    assert track.candidates() == [FaceCandidate("alice", 0.3, 2)]
+    assert FaceTrack(1, (0, 1, 1, 0)).candidates() == []
@@ -0,0 +1,69 @@
+"""Tests for the packed face gallery (deploy/gallery.py)"""
+
+import numpy as np
+import pytest
+
+from deploy.gallery import FaceGallery, ENCODING_DIM
+
+def _gallery():
+    rng = np.random.default_rng(0)
+    encodings = rng.normal(size=(5, ENCODING_DIM)).astype(np.float32)
+    return FaceGallery.from_encodings(list(encodings), ["alice", "bob", "alice", "carol", "bob"])
+
+def test_from_encodings_assigns_labels_in_first_seen_order():
+    gallery = _gallery()
+    assert gallery.names == ["alice", "bob", "carol"]
+    assert gallery.labels.tolist() == [0, 1, 0, 2, 1]
+    assert len(gallery) == 5
+    assert gallery.identity_count == 3
+    assert gallery.dim == ENCODING_DIM
+
+@pytest.mark.parametrize("mmap", [True, False])
+def test_save_load_round_trip(tmp_path, mmap):
+    gallery = _gallery()
+    path = str(tmp_path / "faces.gallery")
+    gallery.save(path)
+
+    loaded = FaceGallery.load(path, mmap=mmap)
+    np.testing.assert_array_equal(np.asarray(loaded.encodings), gallery.encodings)
+    np.testing.assert_array_equal(np.asarray(loaded.labels), gallery.labels)
+    assert loaded.names == gallery.names
+
+def test_save_load_empty_gallery(tmp_path):
+    path = str(tmp_path / "faces.gallery")
+    FaceGallery.from_encodings([], []).save(path)
+
+    loaded = FaceGallery.load(path)
+    assert len(loaded) == 0
+    assert loaded.encodings.shape == (0, ENCODING_DIM)
+    assert loaded.names == []
+
+def test_load_rejects_foreign_file(tmp_path):
+    path = tmp_path / "faces.gallery"
+    path.write_bytes(b"not a gallery".ljust(128, b"\x00"))
+    with pytest.raises(ValueError):
+        FaceGallery.load(str(path))
+
+def test_with_user_replaces_existing_identity_copy_on_write():
+    gallery = _gallery()
+    new_encodings = np.ones((2, ENCODING_DIM), dtype=np.float32)
+
+    updated = gallery.with_user("alice", new_encodings)
+
+    assert updated.names == gallery.names
+    alice_rows = np.asarray(updated.labels) == 0
+    assert alice_rows.sum() == 2
+    np.testing.assert_array_equal(updated.encodings[alice_rows], new_encodings)
+    # Other identities keep their encodings and labels
+    assert updated.label_names(updated.labels[~alice_rows]) == ["bob", "carol", "bob"]
+    # The original gallery is untouched
+    assert len(gallery) == 5
+    assert gallery.labels.tolist() == [0, 1, 0, 2, 1]
+
+def test_with_user_appends_new_identity():
+    gallery = _gallery()
+    updated = gallery.with_user("dave", np.zeros(ENCODING_DIM, dtype=np.float32))
+
+    assert updated.names == ["alice", "bob", "carol", "dave"]
+    assert len(updated) == 6
+    assert updated.labels[-1] == 3
@@ -0,0 +1,81 @@
+"""Tests for the authentication job scheduler (deploy/jobs.py)"""
+
+import asyncio
+import threading
+
+import pytest
+
+from deploy.jobs import AuthJobScheduler, QueueFullError, JOB_DONE, JOB_FAILED
+
+def _blocking_runner(release, running):
+    def runner(door, status_callback):
+        running.append(door)
+        status_callback(f"capturing at {door}")
+        release.wait(5)
+        return {"is_authenticated": True, "user": "alice"}
+    return runner
+
+async def _wait_finished(jobs):
+    while not all(job.is_finished for job in jobs):
+        await asyncio.sleep(0.01)
+
+def test_queue_bound_rejects_excess_jobs():
+    async def scenario():
+        release = threading.Event()
+        scheduler = AuthJobScheduler(_blocking_runner(release, []), max_active=1, max_queued=1)
+        jobs = [scheduler.submit("front"), scheduler.submit("back")]
+        with pytest.raises(QueueFullError):
+            scheduler.submit("side")
+        assert scheduler.pending() == 2
+
+        release.set()
+        await asyncio.wait_for(_wait_finished(jobs), 5)
+        assert scheduler.pending() == 0
+        # Capacity is available again once jobs finish
+        accepted = scheduler.submit("side")
+        await asyncio.wait_for(_wait_finished([accepted]), 5)
+        return jobs
+
+    jobs = asyncio.run(scenario())
+    assert [job.state for job in jobs] == [JOB_DONE, JOB_DONE]
+    assert jobs[0].result == {"is_authenticated": True, "user": "alice"}
+
+def test_one_job_per_door_at_a_time():
+    async def scenario():
+        release = threading.Event()
+        running = []
+        scheduler = AuthJobScheduler(_blocking_runner(release, running), max_active=2, max_queued=2)
+        jobs = [scheduler.submit("front"), scheduler.submit("front"), scheduler.submit("back")]
+        await asyncio.sleep(0.2)
+        started = sorted(running)
+        release.set()
+        await asyncio.wait_for(_wait_finished(jobs), 5)
+        return started
+
+    # Both slots are free, but the second front-door job waits for the first
+    assert asyncio.run(scenario()) == ["back", "front"]
+
+def test_stream_replays_events_until_result():
+    async def scenario():
+        release = threading.Event()
+        release.set()
+        scheduler = AuthJobScheduler(_blocking_runner(release, []), max_active=1, max_queued=0)
+        job = scheduler.submit("front")
+        return [event["type"] async for event in job.stream(heartbeat=1.0)]
+
+    assert asyncio.run(scenario()) == ["queued", "started", "status", "result"]
+
+def test_runner_errors_fail_the_job():
+    def runner(door, status_callback):
+        raise RuntimeError("camera unavailable")
+
+    async def scenario():
+        scheduler = AuthJobScheduler(runner, max_active=1, max_queued=0)
+        job = scheduler.submit("front")
+        await asyncio.wait_for(_wait_finished([job]), 5)
+        return job
+
+    job = asyncio.run(scenario())
+    assert job.state == JOB_FAILED
+    assert job.events[-1]["type"] == "failed"
+    assert "camera unavailable" in job.events[-1]["message"]
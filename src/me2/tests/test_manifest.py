@@ -0,0 +1,62 @@
+"""Tests for the incremental training manifest (modele/manifest.py)"""
+
+import os
+
+import numpy as np
+
+from modele.manifest import TrainingManifest
+
+DIM = 4
+
+def _write(path, content):
+    path.write_bytes(content)
+    return str(path)
+
+def _trained_manifest(tmp_path, files):
+    manifest = TrainingManifest(str(tmp_path / "manifest.npz"), DIM)
+    delta = manifest.diff(files)
+    for i, file_path in enumerate(delta.to_encode):
+        manifest.update(file_path, np.full((i % 2, DIM), i, dtype=np.float32))
+    manifest.save()
+    return TrainingManifest.load(str(tmp_path / "manifest.npz"), DIM)
+
+def test_new_files_need_encoding(tmp_path):
+    files = [_write(tmp_path / f"{i}.jpg", bytes([i]) * 10) for i in range(3)]
+    delta = TrainingManifest(str(tmp_path / "manifest.npz"), DIM).diff(files)
+    assert delta.to_encode == files
+    assert delta.unchanged == []
+    assert delta.removed == []
+
+def test_saved_vectors_round_trip(tmp_path):
+    files = [_write(tmp_path / f"{i}.jpg", bytes([i]) * 10) for i in range(3)]
+    manifest = _trained_manifest(tmp_path, files)
+
+    assert manifest.diff(files).unchanged == files
+    assert manifest.vectors(files[0]).shape == (0, DIM)
+    np.testing.assert_array_equal(manifest.vectors(files[1]), np.full((1, DIM), 1, dtype=np.float32))
+    assert manifest.vectors(str(tmp_path / "unknown.jpg")).shape == (0, DIM)
+
+def test_diff_detects_edits_touches_and_removals(tmp_path):
+    files = [_write(tmp_path / f"{i}.jpg", bytes([i]) * 10) for i in range(3)]
+    manifest = _trained_manifest(tmp_path, files)
+
+    # Edited content is re-encoded
+    _write(tmp_path / "0.jpg", b"edited content")
+    # Touched but identical content is kept
+    stat = os.stat(files[1])
+    os.utime(files[1], ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    # Deleted files are reported as removed
+    os.remove(files[2])
+
+    delta = manifest.diff(files[:2])
+    assert delta.to_encode == [files[0]]
+    assert delta.unchanged == [files[1]]
+    assert delta.removed == [files[2]]
+
+def test_incompatible_manifest_starts_empty(tmp_path):
+    files = [_write(tmp_path / "0.jpg", b"face")]
+    _trained_manifest(tmp_path, files)
+
+    manifest = TrainingManifest.load(str(tmp_path / "manifest.npz"), DIM + 1)
+    assert manifest.entries == {}
+    assert manifest.diff(files).to_encode == files
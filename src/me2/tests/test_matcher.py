@@ -0,0 +1,65 @@
+"""Tests for the batch face matcher (deploy/matcher.py)"""
+
+import numpy as np
+import pytest
+
+from deploy.gallery import FaceGallery, ENCODING_DIM
+from deploy.face_index import build_face_index
+from deploy.matcher import FaceMatcher
+
+def _unit(axis):
+    vector = np.zeros(ENCODING_DIM, dtype=np.float32)
+    vector[axis] = 1.0
+    return vector
+
+# Query e0; alice has one very close and one far encoding, bob two medium ones
+QUERY = _unit(0)
+GALLERY = FaceGallery.from_encodings(
+    [QUERY + 0.1 * _unit(2), QUERY + 1.3 * _unit(3), QUERY + 0.5 * _unit(4), QUERY + 0.5 * _unit(5)],
+    ["alice", "alice", "bob", "bob"],
+)
+
+def test_min_aggregation_uses_closest_encoding():
+    matcher = FaceMatcher(GALLERY, tolerance=0.6, aggregation="min")
+    candidates = matcher.match([QUERY], max_candidates=3)[0]
+    assert [c.name for c in candidates] == ["alice", "bob"]
+    assert candidates[0].distance == pytest.approx(0.1, abs=1e-5)
+
+def test_mean_aggregation_rejects_inconsistent_identity():
+    matcher = FaceMatcher(GALLERY, tolerance=0.6, aggregation="mean")
+    candidates = matcher.match([QUERY], max_candidates=3)[0]
+    # alice averages (0.1 + 1.3) / 2 = 0.7, above the tolerance
+    assert [c.name for c in candidates] == ["bob"]
+    assert candidates[0].distance == pytest.approx(0.5, abs=1e-5)
+
+def test_vote_aggregation_counts_neighbours_within_tolerance():
+    matcher = FaceMatcher(GALLERY, tolerance=0.6, aggregation="vote", top_k=3)
+    candidates = matcher.match([QUERY], max_candidates=3)[0]
+    assert [(c.name, c.votes) for c in candidates] == [("bob", 2), ("alice", 1)]
+
+    single_vote = FaceMatcher(GALLERY, tolerance=0.6, aggregation="vote", top_k=1)
+    assert single_vote.identify([QUERY]) == ["alice"]
+
+def test_unknown_face_and_empty_batch():
+    matcher = FaceMatcher(GALLERY, tolerance=0.6)
+    assert matcher.identify([_unit(7)]) == ["Unknown"]
+    assert matcher.match(np.empty((0, ENCODING_DIM), dtype=np.float32)) == []
+
+def test_rejects_unknown_aggregation():
+    with pytest.raises(ValueError):
+        FaceMatcher(GALLERY, aggregation="median")
+
+@pytest.mark.parametrize("kind", ["ivf", "hnsw"])
+@pytest.mark.parametrize("aggregation", ["min", "mean", "vote"])
+def test_approximate_index_agrees_with_exact_scan(kind, aggregation):
+    rng = np.random.default_rng(1)
+    centers = rng.normal(scale=0.5, size=(20, ENCODING_DIM)).astype(np.float32)
+    owners = np.repeat(np.arange(20), 10)
+    encodings = centers[owners] + rng.normal(scale=0.02, size=(200, ENCODING_DIM)).astype(np.float32)
+    gallery = FaceGallery.from_encodings(list(encodings), [f"user{o}" for o in owners])
+    queries = centers + rng.normal(scale=0.02, size=centers.shape).astype(np.float32)
+
+    exact = FaceMatcher(gallery, aggregation=aggregation)
+    approximate = FaceMatcher(gallery, aggregation=aggregation,
+                              index=build_face_index(gallery.encodings, kind))
+    assert approximate.identify(queries) == exact.identify(queries) == [f"user{u}" for u in range(20)]
@@ -0,0 +1,62 @@
+"""Tests for speaker identification (deploy/voice_gallery.py)"""
+
+import numpy as np
+
+from deploy.voice_gallery import VoiceGallery
+
+def _normalized(*components):
+    vector = np.array(components, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+QUERY = _normalized(0, 0, 1)
+
+def _gallery(prototypes_per_user=0):
+    # alice's samples straddle the query: her centroid matches it exactly,
+    # but no single sample is closer than cos 45 degrees (0.707)
+    alice = [_normalized(1, 0, 1), _normalized(-1, 0, 1)]
+    # bob has one sample at cos 0.894 from the query
+    bob = [_normalized(0, 0.5, 1)]
+    return VoiceGallery.from_embeddings([("alice", alice), ("bob", bob)], prototypes_per_user)
+
+def test_centroid_scores_without_rerank():
+    scores = _gallery().ranked_scores(QUERY, rerank_users=0)
+    np.testing.assert_allclose(scores, [1.0, 0.894], atol=1e-3)
+
+def test_rerank_scores_shortlist_on_raw_embeddings():
+    scores = _gallery().ranked_scores(QUERY, rerank_users=2)
+    np.testing.assert_allclose(scores, [0.707, 0.894], atol=1e-3)
+    assert _gallery().identify(QUERY, threshold=0.5, rerank_users=2) == (True, "bob", scores[1])
+
+def test_rerank_never_lets_unverified_user_win():
+    gallery = _gallery()
+    scores = gallery.ranked_scores(QUERY, rerank_users=1)
+    assert scores[1] == -np.inf
+
+    is_authenticated, speaker, similarity = gallery.identify(QUERY, threshold=0.5, rerank_users=1)
+    assert (is_authenticated, speaker) == (True, "alice")
+    assert similarity == np.float32(scores[0])
+
+def test_identify_below_threshold_is_unknown():
+    is_authenticated, speaker, _ = _gallery().identify(QUERY, threshold=0.95, rerank_users=2)
+    assert (is_authenticated, speaker) == (False, "Unknown")
+
+def test_prototypes_score_best_prototype():
+    gallery = _gallery(prototypes_per_user=2)
+    # Each of alice's samples is its own prototype
+    np.testing.assert_allclose(gallery.user_scores(QUERY), [0.707, 0.894], atol=1e-3)
+
+def test_with_user_replaces_embeddings(tmp_path):
+    gallery = _gallery().with_user("alice", [_normalized(0, 0, 1)])
+    assert gallery.names == ["alice", "bob"]
+    assert len(gallery) == 2
+    assert gallery.identify(QUERY, threshold=0.5, rerank_users=2)[1] == "alice"
+
+    path = str(tmp_path / "voices.gallery.npz")
+    gallery.save(path)
+    loaded = VoiceGallery.load(path)
+    assert loaded.names == gallery.names
+    np.testing.assert_array_equal(loaded.embeddings, gallery.embeddings)
+
+def test_empty_gallery_is_unknown():
+    gallery = VoiceGallery.from_embeddings([])
+    assert gallery.identify(QUERY, threshold=0.1) == (False, "Unknown", 0.0)